@@ -0,0 +1,598 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+import routing
+from routing import (
+    GOODS_TYPE_MULTIPLIER,
+    NOMINATIM_HEADERS,
+    ROAD_TABLE_FAILED,
+    OverlayNetwork,
+    build_road_leg,
+    cached_road_leg,
+    candidate_hubs,
+    country_cache,
+    evaluate_with_cache,
+    geocode_store,
+    get_base_network,
+    is_road_connection_feasible,
+    location_cache,
+    nearest_hub_country,
+    optimize_request_routes,
+    parse_road_table,
+    parse_routing_options,
+    rank_hub_legs,
+    resolve_static_coords,
+    road_leg_cache,
+    segment_cost_rate,
+)
+from consolidation import (ContainerLoad, Shipment, ShipmentGroup, allocate_costs, container_ids,
+                           group_shipments, pack_first_fit_decreasing, savings, set_road_containers)
+from metrics import count_cache, count_upstream, time_stage
+from profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+# Bounded pool for the CPU-heavy stages (NSGA-III, tabu search, ranking)
+ROUTING_CPU_WORKERS = int(os.environ.get("LOGILINK_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+cpu_executor = concurrent.futures.ThreadPoolExecutor(max_workers=ROUTING_CPU_WORKERS,
+                                                     thread_name_prefix="routing-cpu")
+
+# Threads for geocode and road-leg cache reads and writes. SQLite calls can
+# wait up to the busy timeout on another writer's lock, so they never run on
+# the event loop.
+CACHE_IO_WORKERS = int(os.environ.get("LOGILINK_CACHE_IO_WORKERS", 2))
+cache_executor = concurrent.futures.ThreadPoolExecutor(max_workers=CACHE_IO_WORKERS,
+                                                       thread_name_prefix="cache-io")
+
+# Maximum OSRM requests in flight per request network
+OSRM_CONCURRENCY = int(os.environ.get("LOGILINK_OSRM_CONCURRENCY", 10))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled HTTP client for OSRM and Nominatim"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def run_cache_io(fn: Callable, *args) -> Any:
+    """Run a blocking geocode store or road-leg cache call on the cache I/O pool"""
+    return await asyncio.get_running_loop().run_in_executor(cache_executor, fn, *args)
+
+
+class NominatimRateLimiter:
+    """Async limiter enforcing Nominatim's max 1 request per second"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._last_call = 0.0
+
+    async def wait(self) -> None:
+        async with self._lock:
+            delay = self._last_call + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_call = time.monotonic()
+
+
+_nominatim_limiter: Optional[NominatimRateLimiter] = None
+_geocode_inflight: Dict[str, "asyncio.Future"] = {}
+_road_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+def get_nominatim_limiter() -> NominatimRateLimiter:
+    global _nominatim_limiter
+    if _nominatim_limiter is None:
+        _nominatim_limiter = NominatimRateLimiter(routing.NOMINATIM_INTERVAL)
+    return _nominatim_limiter
+
+
+# -------------------------------------------------------------------------
+# ASYNC UPSTREAM LOOKUPS
+# -------------------------------------------------------------------------
+async def geocode_location_async(location: str) -> tuple:
+    """
+    Async counterpart of routing.geocode_location.
+    Returns a tuple of (success, coordinates, country)
+    """
+    if location in location_cache:
+        count_cache("geocode", True)
+        return True, location_cache[location], country_cache.get(location, "Unknown")
+
+    try:
+        cached = await run_cache_io(geocode_store.get, location)
+    except Exception as e:
+        logger.warning("Could not read geocode store: %s", e)
+        cached = None
+    count_cache("geocode", cached is not None)
+    if cached is not None:
+        coords, country = cached
+        location_cache[location] = coords
+        country_cache[location] = country
+        return True, coords, country
+
+    # Concurrent lookups of the same place share one upstream request
+    task = _geocode_inflight.get(location)
+    if task is None:
+        task = asyncio.ensure_future(_nominatim_lookup(location))
+        _geocode_inflight[location] = task
+        task.add_done_callback(lambda _: _geocode_inflight.pop(location, None))
+    return await task
+
+
+async def _nominatim_lookup(location: str) -> tuple:
+    try:
+        with time_stage("geocoding"):
+            await get_nominatim_limiter().wait()
+            response = await get_http_client().get(
+                f"{routing.NOMINATIM_URL}/search",
+                params={"q": location, "format": "json", "limit": 1, "addressdetails": 1},
+                headers=NOMINATIM_HEADERS,
+            )
+            data = response.json()
+
+        if data and len(data) > 0:
+            coords = f"{data[0]['lon']},{data[0]['lat']}"
+            country = data[0].get('address', {}).get('country', "Unknown")
+
+            location_cache[location] = coords
+            country_cache[location] = country
+            await run_cache_io(geocode_store.put, location, coords, country)
+            count_upstream("nominatim", "ok")
+            return True, coords, country
+        else:
+            count_upstream("nominatim", "not_found")
+            logger.warning("Location '%s' not found", location)
+            return False, None, None
+
+    except Exception as e:
+        count_upstream("nominatim", "error")
+        logger.error("Error geocoding %s: %s", location, e)
+        return False, None, None
+
+
+async def get_location_coords_async(location: str) -> str:
+    """Async counterpart of routing.get_location_coords"""
+    coords = resolve_static_coords(location)
+    if coords is not None:
+        return coords
+
+    success, coords, _ = await geocode_location_async(location)
+    if success:
+        return coords
+    logger.warning("Using default coordinates for %s", location)
+    return "77.1025,28.7041"  # Default to Delhi
+
+
+async def get_country_for_node_async(node_name: str) -> str:
+    """Async counterpart of routing.get_country_for_node"""
+    if node_name in country_cache:
+        return country_cache[node_name]
+
+    country = nearest_hub_country(node_name)
+    if country is not None:
+        return country
+
+    success, _, country = await geocode_location_async(node_name)
+    if success:
+        return country
+    return "Unknown"
+
+
+async def get_road_route_async(source_coords: str, destination_coords: str) -> Dict[str, Any]:
+    """Async counterpart of routing.get_cached_road_route (cache first, then OSRM)"""
+    cached = await run_cache_io(cached_road_leg, source_coords, destination_coords)
+    if cached is not None:
+        return build_road_leg(cached["distance_km"], cached["time_hr"], cached["geometry"])
+
+    # Concurrent requests for the same leg (e.g. lanes of a batch) share one OSRM call
+    key = road_leg_cache.key(source_coords, destination_coords)
+    task = _road_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_osrm_route_lookup(source_coords, destination_coords))
+        _road_inflight[key] = task
+        task.add_done_callback(lambda _: _road_inflight.pop(key, None))
+    return await task
+
+
+async def _osrm_route_lookup(source_coords: str, destination_coords: str) -> Dict[str, Any]:
+    osrm_url = f"{routing.OSRM_URL}/route/v1/driving/{source_coords};{destination_coords}?overview=full"
+    try:
+        response = await get_http_client().get(osrm_url)
+        data = response.json()
+    except Exception as e:
+        count_upstream("osrm_route", "error")
+        logger.error("Error querying OSRM: %s", e)
+        return {"success": False}
+
+    if "routes" in data and len(data["routes"]) > 0:
+        count_upstream("osrm_route", "ok")
+        distance_km = data["routes"][0]["distance"] / 1000
+        time_hr = data["routes"][0]["duration"] / 3600
+        geometry = data["routes"][0]["geometry"]
+        await run_cache_io(road_leg_cache.put, source_coords, destination_coords, distance_km, time_hr, geometry)
+        return build_road_leg(distance_km, time_hr, geometry)
+
+    count_upstream("osrm_route", "not_found")
+    logger.debug("No route found between %s and %s", source_coords, destination_coords)
+    return {"success": False}
+
+
+async def get_road_table_async(origin_coords: str, other_coords: List[str], from_origin: bool = True,
+                               chunk_size: int = 99) -> List[Optional[Tuple[float, float]]]:
+    """Async counterpart of routing.get_road_table; chunks are requested concurrently"""
+
+    async def fetch_chunk(chunk: List[str]) -> List[Optional[Tuple[float, float]]]:
+        coords = ";".join([origin_coords] + chunk)
+        others = ";".join(str(i) for i in range(1, len(chunk) + 1))
+        if from_origin:
+            params = f"sources=0&destinations={others}"
+        else:
+            params = f"sources={others}&destinations=0"
+        osrm_url = f"{routing.OSRM_URL}/table/v1/driving/{coords}?{params}&annotations=distance,duration"
+        try:
+            response = await get_http_client().get(osrm_url)
+            response.raise_for_status()
+            legs = parse_road_table(response.json(), from_origin, len(chunk))
+        except Exception as e:
+            count_upstream("osrm_table", "error")
+            logger.error("Error querying OSRM table: %s", e)
+            return [ROAD_TABLE_FAILED] * len(chunk)
+        count_upstream("osrm_table", "ok")
+        return legs
+
+    chunks = [other_coords[i:i + chunk_size] for i in range(0, len(other_coords), chunk_size)]
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return [leg for chunk in results for leg in chunk]
+
+
+# -------------------------------------------------------------------------
+# ASYNC NETWORK AUGMENTATION
+# -------------------------------------------------------------------------
+async def road_connections_async(G, source_node: str, nodes_to_connect: List[str],
+                                 is_source_to_nodes: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Async counterpart of routing.parallel_road_connections. Honors the same
+    matrix/per-hub mode switch; all OSRM calls share the pooled client.
+    """
+    source_coords = G.nodes[source_node]['coords']
+    semaphore = asyncio.Semaphore(OSRM_CONCURRENCY)
+
+    def leg_coords(node):
+        node_coords = G.nodes[node]['coords']
+        return (source_coords, node_coords) if is_source_to_nodes else (node_coords, source_coords)
+
+    async def fetch(node):
+        async with semaphore:
+            return node, await get_road_route_async(*leg_coords(node))
+
+    async def fetch_all(nodes):
+        results = await asyncio.gather(*(fetch(node) for node in nodes))
+        return {node: road_data for node, road_data in results if road_data["success"]}
+
+    if not routing.ROAD_MATRIX_MODE:
+        return await fetch_all(nodes_to_connect)
+
+    def cached_legs():
+        return [cached_road_leg(*leg_coords(node)) for node in nodes_to_connect]
+
+    estimates = {}
+    uncached = []
+    for node, cached in zip(nodes_to_connect, await run_cache_io(cached_legs)):
+        if cached is not None:
+            estimates[node] = (cached["distance_km"], cached["time_hr"])
+        else:
+            uncached.append(node)
+    failed = []
+    if uncached:
+        table = await get_road_table_async(source_coords, [G.nodes[n]['coords'] for n in uncached],
+                                           is_source_to_nodes)
+        for node, leg in zip(uncached, table):
+            if leg is ROAD_TABLE_FAILED:
+                failed.append(node)
+            elif leg is not None:
+                estimates[node] = leg
+
+    # Hubs the table could not rank are routed one by one
+    fetched = await fetch_all(failed) if failed else {}
+    for node, road_data in fetched.items():
+        estimates[node] = (road_data["distance_km"], road_data["time_hr"])
+    survivors = rank_hub_legs(G, estimates, routing.ROAD_MATRIX_KEEP)
+
+    results = {node: fetched[node] for node in survivors if node in fetched}
+    results.update(await fetch_all([node for node in survivors if node not in fetched]))
+    return results
+
+
+async def add_road_connections_async(G, source: str, destination: str):
+    """Async counterpart of routing.add_road_connections"""
+    with time_stage("road_augmentation"):
+        return await _add_road_connections(G, source, destination)
+
+
+async def _add_road_connections(G, source: str, destination: str):
+    (source_coords, dest_coords, source_country, dest_country) = await asyncio.gather(
+        get_location_coords_async(source),
+        get_location_coords_async(destination),
+        get_country_for_node_async(source),
+        get_country_for_node_async(destination),
+    )
+
+    logger.debug("Adding road connections for %s (%s) to %s (%s)", source, source_country, destination, dest_country)
+
+    G.add_node(source, type="city", country=source_country, coords=source_coords)
+    G.add_node(destination, type="city", country=dest_country, coords=dest_coords)
+
+    source_country_nodes = candidate_hubs(G, source, source_country, (source, destination))
+    dest_country_nodes = candidate_hubs(G, destination, dest_country, (source, destination))
+
+    # Direct leg and both hub fan-outs are independent, so run them together
+    road_data, source_connections, dest_connections = await asyncio.gather(
+        get_road_route_async(source_coords, dest_coords),
+        road_connections_async(G, source, source_country_nodes, True),
+        road_connections_async(G, destination, dest_country_nodes, False),
+    )
+
+    if road_data["success"] and is_road_connection_feasible(source_country, dest_country, road_data["distance_km"]):
+        G.add_edge(source, destination, **road_data, mode="road")
+        logger.debug("Added direct road connection: %s -> %s (%.1f km)", source, destination, road_data['distance_km'])
+
+    for node, leg in source_connections.items():
+        G.add_edge(source, node, **leg, mode="road")
+    for node, leg in dest_connections.items():
+        G.add_edge(node, destination, **leg, mode="road")
+
+    return G
+
+
+async def build_request_network_async(source: str, destination: str, base=None) -> OverlayNetwork:
+    """Async counterpart of routing.build_request_network"""
+    if base is None:
+        loop = asyncio.get_running_loop()
+        base = await loop.run_in_executor(cpu_executor, get_base_network)
+    G = OverlayNetwork(base)
+    await add_road_connections_async(G, source, destination)
+    return G
+
+
+async def get_routing_async(source: str, destination: str, priority_choice: str,
+                            goods_type_choice: str, cargo_weight: float) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    Non-blocking version of routing.get_routing for the API.
+    Upstream I/O runs on the event loop through the pooled client; the CPU
+    stages run on the bounded executor.
+    """
+    _, routes = await get_routing_with_network_async(source, destination, priority_choice,
+                                                     goods_type_choice, cargo_weight)
+    return routes
+
+
+async def get_routing_with_network_async(source: str, destination: str, priority_choice: str,
+                                         goods_type_choice: str, cargo_weight: float,
+                                         profiler: SamplingProfiler = None
+                                         ) -> Tuple[OverlayNetwork, List[Tuple[List[str], Dict[str, Any]]]]:
+    """
+    get_routing_async, also returning the request network the routes were
+    found on. With a profiler, the executor thread running the optimizer is
+    watched by it.
+    """
+    priority, priority_int, goods_type = parse_routing_options(priority_choice, goods_type_choice)
+    logger.debug("Selected cargo type: %s (cost multiplier: %sx)", goods_type.title(), GOODS_TYPE_MULTIPLIER[goods_type])
+
+    logger.debug("Adding road connections...")
+    G = await build_request_network_async(source, destination)
+
+    loop = asyncio.get_running_loop()
+    optimize = optimize_request_routes if profiler is None else profiler.wrap(optimize_request_routes)
+    routes = await loop.run_in_executor(
+        cpu_executor, optimize,
+        G, source, destination, priority, priority_int, goods_type, cargo_weight,
+    )
+    return G, routes
+
+
+
+async def stream_routing_async(source: str, destination: str, priority_choice: str,
+                               goods_type_choice: str, cargo_weight: float) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming version of get_routing_async. Yields
+    {"event": "route", "route": ..., "evaluation": ...} for each route as soon
+    as the optimizer has evaluated it, then a final
+    {"event": "ranking", "routes": [(route, evaluation), ...]} with the
+    ranked result get_routing_async would return.
+    """
+    priority, priority_int, goods_type = parse_routing_options(priority_choice, goods_type_choice)
+    G = await build_request_network_async(source, destination)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_route(route, evaluation):
+        # Called on the CPU pool; hand the route over to the event loop
+        loop.call_soon_threadsafe(queue.put_nowait, (route, evaluation))
+
+    future = loop.run_in_executor(
+        cpu_executor, functools.partial(optimize_request_routes, G, source, destination, priority,
+                                        priority_int, goods_type, cargo_weight, on_route=on_route),
+    )
+    future.add_done_callback(lambda _: queue.put_nowait(None))
+
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        route, evaluation = item
+        yield {"event": "route", "route": route, "evaluation": evaluation}
+
+    yield {"event": "ranking", "routes": await future or []}
+
+# Lanes of a batch whose road legs are fetched at the same time
+BATCH_LANE_CONCURRENCY = int(os.environ.get("LOGILINK_BATCH_LANE_CONCURRENCY", 8))
+
+
+async def build_lane_networks_async(lanes: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Any]:
+    """
+    Request networks for many (source, destination) lanes on the same base
+    network: each distinct location is geocoded once and road legs common
+    to several lanes are fetched once. A lane whose network could not be
+    built maps to the exception.
+    """
+    loop = asyncio.get_running_loop()
+    base = await loop.run_in_executor(cpu_executor, get_base_network)
+
+    lanes = list(dict.fromkeys(lanes))
+    locations = {source for source, _ in lanes} | {destination for _, destination in lanes}
+    await asyncio.gather(*(get_location_coords_async(location) for location in locations),
+                         *(get_country_for_node_async(location) for location in locations))
+
+    semaphore = asyncio.Semaphore(BATCH_LANE_CONCURRENCY)
+
+    async def build_lane(lane):
+        async with semaphore:
+            return await build_request_network_async(*lane, base=base)
+
+    built = await asyncio.gather(*(build_lane(lane) for lane in lanes), return_exceptions=True)
+    return dict(zip(lanes, built))
+
+
+async def get_routing_batch_async(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Route many jobs (dicts with source, destination, priority, goods_type and
+    cargo_weight) in one call. All jobs share the base network; each distinct
+    location is geocoded once, each distinct lane gets one request network
+    shared by every job on it, and road legs common to several lanes are
+    fetched once. Optimization runs in parallel on the CPU pool.
+
+    Returns one {"routes": ..., "error": ...} dict per job, in job order.
+    """
+    loop = asyncio.get_running_loop()
+    networks = await build_lane_networks_async([(job["source"], job["destination"]) for job in jobs])
+    logger.info("Batch: %d jobs, %d lanes", len(jobs), len(networks))
+
+    async def run_job(job):
+        G = networks[(job["source"], job["destination"])]
+        if isinstance(G, Exception):
+            return {"routes": None, "error": str(G)}
+        try:
+            priority, priority_int, goods_type = parse_routing_options(job["priority"], job["goods_type"])
+            routes = await loop.run_in_executor(
+                cpu_executor, optimize_request_routes,
+                G, job["source"], job["destination"], priority, priority_int, goods_type, job["cargo_weight"],
+            )
+        except Exception as e:
+            logger.error("Error routing %s -> %s: %s", job['source'], job['destination'], e)
+            return {"routes": None, "error": str(e)}
+        return {"routes": routes or [], "error": None}
+
+    return await asyncio.gather(*(run_job(job) for job in jobs))
+
+
+def route_consolidated_group(G, group: ShipmentGroup, loads: List[ContainerLoad]) -> Optional[Dict[str, Any]]:
+    """
+    Route a group once at its total weight and split the best route's cost
+    between its shipments. Returns None if the lane has no route.
+    """
+    priority, priority_int, _ = parse_routing_options(group.priority, "1")
+    routes = optimize_request_routes(G, group.source, group.destination, priority, priority_int,
+                                     group.goods_type, group.total_weight)
+    if not routes:
+        return None
+    route, evaluation = routes[0]
+    # Price road legs for the containers actually packed
+    set_road_containers(evaluation, len(loads))
+    costs = allocate_costs(evaluation, group.shipments, loads, segment_cost_rate)
+    # What each shipment would cost on the same route on its own
+    standalone = [evaluate_with_cache(G, route, shipment.cargo_weight, shipment.goods_type)['total_cost']
+                  for shipment in group.shipments]
+    return {"route": route, "evaluation": evaluation, "costs": costs, "standalone": standalone}
+
+
+async def consolidate_routing_async(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Route a batch of shipments (get_routing_batch_async jobs, optionally with
+    an "id") as consolidated groups: compatible shipments on the same lane
+    are packed into road containers with first-fit decreasing and routed
+    once per group. Returns the groups with their containers, route and
+    per-shipment cost allocations, plus batch totals.
+    """
+    shipments = []
+    for i, job in enumerate(jobs):
+        _, _, goods_type = parse_routing_options(job["priority"], job["goods_type"])
+        shipments.append(Shipment(str(job.get("id") or i), job["source"], job["destination"],
+                                  job["priority"], goods_type, job["cargo_weight"]))
+    groups = group_shipments(shipments, GOODS_TYPE_MULTIPLIER)
+    networks = await build_lane_networks_async([(group.source, group.destination) for group in groups])
+    logger.info("Consolidation: %d shipments in %d groups on %d lanes", len(shipments), len(groups), len(networks))
+    capacity = routing.container_index.max_capacity.get("road")
+    loop = asyncio.get_running_loop()
+
+    async def run_group(group):
+        loads = pack_first_fit_decreasing([shipment.cargo_weight for shipment in group.shipments], capacity)
+        result = {
+            "source": group.source,
+            "destination": group.destination,
+            "priority": group.priority,
+            "goods_type": group.goods_type,
+            "total_weight": group.total_weight,
+            "containers": [{"container_type": routing.get_container_type("road", load.load_kg)[0],
+                            "load_kg": load.load_kg,
+                            "shipments": list(dict.fromkeys(group.shipments[i].id for i, _ in load.pieces))}
+                           for load in loads],
+            "route": None,
+            "allocations": [],
+            "error": None,
+        }
+        G = networks[(group.source, group.destination)]
+        try:
+            if isinstance(G, Exception):
+                raise G
+            routed = await loop.run_in_executor(cpu_executor, route_consolidated_group, G, group, loads)
+        except Exception as e:
+            logger.error("Error routing consolidated group %s -> %s: %s", group.source, group.destination, e)
+            result["error"] = str(e)
+            return result
+        if routed is None:
+            result["error"] = "No route found"
+            return result
+
+        result["route"] = (routed["route"], routed["evaluation"])
+        for shipment, cost, standalone, ids in zip(group.shipments, routed["costs"], routed["standalone"],
+                                                   container_ids(loads, len(group.shipments))):
+            result["allocations"].append({"id": shipment.id, "cargo_weight": shipment.cargo_weight,
+                                          "goods_type": shipment.goods_type, "containers": ids,
+                                          "allocated_cost": cost, "standalone_cost": standalone})
+        return result
+
+    results = await asyncio.gather(*(run_group(group) for group in groups))
+    allocations = [a for result in results for a in result["allocations"]]
+    total_cost = sum(a["allocated_cost"] for a in allocations)
+    standalone_cost = sum(a["standalone_cost"] for a in allocations)
+    return {
+        "groups": results,
+        "shipments": len(shipments),
+        "route_computations": len(groups),
+        "total_cost": total_cost,
+        "standalone_cost": standalone_cost,
+        "savings": savings(total_cost, standalone_cost),
+    }
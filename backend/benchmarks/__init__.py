@@ -0,0 +1 @@
+"""Offline benchmarks for the routing pipeline (see bench_routing.py)"""
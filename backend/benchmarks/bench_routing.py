@@ -0,0 +1,277 @@
+"""
+Offline benchmarks for the routing pipeline.
+
+Runs get_routing and each of its stages over representative lanes against
+the mock OSRM and Nominatim servers, so runs are repeatable and need no
+network access. For every (lane, stage) it reports the median wall time,
+the memory still allocated when the stage returns and the peak traced
+memory, compares them with baseline.json and flags regressions.
+
+Usage (from backend/):
+
+    python -m benchmarks.bench_routing                    # compare with the baseline
+    python -m benchmarks.bench_routing --update-baseline  # record a new baseline
+    python -m benchmarks.bench_routing --lanes mumbai-new-york --repeats 10
+
+Timings depend on the machine, so record the baseline on the machine that
+runs the comparison. The exit status is 1 when a regression is flagged.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# A stage regresses when it is this much slower (or uses this much more
+# memory) than the baseline; time differences under MIN_TIME_DELTA_S are noise
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+MIN_TIME_DELTA_S = 0.002
+MIN_MEMORY_DELTA_KIB = 64.0
+
+
+class Lane(NamedTuple):
+    name: str
+    source: str
+    destination: str
+    priority: str
+    goods_type: str
+    cargo_weight: float
+
+
+# Domestic road, short-haul international and long-haul lanes across all priorities
+LANES = [
+    Lane("mumbai-delhi", "Mumbai", "Delhi", "cost", "1", 1000.0),
+    Lane("ahmedabad-dubai", "Ahmedabad", "Dubai", "cost", "1", 100.0),
+    Lane("mumbai-new-york", "Mumbai", "New York", "balanced", "2", 500.0),
+    Lane("delhi-rotterdam", "Delhi", "Rotterdam", "time", "3", 50.0),
+    Lane("bangalore-new-york", "Bangalore", "New York", "eco", "6", 2000.0),
+]
+
+
+class StageResult(NamedTuple):
+    time_s: float       # median wall time
+    min_time_s: float
+    alloc_kib: float    # traced memory still allocated when the stage returns
+    peak_kib: float     # peak traced memory during the stage
+
+
+def measure(fn: Callable[[], Any], repeats: int, setup: Callable[[], None] = None) -> StageResult:
+    """
+    Time fn over `repeats` runs, then run it once more under tracemalloc
+    (which slows it down too much to time) for its memory figures.
+    setup runs before every call and is not timed.
+    """
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return StageResult(statistics.median(times), min(times), current / 1024, peak / 1024)
+
+
+def run_global_stages(routing, repeats: int) -> Dict[str, StageResult]:
+    """Stages that do not depend on a lane: building the base network and its transfer table"""
+    base = routing.get_base_network()
+    return {
+        "network_build": measure(routing.build_base_network, repeats),
+        "transfer_table": measure(lambda: routing.build_transfer_table(base), repeats),
+    }
+
+
+def run_lane(routing, lane: Lane, repeats: int) -> Dict[str, StageResult]:
+    """Time each stage of get_routing on one lane, then get_routing end to end"""
+    priority, priority_int, goods_type = routing.parse_routing_options(lane.priority, lane.goods_type)
+    weight = lane.cargo_weight
+    base = routing.get_base_network()
+    clear_evaluations = routing.evaluation_cache.invalidate
+
+    def forget_endpoints():
+        for location in (lane.source, lane.destination):
+            routing.location_cache.pop(location, None)
+            routing.country_cache.pop(location, None)
+
+    def resolve_endpoints():
+        return [(routing.get_location_coords(location), routing.get_country_for_node(location))
+                for location in (lane.source, lane.destination)]
+
+    # Warm-up: geocodes and road legs come from the mocks once, then from the caches
+    routing.get_routing(lane.source, lane.destination, lane.priority, lane.goods_type, weight)
+    G = routing.build_request_network(lane.source, lane.destination, base)
+    routes = routing.find_multimodal_routes(G, lane.source, lane.destination,
+                                            cargo_weight=weight, goods_type=goods_type)
+    pareto = routing.optimize_routes_pareto(G, routes, weight, goods_type)
+    refined = [routing.tabu_search(G, route, weight, goods_type, priority_int) for route, _ in pareto]
+
+    results = {
+        "geocoding": measure(resolve_endpoints, repeats, setup=forget_endpoints),
+        "road_augmentation": measure(
+            lambda: routing.build_request_network(lane.source, lane.destination, base), repeats),
+        "candidate_generation": measure(
+            lambda: routing.find_multimodal_routes(G, lane.source, lane.destination,
+                                                   cargo_weight=weight, goods_type=goods_type), repeats),
+        "evaluate_route": measure(
+            lambda: [routing.evaluate_route(G, route, weight, goods_type) for route in routes], repeats),
+        "prefilter": measure(
+            lambda: routing.summarize_routes_batch(G, routes, weight, goods_type), repeats),
+        "optimization": measure(
+            lambda: routing.optimize_routes(G, routes, weight, goods_type), repeats),
+        "nsga3": measure(
+            lambda: routing.optimize_routes_nsga3(G, routes, weight, goods_type), repeats),
+        "tabu": measure(
+            lambda: [routing.tabu_search(G, route, weight, goods_type, priority_int) for route, _ in pareto],
+            repeats, setup=clear_evaluations),
+        "ranking": measure(lambda: routing.rank_routes(refined, priority_int), repeats),
+        "get_routing": measure(
+            lambda: routing.get_routing(lane.source, lane.destination, lane.priority, lane.goods_type, weight),
+            repeats, setup=clear_evaluations),
+    }
+    return results
+
+
+def run_benchmarks(lanes: List[Lane], repeats: int) -> Dict[str, StageResult]:
+    """Results keyed "<lane>/<stage>" (lane-independent stages under "global")"""
+    import mock_nominatim
+    import mock_osrm
+    from mock_upstreams import configure_environment
+
+    osrm = mock_osrm.start_server()
+    nominatim = mock_nominatim.start_server()
+    try:
+        with tempfile.TemporaryDirectory(prefix="logilink-bench-") as workdir:
+            configure_environment(workdir, f"http://127.0.0.1:{osrm.server_port}",
+                                  f"http://127.0.0.1:{nominatim.server_port}")
+            import routing
+
+            routing.load_base_network()
+            results = {f"global/{stage}": result
+                       for stage, result in run_global_stages(routing, repeats).items()}
+            for lane in lanes:
+                for stage, result in run_lane(routing, lane, repeats).items():
+                    results[f"{lane.name}/{stage}"] = result
+            routing.geocode_store.close()
+            routing.road_leg_cache.close()
+            return results
+    finally:
+        osrm.shutdown()
+        nominatim.shutdown()
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_baseline(path: str, results: Dict[str, StageResult], repeats: int) -> None:
+    baseline = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "repeats": repeats,
+        },
+        "results": {key: result._asdict() for key, result in sorted(results.items())},
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def find_regressions(results: Dict[str, StageResult], baseline: Dict[str, Any],
+                     time_tolerance: float = TIME_TOLERANCE,
+                     memory_tolerance: float = MEMORY_TOLERANCE) -> Dict[str, List[str]]:
+    """Regression messages per result key, for results that have a baseline entry"""
+    regressions = {}
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            continue
+        messages = []
+        if (result.time_s > reference["time_s"] * (1 + time_tolerance) and
+                result.time_s - reference["time_s"] > MIN_TIME_DELTA_S):
+            messages.append(f"time {reference['time_s'] * 1000:.1f} -> {result.time_s * 1000:.1f} ms")
+        if (result.peak_kib > reference["peak_kib"] * (1 + memory_tolerance) and
+                result.peak_kib - reference["peak_kib"] > MIN_MEMORY_DELTA_KIB):
+            messages.append(f"peak {reference['peak_kib']:.0f} -> {result.peak_kib:.0f} KiB")
+        if messages:
+            regressions[key] = messages
+    return regressions
+
+
+def format_report(results: Dict[str, StageResult], baseline: Optional[Dict[str, Any]],
+                  regressions: Dict[str, List[str]]) -> str:
+    reference = (baseline or {}).get("results", {})
+    lines = [f"{'lane/stage':<44} {'median ms':>10} {'min ms':>9} {'vs base':>8} "
+             f"{'alloc KiB':>10} {'peak KiB':>10}"]
+    for key, result in results.items():
+        change = ""
+        if key in reference and reference[key]["time_s"] > 0:
+            change = f"{(result.time_s / reference[key]['time_s'] - 1) * 100:+.0f}%"
+        flag = "  REGRESSION" if key in regressions else ""
+        lines.append(f"{key:<44} {result.time_s * 1000:>10.2f} {result.min_time_s * 1000:>9.2f} {change:>8} "
+                     f"{result.alloc_kib:>10.0f} {result.peak_kib:>10.0f}{flag}")
+    for key, messages in regressions.items():
+        lines.append(f"REGRESSION {key}: {', '.join(messages)}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the routing pipeline against mock upstreams")
+    parser.add_argument("--lanes", nargs="+", choices=[lane.name for lane in LANES],
+                        help="lanes to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare with")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Dataset warnings (e.g. hubs the geocoder cannot place) repeat on every build
+    logging.basicConfig(level=os.environ.get("LOGILINK_LOG_LEVEL", "ERROR").upper())
+    lanes = [lane for lane in LANES if not args.lanes or lane.name in args.lanes]
+    results = run_benchmarks(lanes, args.repeats)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({key: result._asdict() for key, result in results.items()}, f, indent=2)
+
+    if args.update_baseline:
+        write_baseline(args.baseline, results, args.repeats)
+        print(format_report(results, None, {}))
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    regressions = find_regressions(results, baseline, args.time_tolerance, args.memory_tolerance) if baseline else {}
+    print(format_report(results, baseline, regressions))
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
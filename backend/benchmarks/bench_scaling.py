@@ -0,0 +1,215 @@
+"""
+Scaling benchmarks for the routing pipeline on synthetic networks.
+
+Generates networks of increasing size with synthetic_network.py and times
+each routing stage on them against the mock OSRM and Nominatim servers,
+reporting median wall time and peak traced memory per (size, stage). With
+matplotlib installed it also plots latency and memory against network
+size.
+
+Usage (from backend/):
+
+    python -m benchmarks.bench_scaling                              # 10^2 to 10^4 edges
+    python -m benchmarks.bench_scaling --sizes 100 1000 10000 100000 1000000 --repeats 1
+    python -m benchmarks.bench_scaling --plot scaling.png --json scaling.json
+
+Every stage runs repeats + 1 times per size (the last one under
+tracemalloc). The transfer table grows much faster than the network
+(about 10 s at 10^4 edges), so for 10^5 edges and up set
+LOGILINK_MAX_BACKBONE_LEGS=1 or 2 to keep the run tractable.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Dict, List, NamedTuple
+
+from benchmarks.bench_routing import StageResult, measure
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+
+class ScalingLane(NamedTuple):
+    name: str
+    source_country: str
+    destination_country: str
+    priority: str
+    goods_type: str
+    cargo_weight: float
+
+
+LANES = [
+    ScalingLane("domestic", "India", "India", "cost", "1", 1000.0),
+    ScalingLane("international", "India", "USA", "balanced", "2", 500.0),
+]
+
+
+class SizeResult(NamedTuple):
+    edges: int
+    nodes: int
+    stages: Dict[str, StageResult]
+
+
+def install_network(routing, data_dir: str, base, table) -> None:
+    """Swap in a synthetic base network built by the benchmark, with its datasets"""
+    routing.container_df = routing.load_container_data(os.path.join(data_dir, routing.CONTAINERS_CSV))
+    routing.location_database = routing.load_location_database(os.path.join(data_dir, routing.LOCATIONS_CSV))
+    base.graph['transfer_table'] = table
+    routing.install_base_network(base)
+
+
+def run_size(routing, synthetic_network, mock_nominatim, workdir: str, edges: int,
+             repeats: int) -> SizeResult:
+    network = synthetic_network.generate_network(os.path.join(workdir, f"network-{edges}"), edges)
+    locations = os.path.join(network.data_dir, synthetic_network.LOCATIONS_CSV)
+    # Hubs resolve from the geocode store; the mock only sees cache misses
+    mock_nominatim.MockNominatimHandler.places = mock_nominatim.load_places(locations)
+    routing.geocode_store.import_entries(mock_nominatim.recorded_geocodes(locations))
+
+    built = {}
+
+    def build():
+        built["base"] = routing.build_base_network(network.data_dir)
+
+    def index():
+        built["base"].graph.pop('hub_index', None)
+        return routing.get_hub_index(built["base"])
+
+    def table():
+        built["table"] = routing.build_transfer_table(built["base"])
+
+    stages = {
+        "network_build": measure(build, repeats),
+        "hub_index": measure(index, repeats),
+        "transfer_table": measure(table, repeats),
+    }
+    base = built.pop("base")
+    install_network(routing, network.data_dir, base, built.pop("table"))
+
+    for lane in LANES:
+        source = synthetic_network.city_name(lane.source_country, 0)
+        destination = synthetic_network.city_name(lane.destination_country, 1)
+        _, priority_int, goods_type = routing.parse_routing_options(lane.priority, lane.goods_type)
+        weight = lane.cargo_weight
+
+        # Warm-up: road legs come from the mock once, then from the cache
+        routing.get_routing(source, destination, lane.priority, lane.goods_type, weight)
+        G = routing.build_request_network(source, destination, base)
+        routes = routing.find_multimodal_routes(G, source, destination, cargo_weight=weight, goods_type=goods_type)
+        pareto = routing.optimize_routes_pareto(G, routes, weight, goods_type)
+
+        lane_stages = {
+            "road_augmentation": measure(
+                lambda: routing.build_request_network(source, destination, base), repeats),
+            "candidate_generation": measure(
+                lambda: routing.find_multimodal_routes(G, source, destination,
+                                                       cargo_weight=weight, goods_type=goods_type), repeats),
+            "tabu": measure(
+                lambda: [routing.tabu_search(G, route, weight, goods_type, priority_int) for route, _ in pareto],
+                repeats, setup=routing.evaluation_cache.invalidate),
+            "get_routing": measure(
+                lambda: routing.get_routing(source, destination, lane.priority, lane.goods_type, weight),
+                repeats, setup=routing.evaluation_cache.invalidate),
+        }
+        for stage, result in lane_stages.items():
+            stages[f"{lane.name}/{stage}"] = result
+
+    return SizeResult(base.number_of_edges(), base.number_of_nodes(), stages)
+
+
+def run_benchmarks(sizes: List[int], repeats: int) -> List[SizeResult]:
+    import mock_nominatim
+    import mock_osrm
+    import synthetic_network
+    from mock_upstreams import configure_environment
+
+    osrm = mock_osrm.start_server()
+    nominatim = mock_nominatim.start_server()
+    try:
+        with tempfile.TemporaryDirectory(prefix="logilink-scaling-") as workdir:
+            configure_environment(workdir, f"http://127.0.0.1:{osrm.server_port}",
+                                  f"http://127.0.0.1:{nominatim.server_port}")
+            import routing
+
+            results = []
+            for edges in sizes:
+                result = run_size(routing, synthetic_network, mock_nominatim, workdir, edges, repeats)
+                print(f"{edges} edges: {result.nodes} nodes, network built in "
+                      f"{result.stages['network_build'].time_s:.2f} s", file=sys.stderr)
+                results.append(result)
+            routing.geocode_store.close()
+            routing.road_leg_cache.close()
+            return results
+    finally:
+        osrm.shutdown()
+        nominatim.shutdown()
+
+
+def format_report(results: List[SizeResult]) -> str:
+    lines = [f"{'edges':>9} {'nodes':>8}  {'stage':<36} {'median ms':>10} {'peak KiB':>10}"]
+    for result in results:
+        for stage, stage_result in result.stages.items():
+            lines.append(f"{result.edges:>9} {result.nodes:>8}  {stage:<36} "
+                         f"{stage_result.time_s * 1000:>10.2f} {stage_result.peak_kib:>10.0f}")
+    return "\n".join(lines)
+
+
+def plot_results(results: List[SizeResult], path: str) -> bool:
+    """Latency and peak memory against edge count, one line per stage; False without matplotlib"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+
+    edges = [result.edges for result in results]
+    fig, (latency, memory) = plt.subplots(1, 2, figsize=(14, 6))
+    styles = {lane.name: style for lane, style in zip(LANES, ("--", ":"))}
+    for i, stage in enumerate(results[0].stages):
+        line = {"marker": "o", "label": stage, "color": plt.cm.tab20(i % 20),
+                "linestyle": styles.get(stage.split("/")[0], "-")}
+        latency.plot(edges, [result.stages[stage].time_s for result in results], **line)
+        memory.plot(edges, [result.stages[stage].peak_kib / 1024 for result in results], **line)
+    for axis, label in ((latency, "median wall time (s)"), (memory, "peak traced memory (MiB)")):
+        axis.set_xscale("log")
+        axis.set_yscale("log")
+        axis.set_xlabel("edges (flights + sailings)")
+        axis.set_ylabel(label)
+        axis.grid(True, which="both", alpha=0.3)
+    latency.legend(fontsize="small")
+    fig.suptitle("LogiLink routing stages on synthetic networks")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return True
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark routing stages against network size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="network sizes in edges (flights + sailings)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per stage")
+    parser.add_argument("--plot", default="scaling.png", help="plot file (needs matplotlib)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.environ.get("LOGILINK_LOG_LEVEL", "ERROR").upper())
+    results = run_benchmarks(sorted(args.sizes), args.repeats)
+    print(format_report(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([{"edges": result.edges, "nodes": result.nodes,
+                        "stages": {stage: r._asdict() for stage, r in result.stages.items()}}
+                       for result in results], f, indent=2)
+    if plot_results(results, args.plot):
+        print(f"\nPlot written to {args.plot}")
+    else:
+        print("\nmatplotlib is not installed; skipping the plot")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
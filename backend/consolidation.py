@@ -0,0 +1,173 @@
+"""
+Shipment consolidation: group compatible shipments on the same lane, pack
+them into road containers and split the cost of the shared route.
+
+Air and sea legs are priced per kg, so only road legs (priced per truck,
+one container each) get cheaper when loads share containers; packing is
+therefore done against the largest road container.
+"""
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Goods that may not share a container with other goods types: hazardous
+# cargo is segregated, perishables need reefers, oversized loads need their
+# own equipment. Everything else travels as general cargo.
+SEGREGATED_GOODS = ("hazardous", "perishable", "oversized")
+
+# Segment cost fields, all linear in the segment's base cost
+COST_FIELDS = ("base_cost", "adjusted_cost", "goods_impact", "customs_cost", "total_segment_cost")
+
+
+class Shipment(NamedTuple):
+    id: str
+    source: str
+    destination: str
+    priority: str       # API priority choice ("cost", "time", ...)
+    goods_type: str     # goods type name ("standard", "perishable", ...)
+    cargo_weight: float
+
+
+class ContainerLoad(NamedTuple):
+    pieces: Tuple[Tuple[int, float], ...]   # (shipment index within the group, kg)
+
+    @property
+    def load_kg(self) -> float:
+        return sum(kg for _, kg in self.pieces)
+
+
+class ShipmentGroup(NamedTuple):
+    source: str
+    destination: str
+    priority: str
+    goods_type: str             # costliest goods type in the group, used to route it
+    shipments: List[Shipment]
+
+    @property
+    def total_weight(self) -> float:
+        return sum(shipment.cargo_weight for shipment in self.shipments)
+
+
+def compatibility_class(goods_type: str) -> str:
+    return goods_type if goods_type in SEGREGATED_GOODS else "general"
+
+
+def lane_key(location: str) -> str:
+    """Spelling-insensitive key for a location, so "Mumbai" and " mumbai" share a lane"""
+    return " ".join(location.split()).casefold()
+
+
+def group_shipments(shipments: List[Shipment], multipliers: Dict[str, float]) -> List[ShipmentGroup]:
+    """
+    Groups of shipments with the same lane, priority and compatibility
+    class, in first-seen order. A group is routed as its costliest goods
+    type (by multipliers), so the route suits its most demanding cargo.
+    """
+    groups: Dict[Tuple[str, str, str, str], List[Shipment]] = {}
+    for shipment in shipments:
+        key = (lane_key(shipment.source), lane_key(shipment.destination), shipment.priority,
+               compatibility_class(shipment.goods_type))
+        groups.setdefault(key, []).append(shipment)
+
+    result = []
+    for members in groups.values():
+        goods_type = max((s.goods_type for s in members), key=lambda g: multipliers.get(g, 1.0))
+        first = members[0]
+        result.append(ShipmentGroup(first.source, first.destination, first.priority, goods_type, members))
+    return result
+
+
+def pack_first_fit_decreasing(weights: List[float], capacity: Optional[float]) -> List[ContainerLoad]:
+    """
+    Pack loads into containers of the given capacity with first-fit
+    decreasing. A load heavier than a container fills whole containers and
+    its remainder is packed like any other load. capacity None means a
+    single container of unlimited size.
+    """
+    if capacity is None:
+        return [ContainerLoad(tuple((i, w) for i, w in enumerate(weights)))]
+
+    full: List[ContainerLoad] = []
+    pieces: List[Tuple[int, float]] = []
+    for i, weight in enumerate(weights):
+        whole = int(weight // capacity)
+        full.extend(ContainerLoad(((i, capacity),)) for _ in range(whole))
+        remainder = weight - whole * capacity
+        if remainder > 0 or not whole:
+            pieces.append((i, remainder))
+
+    bins: List[List[Tuple[int, float]]] = []
+    free: List[float] = []
+    for i, kg in sorted(pieces, key=lambda piece: -piece[1]):
+        for b, space in enumerate(free):
+            if kg <= space:
+                bins[b].append((i, kg))
+                free[b] -= kg
+                break
+        else:
+            bins.append([(i, kg)])
+            free.append(capacity - kg)
+    return full + [ContainerLoad(tuple(pieces)) for pieces in bins]
+
+
+def set_road_containers(evaluation: Dict[str, Any], containers: int) -> Dict[str, Any]:
+    """
+    Re-price the road segments of an evaluation (modified in place) for a
+    given number of containers, e.g. the packed count instead of the
+    minimum one evaluate_route assumes for the total weight.
+    """
+    for segment in evaluation['segments']:
+        if segment['mode'] != 'road' or segment.get('containers', 1) == containers:
+            continue
+        factor = containers / segment.get('containers', 1)
+        for field in COST_FIELDS:
+            segment[field] *= factor
+        segment['containers'] = containers
+    evaluation['total_cost'] = sum(segment['total_segment_cost'] for segment in evaluation['segments'])
+    return evaluation
+
+
+def allocate_costs(evaluation: Dict[str, Any], shipments: List[Shipment], loads: List[ContainerLoad],
+                   rate: Callable[[str, str], float]) -> List[float]:
+    """
+    Split a consolidated route's base freight between its shipments and
+    apply each shipment's own goods surcharges: rate(goods_type, mode) is
+    total segment cost per unit of base cost. Road legs cost the same per
+    container, and a container's share is split by weight within it;
+    per-kg legs (air, sea) are split by weight. Returns one cost per
+    shipment.
+    """
+    total_weight = sum(shipment.cargo_weight for shipment in shipments)
+    if total_weight > 0:
+        weight_shares = [shipment.cargo_weight / total_weight for shipment in shipments]
+    else:
+        weight_shares = [1 / len(shipments)] * len(shipments)
+    container_shares = [0.0] * len(shipments)
+    for load in loads:
+        load_kg = load.load_kg
+        for i, kg in load.pieces:
+            container_shares[i] += (kg / load_kg if load_kg > 0 else 1 / len(load.pieces)) / len(loads)
+
+    costs = [0.0] * len(shipments)
+    for segment in evaluation['segments']:
+        mode = segment['mode']
+        shares = container_shares if mode == 'road' else weight_shares
+        for i, shipment in enumerate(shipments):
+            costs[i] += segment['base_cost'] * shares[i] * rate(shipment.goods_type, mode)
+    return costs
+
+
+def container_ids(loads: List[ContainerLoad], n_shipments: int) -> List[List[int]]:
+    """Indices of the containers each shipment was packed into"""
+    ids = [[] for _ in range(n_shipments)]
+    for c, load in enumerate(loads):
+        for i, _ in load.pieces:
+            if not ids[i] or ids[i][-1] != c:
+                ids[i].append(c)
+    return ids
+
+
+def savings(consolidated: float, standalone: float) -> float:
+    """Fraction of the standalone cost saved (0 when there is nothing to compare)"""
+    if not standalone or math.isinf(standalone):
+        return 0.0
+    return 1 - consolidated / standalone
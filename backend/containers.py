@@ -0,0 +1,146 @@
+import bisect
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Capacity shortfall (kg) still treated as fitting, so float weights do not
+# need an extra container for rounding noise
+CAPACITY_EPSILON = 1e-6
+
+
+class ContainerSpec(NamedTuple):
+    mode: str
+    name: str
+    capacity_kg: float
+    base_rate: float
+
+
+class LoadPlan(NamedTuple):
+    """Containers needed to move a load by one mode"""
+    mode: str
+    weight: float
+    containers: Tuple[Tuple[str, int], ...]    # (container type, count), largest type first
+    count: int
+    capacity_kg: float
+
+    @property
+    def utilisation(self) -> float:
+        return self.weight / self.capacity_kg if self.capacity_kg else 0.0
+
+    def describe(self) -> str:
+        return " + ".join(f"{count} x {name}" for name, count in self.containers)
+
+
+class ContainerIndex:
+    """
+    Container types per transport mode, sorted by weight capacity, so the
+    smallest container for a load is a binary search. Also plans how to
+    split a load that exceeds the largest container: the fewest containers,
+    and among those the mix with the least unused capacity.
+
+    Modes are matched case-insensitively ("Road" in containers.csv is "road"
+    on the network). A mode without containers needs one (unknown) unit per
+    load, so costs are unchanged when the table is missing.
+    """
+
+    def __init__(self, specs: Iterable[ContainerSpec]):
+        by_mode: Dict[str, List[ContainerSpec]] = {}
+        for spec in specs:
+            by_mode.setdefault(spec.mode.lower(), []).append(spec)
+        self.specs = {mode: sorted(items, key=lambda s: s.capacity_kg) for mode, items in by_mode.items()}
+        self.capacities = {mode: [s.capacity_kg for s in items] for mode, items in self.specs.items()}
+        self.max_capacity = {mode: capacities[-1] for mode, capacities in self.capacities.items()}
+        # Plans are cached per index, so a reloaded table never reuses old ones
+        self.plan = lru_cache(maxsize=4096)(self._plan)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "ContainerIndex":
+        """Index of the rows of containers.csv that have a valid capacity"""
+        if df.empty:
+            return cls([])
+        rates = pd.to_numeric(df["Base Freight Rate ($)"], errors="coerce").fillna(0.0)
+        return cls(ContainerSpec(str(mode), str(name), float(capacity), float(rate))
+                   for mode, name, capacity, rate in zip(df["Transport Mode"], df["Container Type"],
+                                                         df["Weight Capacity (kg)"], rates)
+                   if pd.notna(capacity) and capacity > 0)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.specs.values())
+
+    def smallest_fitting(self, mode: str, weight: float) -> Optional[ContainerSpec]:
+        """Smallest container of the mode that holds weight, or None if none does"""
+        mode = mode.lower()
+        capacities = self.capacities.get(mode)
+        if not capacities:
+            return None
+        i = bisect.bisect_left(capacities, weight - CAPACITY_EPSILON)
+        return self.specs[mode][i] if i < len(capacities) else None
+
+    def container_type(self, mode: str, weight: float) -> Tuple[str, bool]:
+        """
+        (container type, exceeds) for a load: the smallest container that
+        holds it, or the largest one with exceeds=True.
+        """
+        spec = self.smallest_fitting(mode, weight)
+        if spec is not None:
+            return spec.name, False
+        specs = self.specs.get(mode.lower())
+        if not specs:
+            return "Unknown container type", False
+        return f"Exceeds {specs[-1].name} capacity ({specs[-1].capacity_kg:g} kg)", True
+
+    def count(self, mode: str, weight: float) -> int:
+        """Fewest containers (at least one) that carry weight by this mode"""
+        capacity = self.max_capacity.get(mode.lower())
+        if capacity is None or weight <= capacity + CAPACITY_EPSILON:
+            return 1
+        return math.ceil((weight - CAPACITY_EPSILON) / capacity)
+
+    def counts(self, mode: str, weights: np.ndarray) -> np.ndarray:
+        """count() for an array of weights"""
+        weights = np.asarray(weights, dtype=float)
+        capacity = self.max_capacity.get(mode.lower())
+        if capacity is None:
+            return np.ones(weights.shape, dtype=np.int64)
+        return np.maximum(1, np.ceil((weights - CAPACITY_EPSILON) / capacity)).astype(np.int64)
+
+    def _plan(self, mode: str, weight: float) -> LoadPlan:
+        mode = mode.lower()
+        specs = self.specs.get(mode)
+        if not specs:
+            return LoadPlan(mode, weight, (("Unknown container type", 1),), 1, 0.0)
+        n = self.count(mode, weight)
+        if n == 1:
+            spec = self.smallest_fitting(mode, weight)
+            return LoadPlan(mode, weight, ((spec.name, 1),), 1, spec.capacity_kg)
+
+        # Start from n of the largest container. Swapping one for a smaller
+        # type frees (largest - smaller) kg of capacity; pick the swaps that
+        # free the most capacity without dropping below the load. Fewer than
+        # largest / smallest-gap swaps can ever fit, so the search is small.
+        largest = specs[-1]
+        smaller = [s for s in specs[:-1] if s.capacity_kg < largest.capacity_kg]
+        slack = n * largest.capacity_kg - weight + CAPACITY_EPSILON
+        best_freed, best_swaps = 0.0, ()
+
+        def search(i: int, freed: float, slots: int, swaps: Tuple[int, ...]) -> None:
+            nonlocal best_freed, best_swaps
+            if freed > best_freed:
+                best_freed, best_swaps = freed, swaps
+            if i == len(smaller):
+                return
+            gap = largest.capacity_kg - smaller[i].capacity_kg
+            most = min(slots, int((slack - freed) // gap))
+            for k in range(most, -1, -1):
+                search(i + 1, freed + k * gap, slots - k, swaps + (k,))
+
+        search(0, 0.0, n, ())
+        counts = {largest.name: n - sum(best_swaps)}
+        for spec, k in zip(smaller, best_swaps):
+            if k:
+                counts[spec.name] = counts.get(spec.name, 0) + k
+        containers = tuple((name, count) for name, count in counts.items() if count)
+        return LoadPlan(mode, weight, containers, n, n * largest.capacity_kg - best_freed)
@@ -0,0 +1,315 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+MODES = ("road", "air", "sea")
+
+# Numeric edge attributes stored as typed columns
+EDGE_COLUMNS = ("cost_per_kg", "time_hr", "distance_km", "total_cost", "fuel_cost", "toll_cost", "driver_wage")
+
+
+class NodeColumn:
+    """
+    Dictionary-encoded node attribute: an int32 code per node indexing a
+    table of distinct values, -1 where the node does not have the attribute.
+    Node types and countries repeat heavily, so the table stays small.
+    """
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: List[Any], codes: np.ndarray):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def from_attrs(cls, key: str, attrs: List[Dict[str, Any]]) -> "NodeColumn":
+        values, lookup = [], {}
+        codes = np.full(len(attrs), -1, dtype=np.int32)
+        for i, data in enumerate(attrs):
+            if key in data:
+                value = data[key]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(values)
+                    values.append(value)
+                codes[i] = code
+        return cls(values, codes)
+
+
+class CSREdgeView(Mapping):
+    """Read-only attribute mapping of one edge, read from the edge columns"""
+
+    __slots__ = ("_graph", "_eid")
+
+    def __init__(self, graph: "CSRGraph", eid: int):
+        self._graph = graph
+        self._eid = eid
+
+    def __getitem__(self, key):
+        graph, eid = self._graph, self._eid
+        if key == "mode":
+            return MODES[graph.edge_mode[eid]]
+        if key in graph.columns:
+            if not graph.present[key][eid]:
+                raise KeyError(key)
+            if graph.is_none[key][eid]:
+                return None
+            return float(graph.columns[key][eid])
+        if key == "geometry" and eid in graph.geometry:
+            return graph.geometry[eid]
+        extras = graph.extras.get(eid)
+        if extras is not None and key in extras:
+            return extras[key]
+        raise KeyError(key)
+
+    def _keys(self) -> List[str]:
+        graph, eid = self._graph, self._eid
+        keys = ["mode"] + [name for name in EDGE_COLUMNS if graph.present[name][eid]]
+        if eid in graph.geometry:
+            keys.append("geometry")
+        keys.extend(graph.extras.get(eid, ()))
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+class CSRAdjacencyRow(Mapping):
+    """Successors (or predecessors) of one node: neighbour name -> edge view"""
+
+    __slots__ = ("_graph", "_targets", "_eids")
+
+    def __init__(self, graph: "CSRGraph", targets: np.ndarray, eids: np.ndarray):
+        self._graph = graph
+        self._targets = targets
+        self._eids = eids
+
+    def _position(self, node) -> int:
+        idx = self._graph.node_index.get(node)
+        if idx is None:
+            return -1
+        pos = int(np.searchsorted(self._targets, idx))
+        if pos < len(self._targets) and self._targets[pos] == idx:
+            return pos
+        return -1
+
+    def __getitem__(self, node) -> CSREdgeView:
+        pos = self._position(node)
+        if pos < 0:
+            raise KeyError(node)
+        return CSREdgeView(self._graph, int(self._eids[pos]))
+
+    def __contains__(self, node) -> bool:
+        return self._position(node) >= 0
+
+    def __iter__(self) -> Iterator:
+        names = self._graph.node_names
+        return (names[i] for i in self._targets.tolist())
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def items(self):
+        names, graph = self._graph.node_names, self._graph
+        return [(names[i], CSREdgeView(graph, e)) for i, e in zip(self._targets.tolist(), self._eids.tolist())]
+
+
+class CSRAdjacency:
+    """G.succ / G.pred of a CSRGraph"""
+
+    def __init__(self, graph: "CSRGraph", indptr: np.ndarray, targets: np.ndarray, eids: np.ndarray):
+        self._graph = graph
+        self._indptr = indptr
+        self._targets = targets
+        self._eids = eids
+
+    def __getitem__(self, node) -> CSRAdjacencyRow:
+        idx = self._graph.node_index[node]
+        lo, hi = self._indptr[idx], self._indptr[idx + 1]
+        return CSRAdjacencyRow(self._graph, self._targets[lo:hi], self._eids[lo:hi])
+
+    def __contains__(self, node) -> bool:
+        return node in self._graph.node_index
+
+
+class CSRNodeView:
+    """G.nodes of a CSRGraph: G.nodes[n], G.nodes(data=True), iteration and membership"""
+
+    def __init__(self, graph: "CSRGraph"):
+        self._graph = graph
+
+    def __getitem__(self, node) -> Dict[str, Any]:
+        return self._graph._node_attrs(self._graph.node_index[node])
+
+    def __contains__(self, node) -> bool:
+        return node in self._graph.node_index
+
+    def __iter__(self) -> Iterator:
+        return iter(self._graph.node_names)
+
+    def __len__(self) -> int:
+        return len(self._graph.node_names)
+
+    def __call__(self, data: bool = False):
+        if data:
+            return self.items()
+        return list(self._graph.node_names)
+
+    def items(self):
+        graph = self._graph
+        return [(name, graph._node_attrs(i)) for i, name in enumerate(graph.node_names)]
+
+
+class CSRGraph:
+    """
+    Immutable array-backed directed graph for routing.
+
+    Nodes are integer IDs (in the source graph's node order) with attributes
+    held as dictionary-encoded columns. Adjacency is stored as CSR arrays in both directions,
+    with neighbours sorted by ID so edge lookup is a binary search. Edge
+    attributes are typed numpy columns; road geometries and any other
+    attributes live in side tables keyed by edge ID, outside the arrays the
+    routing loops touch.
+
+    Exposes the part of the networkx.DiGraph API the router uses (nodes,
+    succ/pred, G[u][v], has_edge, edges), so find_multimodal_routes,
+    evaluate_route and tabu_search run on it unchanged.
+    """
+
+    def __init__(self, node_names: List, node_columns: Dict[str, NodeColumn], src: np.ndarray, dst: np.ndarray,
+                 edge_mode: np.ndarray, columns: Dict[str, np.ndarray], present: Dict[str, np.ndarray],
+                 is_none: Dict[str, np.ndarray], geometry: Dict[int, str], extras: Dict[int, Dict[str, Any]],
+                 graph: Dict[str, Any] = None):
+        self.node_names = list(node_names)
+        self.node_index = {name: i for i, name in enumerate(self.node_names)}
+        self.node_columns = node_columns
+        self.edge_mode = edge_mode
+        self.columns = columns
+        self.present = present
+        self.is_none = is_none
+        self.geometry = geometry
+        self.extras = extras
+        self.graph = dict(graph or {})
+        self.mutations = 0
+        self.src = src
+        self.dst = dst
+
+        n = len(self.node_names)
+        order = np.lexsort((dst, src))
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n)))).astype(np.int64)
+        self._succ_targets = dst[order]
+        self._succ_eids = order.astype(np.int32)
+        rorder = np.lexsort((src, dst))
+        self._rindptr = np.concatenate(([0], np.cumsum(np.bincount(dst, minlength=n)))).astype(np.int64)
+        self._pred_targets = src[rorder]
+        self._pred_eids = rorder.astype(np.int32)
+
+    @classmethod
+    def from_graph(cls, G, version: Optional[str] = None) -> "CSRGraph":
+        """Compact copy of a networkx graph or request overlay"""
+        node_names = list(G)
+        index = {name: i for i, name in enumerate(node_names)}
+        attrs = [G.nodes[name] for name in node_names]
+        node_keys = list(dict.fromkeys(key for data in attrs for key in data))
+        node_columns = {key: NodeColumn.from_attrs(key, attrs) for key in node_keys}
+
+        edges = list(G.edges(data=True))
+        m = len(edges)
+        src = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int32, count=m)
+        dst = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int32, count=m)
+        edge_mode = np.fromiter((MODES.index(d["mode"]) for _, _, d in edges), dtype=np.int8, count=m)
+        columns = {name: np.full(m, np.nan) for name in EDGE_COLUMNS}
+        present = {name: np.zeros(m, dtype=bool) for name in EDGE_COLUMNS}
+        is_none = {name: np.zeros(m, dtype=bool) for name in EDGE_COLUMNS}
+        geometry, extras = {}, {}
+
+        for eid, (_, _, data) in enumerate(edges):
+            for key, value in data.items():
+                if key == "mode":
+                    continue
+                if key in columns:
+                    present[key][eid] = True
+                    if value is None:
+                        is_none[key][eid] = True
+                    else:
+                        columns[key][eid] = value
+                elif key == "geometry":
+                    geometry[eid] = value
+                else:
+                    extras.setdefault(eid, {})[key] = value
+
+        graph = {"version": version if version is not None else G.graph.get("version")}
+        return cls(node_names, node_columns, src, dst, edge_mode, columns, present, is_none,
+                   geometry, extras, graph)
+
+    def _node_attrs(self, i: int) -> Dict[str, Any]:
+        attrs = {}
+        for key, column in self.node_columns.items():
+            code = column.codes[i]
+            if code >= 0:
+                attrs[key] = column.values[code]
+        return attrs
+
+    # ----- networkx-compatible read API -----
+    @property
+    def nodes(self) -> CSRNodeView:
+        return CSRNodeView(self)
+
+    @property
+    def succ(self) -> CSRAdjacency:
+        return CSRAdjacency(self, self._indptr, self._succ_targets, self._succ_eids)
+
+    adj = succ
+
+    @property
+    def pred(self) -> CSRAdjacency:
+        return CSRAdjacency(self, self._rindptr, self._pred_targets, self._pred_eids)
+
+    def __getitem__(self, node) -> CSRAdjacencyRow:
+        return self.succ[node]
+
+    def __contains__(self, node) -> bool:
+        return node in self.node_index
+
+    def __iter__(self) -> Iterator:
+        return iter(self.node_names)
+
+    def __len__(self) -> int:
+        return len(self.node_names)
+
+    def has_node(self, node) -> bool:
+        return node in self.node_index
+
+    def has_edge(self, u, v) -> bool:
+        return u in self.node_index and v in self.succ[u]
+
+    def successors(self, node) -> Iterator:
+        return iter(self.succ[node])
+
+    def predecessors(self, node) -> Iterator:
+        return iter(self.pred[node])
+
+    def edges(self, data: bool = False):
+        names = self.node_names
+        for u in range(len(names)):
+            lo, hi = self._indptr[u], self._indptr[u + 1]
+            for v, eid in zip(self._succ_targets[lo:hi].tolist(), self._succ_eids[lo:hi].tolist()):
+                yield (names[u], names[v], CSREdgeView(self, eid)) if data else (names[u], names[v])
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_names)
+
+    def number_of_edges(self) -> int:
+        return len(self.edge_mode)
+
+    def nbytes(self) -> int:
+        """Bytes held by the node, edge and adjacency arrays (excluding side tables)"""
+        arrays = [self.edge_mode, self.src, self.dst, self._indptr, self._succ_targets, self._succ_eids,
+                  self._rindptr, self._pred_targets, self._pred_eids]
+        arrays += list(self.columns.values()) + list(self.present.values()) + list(self.is_none.values())
+        arrays += [column.codes for column in self.node_columns.values()]
+        return sum(a.nbytes for a in arrays)
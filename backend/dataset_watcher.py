@@ -0,0 +1,63 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetWatcher:
+    """
+    Polls dataset files for changes (modification time and size) on a
+    background thread and calls on_change with the names of the files that
+    changed. Polling keeps this dependency-free and works on network mounts
+    where filesystem notifications are unreliable.
+    """
+
+    def __init__(self, data_dir: str, filenames: Iterable[str],
+                 on_change: Callable[[List[str]], None], interval: float = 30.0):
+        self.data_dir = data_dir
+        self.filenames = list(filenames)
+        self.on_change = on_change
+        self.interval = interval
+        self._stamps = self._snapshot()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _snapshot(self) -> Dict[str, Optional[Tuple[float, int]]]:
+        stamps = {}
+        for name in self.filenames:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, name))
+                stamps[name] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def check(self) -> List[str]:
+        """Report files changed since the last check, calling on_change if any"""
+        stamps = self._snapshot()
+        changed = [name for name in self.filenames if stamps[name] != self._stamps.get(name)]
+        self._stamps = stamps
+        if changed:
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                logger.error("Error reloading datasets %s: %s", changed, e)
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "DatasetWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
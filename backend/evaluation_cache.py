@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class EvaluationCache:
+    """
+    Bounded LRU cache of route evaluations keyed on
+    (graph version, route tuple, cargo weight, goods type).
+
+    Keys carry the version of the network they were computed on, so results
+    are shared across requests that see the same network and can never leak
+    across data reloads. invalidate() drops one version (or everything)
+    explicitly when the data changes.
+    """
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._by_version: Dict[Hashable, Set[Tuple]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version: Hashable, route, cargo_weight: float, goods_type: str) -> Tuple:
+        return (version, tuple(route), float(cargo_weight), goods_type)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple, value: Dict[str, Any]) -> None:
+        with self._lock:
+            if key not in self._entries:
+                self._by_version.setdefault(key[0], set()).add(key)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._discard_version_key(old_key)
+
+    def _discard_version_key(self, key: Tuple) -> None:
+        # Caller holds self._lock
+        keys = self._by_version.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_version[key[0]]
+
+    def invalidate(self, version: Hashable = None) -> int:
+        """
+        Drop all entries computed on the given graph version, or every entry
+        if no version is given. Returns the number of entries removed.
+        """
+        with self._lock:
+            if version is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._by_version.clear()
+                return removed
+            removed = 0
+            for key in self._by_version.pop(version, set()):
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+            return removed
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop all entries whose (string) graph version starts with prefix"""
+        with self._lock:
+            versions = [v for v in self._by_version if isinstance(v, str) and v.startswith(prefix)]
+        return sum(self.invalidate(v) for v in versions)
+
+    def __len__(self) -> int:
+        return len(self._entries)
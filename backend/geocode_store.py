@@ -0,0 +1,162 @@
+import logging
+import os.path
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class GeocodeStore:
+    """
+    Persistent geocode cache backed by SQLite.
+
+    Lookups are single-key reads on the primary-key index, so they stay fast
+    regardless of cache size. New entries are buffered in memory and written
+    in batches inside one transaction. SQLite's WAL mode and busy timeout make
+    it safe for several threads (or worker processes) to write concurrently.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._pending: Dict[str, Tuple[str, str]] = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " location TEXT PRIMARY KEY,"
+            " coords TEXT NOT NULL,"
+            " country TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS geocode_updated_at ON geocode (updated_at)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, location: str) -> Optional[Tuple[str, str]]:
+        """Return (coords, country) for a location, or None if not cached"""
+        with self._pending_lock:
+            if location in self._pending:
+                return self._pending[location]
+        row = self._connection().execute(
+            "SELECT coords, country FROM geocode WHERE location = ?", (location,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, location: str, coords: str, country: str) -> None:
+        """Queue an entry; the batch is written once it is full or stale"""
+        with self._pending_lock:
+            self._pending[location] = (coords, country)
+            due = (len(self._pending) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all queued entries in a single transaction"""
+        with self._pending_lock:
+            if not self._pending:
+                self._last_flush = time.monotonic()
+                return 0
+            batch = self._pending
+            self._pending = {}
+            self._last_flush = time.monotonic()
+
+        now = time.time()
+        rows = [(loc, coords, country, now) for loc, (coords, country) in batch.items()]
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO geocode (location, coords, country, updated_at) "
+                    "VALUES (?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            logger.warning("Could not save to geocode store: %s", e)
+            # Put the batch back so it is retried on the next flush
+            with self._pending_lock:
+                for loc, value in batch.items():
+                    self._pending.setdefault(loc, value)
+            return 0
+        return len(rows)
+
+    def items(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over all (location, coords, country) entries"""
+        self.flush()
+        yield from self._connection().execute("SELECT location, coords, country FROM geocode")
+
+    def recent(self, limit: int) -> List[Tuple[str, str, str]]:
+        """The `limit` most recently written (location, coords, country) entries"""
+        self.flush()
+        return self._connection().execute(
+            "SELECT location, coords, country FROM geocode ORDER BY updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection().execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def import_entries(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        """Bulk-load (location, coords, country) entries, keeping existing ones"""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO geocode (location, coords, country, updated_at) "
+                "VALUES (?, ?, ?, ?)", [(loc, coords, country, now) for loc, coords, country in rows]
+            )
+        return cursor.rowcount
+
+    def import_pickle(self, pickle_path: str) -> int:
+        """
+        Migrate entries from the legacy geocode_cache.pkl file, then rename it
+        to <name>.migrated so later startups skip it.
+        """
+        if not os.path.exists(pickle_path):
+            return 0
+        try:
+            with open(pickle_path, 'rb') as f:
+                cache_data = pickle.load(f)
+        except Exception as e:
+            logger.warning("Could not load legacy cache %s: %s", pickle_path, e)
+            return 0
+
+        now = time.time()
+        rows: List[Tuple[str, str, str, float]] = [
+            (loc, coords, country, now) for loc, (coords, country) in cache_data.items()
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO geocode (location, coords, country, updated_at) "
+                "VALUES (?, ?, ?, ?)", rows
+            )
+        try:
+            os.replace(pickle_path, pickle_path + ".migrated")
+        except OSError as e:
+            logger.warning("Could not rename migrated cache %s (delete it to skip re-importing): %s",
+                           pickle_path, e)
+        return len(rows)
+
+    def close(self) -> None:
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+Vector = Tuple[float, ...]
+
+
+class Label:
+    """A partial path: its objective vector, hop count and parent label"""
+
+    __slots__ = ("state", "cost", "hops", "parent", "alive", "permanent")
+
+    def __init__(self, state: Hashable, cost: Vector, hops: int, parent: Optional["Label"]):
+        self.state = state
+        self.cost = cost
+        self.hops = hops
+        self.parent = parent
+        self.alive = True
+        self.permanent = False
+
+    def path(self) -> List[Hashable]:
+        states = []
+        label = self
+        while label is not None:
+            states.append(label.state)
+            label = label.parent
+        return states[::-1]
+
+
+def _no_worse(a: Vector, b: Vector) -> bool:
+    return all(x <= y for x, y in zip(a, b))
+
+
+def _label_setting(source: Hashable,
+                   is_target: Optional[Callable[[Hashable], bool]],
+                   expand: Callable[[Hashable], Iterable[Tuple[Hashable, Vector]]],
+                   n_objectives: int,
+                   max_hops: Optional[int]) -> Tuple[Dict[Hashable, List[Label]], List[Label]]:
+    counter = itertools.count()
+    start = Label(source, (0.0,) * n_objectives, 0, None)
+    bags: Dict[Hashable, List[Label]] = {source: [start]}
+    target_labels: List[Label] = []
+    heap = [(start.cost, next(counter), start)]
+    settled = []
+
+    while heap:
+        _, _, label = heapq.heappop(heap)
+        if not label.alive:
+            continue
+        label.permanent = True
+        if is_target is not None and is_target(label.state):
+            settled.append(label)
+            continue
+        if max_hops is not None and label.hops >= max_hops:
+            continue
+
+        for state, edge_cost in expand(label.state):
+            cost = tuple(a + b for a, b in zip(label.cost, edge_cost))
+            hops = label.hops + 1
+            if any(t.alive and _no_worse(t.cost, cost) for t in target_labels):
+                continue
+
+            bag = bags.setdefault(state, [])
+            if any(other.alive and _no_worse(other.cost, cost) and
+                   (max_hops is None or other.hops <= hops) for other in bag):
+                continue
+            for other in bag:
+                if (not other.permanent and _no_worse(cost, other.cost) and
+                        (max_hops is None or hops <= other.hops)):
+                    other.alive = False
+            bag[:] = [other for other in bag if other.alive]
+
+            new_label = Label(state, cost, hops, label)
+            bag.append(new_label)
+            if is_target is not None and is_target(state):
+                target_labels.append(new_label)
+            heapq.heappush(heap, (cost, next(counter), new_label))
+
+    return bags, settled
+
+
+def pareto_paths(source: Hashable,
+                 is_target: Callable[[Hashable], bool],
+                 expand: Callable[[Hashable], Iterable[Tuple[Hashable, Vector]]],
+                 n_objectives: int,
+                 max_hops: Optional[int] = None) -> List[Tuple[Vector, List[Hashable]]]:
+    """
+    Martins-style multi-criteria label-setting search.
+
+    Labels are settled in lexicographic order of their objective vectors, so
+    a settled label can never be dominated later. A new label is dropped if
+    a label at the same state is no worse in every objective and hop count,
+    or if a label already at a target is no worse in every objective (all
+    edge vectors must be non-negative). expand(state) yields
+    (next_state, edge_vector) pairs.
+
+    Returns the Pareto-optimal (objective vector, state path) pairs for all
+    target states, in lexicographic order of objective vector.
+    """
+    _, settled = _label_setting(source, is_target, expand, n_objectives, max_hops)
+    return [(label.cost, label.path()) for label in settled if label.alive]
+
+
+def pareto_paths_from(source: Hashable,
+                      expand: Callable[[Hashable], Iterable[Tuple[Hashable, Vector]]],
+                      n_objectives: int,
+                      max_hops: Optional[int] = None) -> Dict[Hashable, List[Tuple[Vector, List[Hashable]]]]:
+    """
+    One-to-all variant of pareto_paths: the Pareto-optimal paths from source
+    to every reachable state (excluding source itself), in lexicographic
+    order of objective vector. Labels kept only for their lower hop count
+    are dropped from the result.
+    """
+    bags, _ = _label_setting(source, None, expand, n_objectives, max_hops)
+    result = {}
+    for state, labels in bags.items():
+        if state == source:
+            continue
+        labels = sorted(labels, key=lambda label: label.cost)
+        front = []
+        for label in labels:
+            if not any(_no_worse(kept.cost, label.cost) for kept in front):
+                front.append(label)
+        result[state] = [(label.cost, label.path()) for label in front]
+    return result
@@ -1,12 +1,69 @@
-from fastapi import FastAPI
-from routing import get_routing
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+import json
+import logging
+import os
+import tempfile
+from routing import (CONTAINERS_CSV, DATA_DIR, FLIGHTS_CSV, LOCATIONS_CSV, SHIPPING_CSV, get_dataset_version,
+                     load_base_network, reload_datasets, reprice_routes)
+from dataset_watcher import DatasetWatcher
+from async_routing import (close_http_client, consolidate_routing_async, cpu_executor, get_routing_batch_async,
+                           get_routing_with_network_async, stream_routing_async)
+from response_cache import CachedRouting, ResponseCache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, REQUESTS, count_cache, time_stage
+from profiler import DEFAULT_INTERVAL as DEFAULT_PROFILE_INTERVAL, SamplingProfiler, profile_path
 from enum import Enum
 import uvicorn
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+# Log level for the backend (DEBUG adds per-request optimizer progress)
+LOG_LEVEL = os.environ.get("LOGILINK_LOG_LEVEL", "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+# httpx logs every OSRM/Nominatim request at INFO; upstream calls are counted in /metrics instead
+logging.getLogger("httpx").setLevel(max(logging.WARNING, logging.getLogger().level))
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for edited dataset files (0 disables hot reload)
+RELOAD_INTERVAL = float(os.environ.get("LOGILINK_RELOAD_INTERVAL", 30))
+
+# Admin switch for per-request profiling (?profile=true or X-LogiLink-Profile: 1 on /routes)
+PROFILING_ENABLED = os.environ.get("LOGILINK_PROFILING", "0") == "1"
+PROFILE_DIR = os.environ.get("LOGILINK_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "logilink-profiles"))
+PROFILE_INTERVAL = float(os.environ.get("LOGILINK_PROFILE_INTERVAL", DEFAULT_PROFILE_INTERVAL))
+
+
+def on_datasets_changed(changed: list[str]):
+    logger.info("Dataset files changed: %s", changed)
+    if reload_datasets(changed):
+        # Location and container edits change responses without a new network version
+        response_cache.clear()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared base network once, before serving any request
+    load_base_network()
+    watcher = None
+    if RELOAD_INTERVAL > 0:
+        watcher = DatasetWatcher(DATA_DIR, [FLIGHTS_CSV, SHIPPING_CSV, CONTAINERS_CSV, LOCATIONS_CSV],
+                                 on_datasets_changed, RELOAD_INTERVAL).start()
+    yield
+    if watcher is not None:
+        watcher.stop()
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Completed /routes results; weights within 10% share an entry and are re-priced
+response_cache = ResponseCache(
+    max_bytes=int(os.environ.get("LOGILINK_RESPONSE_CACHE_MB", 256)) * 1024 * 1024,
+    weight_step=float(os.environ.get("LOGILINK_RESPONSE_CACHE_WEIGHT_STEP", 0.1)),
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Adjust this to your needs
@@ -25,9 +82,10 @@ class Segment(BaseModel):
     base_cost: float
     goods_type_multiplier: float
     adjusted_cost: float
-    goods_impact: int
+    goods_impact: float
     customs_cost: float
     total_segment_cost: float
+    containers: int = 1
     geometry: str | None = None
     coordinates: list[tuple[float, float]]
 
@@ -39,7 +97,7 @@ class Data(BaseModel):
     total_distance: float
     total_emissions: float
     goods_type: str
-    goods_type_score: int
+    goods_type_score: float
     segments: list[Segment]
     modes: list[str]
 
@@ -65,19 +123,74 @@ class GoodsType(str, Enum):
     HIGH_VALUE = "6"
 
 
-@app.get("/routes/{source}/{destination}", response_model=list[Route])
-async def routes(source: str,
-                 destination: str,
-                 priority: Priority = Priority.BALANCED,
-                 goods_type: str = GoodsType.STANDARD,
-                 cargo_weight: float = 0):
-    print(f"REQUEST: {source}, {destination}, {priority}, {goods_type}, {cargo_weight}")
-    
-    res = get_routing(source, destination, priority, goods_type, cargo_weight)
+class RouteJob(BaseModel):
+    source: str
+    destination: str
+    priority: Priority = Priority.BALANCED
+    goods_type: str = GoodsType.STANDARD
+    cargo_weight: float = 0
+
+
+class BatchRequest(BaseModel):
+    jobs: list[RouteJob]
+
+
+class BatchResult(BaseModel):
+    routes: list[Route] | None = None
+    error: str | None = None
+
+
+class ShipmentJob(RouteJob):
+    id: str | None = None
+
+
+class ConsolidationRequest(BaseModel):
+    shipments: list[ShipmentJob]
+
+
+class ContainerLoad(BaseModel):
+    container_type: str
+    load_kg: float
+    shipments: list[str]
+
+
+class ShipmentAllocation(BaseModel):
+    id: str
+    cargo_weight: float
+    goods_type: str
+    containers: list[int]
+    allocated_cost: float
+    standalone_cost: float
+
+
+class ConsolidatedGroup(BaseModel):
+    source: str
+    destination: str
+    priority: str
+    goods_type: str
+    total_weight: float
+    containers: list[ContainerLoad]
+    route: Route | None = None
+    allocations: list[ShipmentAllocation]
+    error: str | None = None
+
+
+class ConsolidationResult(BaseModel):
+    groups: list[ConsolidatedGroup]
+    shipments: int
+    route_computations: int
+    total_cost: float
+    standalone_cost: float
+    savings: float
 
+
+routes_adapter = TypeAdapter(list[Route])
+
+
+def to_routes(res) -> list[dict]:
     routes = []
 
-    for routing_info, data_dict in res:
+    for routing_info, data_dict in res or []:
         output = {
             "overview": routing_info,
             "data": data_dict
@@ -87,6 +200,150 @@ async def routes(source: str,
 
     return routes
 
+
+def serialize_routes(res) -> bytes:
+    """JSON body of a /routes response, validated against the Route model"""
+    with time_stage("serialization"):
+        return routes_adapter.dump_json(routes_adapter.validate_python(to_routes(res)))
+
+
+async def serialize_routes_async(res) -> bytes:
+    """serialize_routes on the CPU pool, off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor, serialize_routes, res)
+
+
+def reprice_response(cached: CachedRouting, priority: Priority, goods_type: str, cargo_weight: float) -> bytes:
+    """Body of a /routes response for a cache hit at a different cargo weight"""
+    return serialize_routes(reprice_routes(cached.network, cached.routes, priority, goods_type, cargo_weight))
+
+
+def json_response(body: bytes, headers: dict = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def profiled_routing(source: str, destination: str, priority: Priority, goods_type: str,
+                           cargo_weight: float):
+    """Run one request under the sampling profiler; returns (network, routes, profile id)"""
+    profiler = SamplingProfiler(PROFILE_INTERVAL)
+    with profiler.profile_task():
+        G, res = await get_routing_with_network_async(source, destination, priority, goods_type, cargo_weight,
+                                                      profiler=profiler)
+    profile_id = profiler.save(PROFILE_DIR)
+    logger.info("Profile %s: %s -> %s, %d samples over %.2f s", profile_id, source, destination,
+                profiler.samples, profiler.duration)
+    return G, res, profile_id
+
+
+@app.get("/routes/{source}/{destination}", response_model=list[Route])
+async def routes(source: str,
+                 destination: str,
+                 priority: Priority = Priority.BALANCED,
+                 goods_type: str = GoodsType.STANDARD,
+                 cargo_weight: float = 0,
+                 profile: bool = False,
+                 x_logilink_profile: str | None = Header(default=None)):
+    logger.debug("REQUEST: %s, %s, %s, %s, %s", source, destination, priority, goods_type, cargo_weight)
+    REQUESTS.inc(endpoint="routes")
+
+    if PROFILING_ENABLED and (profile or x_logilink_profile in ("1", "true")):
+        # Always computed (never served from the cache), so there is something to profile
+        G, res, profile_id = await profiled_routing(source, destination, priority, goods_type, cargo_weight)
+        return json_response(await serialize_routes_async(res), headers={"X-LogiLink-Profile-Id": profile_id})
+    
+    key = response_cache.key(source, destination, priority, goods_type, cargo_weight, get_dataset_version())
+    cached = response_cache.get(key)
+    count_cache("response", cached is not None)
+    if cached is not None:
+        if cached.cargo_weight == cargo_weight:
+            return json_response(cached.response)
+        # Re-evaluation and serialization are CPU work; keep them off the event loop
+        body = await asyncio.get_running_loop().run_in_executor(
+            cpu_executor, reprice_response, cached, priority, goods_type, cargo_weight)
+        return json_response(body)
+
+    G, res = await get_routing_with_network_async(source, destination, priority, goods_type, cargo_weight)
+
+    body = await serialize_routes_async(res)
+    if res:
+        response_cache.put(key, CachedRouting(G, res, cargo_weight, body, len(body) + G.overlay_nbytes()))
+    return json_response(body)
+
+@app.get("/routes/{source}/{destination}/stream")
+async def routes_stream(source: str,
+                        destination: str,
+                        priority: Priority = Priority.BALANCED,
+                        goods_type: str = GoodsType.STANDARD,
+                        cargo_weight: float = 0):
+    """
+    NDJSON stream: one {"event": "route", "route": Route} line per route as
+    soon as it is evaluated, then {"event": "ranking", "routes": [Route]}
+    with the final ordering (same content as GET /routes/{source}/{destination}).
+    """
+    logger.debug("STREAM REQUEST: %s, %s, %s, %s, %s", source, destination, priority, goods_type, cargo_weight)
+    REQUESTS.inc(endpoint="stream")
+
+    async def events():
+        try:
+            async for event in stream_routing_async(source, destination, priority, goods_type, cargo_weight):
+                with time_stage("serialization"):
+                    if event["event"] == "route":
+                        route = Route.model_validate({"overview": event["route"], "data": event["evaluation"]})
+                        payload = {"event": "route", "route": route.model_dump(mode="json")}
+                    else:
+                        routes = [Route.model_validate(r).model_dump(mode="json") for r in to_routes(event["routes"])]
+                        payload = {"event": "ranking", "routes": routes}
+                    line = json.dumps(payload) + "\n"
+                yield line
+        except Exception as e:
+            logger.error("Error streaming routes: %s", e)
+            yield json.dumps({"event": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/routes/batch", response_model=list[BatchResult])
+async def routes_batch(request: BatchRequest):
+    logger.debug("BATCH REQUEST: %d jobs", len(request.jobs))
+    REQUESTS.inc(endpoint="batch")
+
+    results = await get_routing_batch_async([job.model_dump() for job in request.jobs])
+
+    return [{"routes": to_routes(result["routes"]) if result["error"] is None else None,
+             "error": result["error"]}
+            for result in results]
+
+@app.post("/routes/consolidate", response_model=ConsolidationResult)
+async def routes_consolidate(request: ConsolidationRequest):
+    """
+    Consolidate a batch of shipments: compatible shipments on the same lane
+    share containers and are routed once per group, with each shipment's
+    share of the cost (and its cost if shipped alone on the same route).
+    """
+    logger.debug("CONSOLIDATION REQUEST: %d shipments", len(request.shipments))
+    REQUESTS.inc(endpoint="consolidate")
+
+    result = await consolidate_routing_async([shipment.model_dump() for shipment in request.shipments])
+    for group in result["groups"]:
+        if group["route"] is not None:
+            group["route"] = to_routes([group["route"]])[0]
+    return result
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Folded stacks of a profiled request, for flamegraph.pl, speedscope or inferno"""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    try:
+        with open(profile_path(PROFILE_DIR, profile_id), "rb") as f:
+            body = f.read()
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=body, media_type="text/plain")
+
+@app.get("/metrics")
+async def metrics():
+    """Stage timings and counters in the Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
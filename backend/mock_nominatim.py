@@ -0,0 +1,95 @@
+"""
+Minimal local stand-in for the Nominatim search API, for offline
+development, testing and benchmarks.
+
+Implements /search?q=... by looking the query up in city_coordinates.csv
+(city names and location codes); anything else is "not found", like an
+unknown place on the real service.
+
+Usage:
+    python mock_nominatim.py --port 5002
+    LOGILINK_NOMINATIM_URL=http://127.0.0.1:5002 fastapi dev main.py
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+LOCATIONS_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_coordinates.csv")
+
+
+def load_places(path: str = LOCATIONS_CSV) -> Dict[str, Tuple[str, str, str]]:
+    """Place name or code -> (lon, lat, country); the first row for a name wins"""
+    places = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            place = (row["lon"], row["lat"], row["country"])
+            places.setdefault(row["city"], place)
+            if row["code"]:
+                places.setdefault(row["code"], place)
+    return places
+
+
+def recorded_geocodes(path: str = LOCATIONS_CSV) -> Iterator[Tuple[str, str, str]]:
+    """(location, "lon,lat", country) entries the mock answers, for seeding a geocode store"""
+    for location, (lon, lat, country) in load_places(path).items():
+        yield location, f"{lon},{lat}", country
+
+
+class MockNominatimHandler(BaseHTTPRequestHandler):
+    places: Dict[str, Tuple[str, str, str]] = {}
+    # Number of search requests served
+    request_count = 0
+    _count_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/search":
+            self._send(404, {"error": "Unknown endpoint"})
+            return
+        query = parse_qs(url.query).get("q", [""])[0].strip()
+        with self._count_lock:
+            MockNominatimHandler.request_count += 1
+
+        place = self.places.get(query)
+        if place is None:
+            self._send(200, [])
+            return
+        lon, lat, country = place
+        self._send(200, [{"lon": lon, "lat": lat, "display_name": query,
+                          "address": {"country": country}}])
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, path: str = LOCATIONS_CSV) -> ThreadingHTTPServer:
+    """Start the mock server on a background thread and return it"""
+    MockNominatimHandler.places = load_places(path)
+    server = ThreadingHTTPServer((host, port), MockNominatimHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Nominatim server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    args = parser.parse_args()
+
+    MockNominatimHandler.places = load_places()
+    server = ThreadingHTTPServer((args.host, args.port), MockNominatimHandler)
+    print(f"Mock Nominatim listening on http://{args.host}:{args.port}")
+    server.serve_forever()
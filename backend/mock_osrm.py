@@ -0,0 +1,129 @@
+"""
+Minimal local stand-in for the OSRM HTTP API, for offline development and
+testing of the road-leg code paths.
+
+Implements /route/v1/driving/{coords} and /table/v1/driving/{coords}.
+Road distance is the great-circle distance times a detour factor, driven
+at a constant average speed.
+
+Usage:
+    python mock_osrm.py --port 5001
+    LOGILINK_OSRM_URL=http://127.0.0.1:5001 fastapi dev main.py
+"""
+import argparse
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DETOUR_FACTOR = 1.3
+AVERAGE_SPEED_KMH = 60.0
+
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance between two (lon, lat) points in km"""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def encode_polyline(points: List[Tuple[float, float]], precision: int = 5) -> str:
+    """Encode (lon, lat) points as a Google/OSRM polyline string"""
+    factor = 10 ** precision
+    result = []
+    prev_lat = prev_lon = 0
+    for lon, lat in points:
+        lat_i, lon_i = int(round(lat * factor)), int(round(lon * factor))
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(result)
+
+
+def road_leg(a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float]:
+    """Return (distance in metres, duration in seconds) for a mock road leg"""
+    distance_km = haversine_km(a, b) * DETOUR_FACTOR
+    return distance_km * 1000, distance_km / AVERAGE_SPEED_KMH * 3600
+
+
+def parse_coordinates(path_coords: str) -> List[Tuple[float, float]]:
+    return [tuple(float(c) for c in point.split(",")) for point in path_coords.split(";")]
+
+
+class MockOSRMHandler(BaseHTTPRequestHandler):
+    # Counts of requests served, by service name
+    request_counts = {"route": 0, "table": 0}
+    _counts_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = unquote(url.path).strip("/").split("/")
+        if len(parts) != 4 or parts[1] != "v1" or parts[0] not in ("route", "table"):
+            self._send(400, {"code": "InvalidUrl"})
+            return
+        try:
+            points = parse_coordinates(parts[3])
+        except ValueError:
+            self._send(400, {"code": "InvalidQuery"})
+            return
+
+        service = parts[0]
+        with self._counts_lock:
+            self.request_counts[service] += 1
+
+        if service == "route":
+            distance, duration = road_leg(points[0], points[-1])
+            self._send(200, {"code": "Ok", "routes": [{
+                "distance": distance,
+                "duration": duration,
+                "geometry": encode_polyline([points[0], points[-1]]),
+            }]})
+            return
+
+        query = parse_qs(url.query)
+        everything = list(range(len(points)))
+        sources = [int(i) for i in query["sources"][0].split(";")] if "sources" in query else everything
+        destinations = ([int(i) for i in query["destinations"][0].split(";")]
+                        if "destinations" in query else everything)
+        legs = [[road_leg(points[s], points[d]) for d in destinations] for s in sources]
+        self._send(200, {
+            "code": "Ok",
+            "distances": [[leg[0] for leg in row] for row in legs],
+            "durations": [[leg[1] for leg in row] for row in legs],
+        })
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock server on a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), MockOSRMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock OSRM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockOSRMHandler)
+    print(f"Mock OSRM listening on http://{args.host}:{args.port}")
+    server.serve_forever()
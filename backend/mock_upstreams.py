@@ -0,0 +1,16 @@
+"""
+Offline environment shared by the tests and benchmarks: points routing at
+running mock OSRM and Nominatim servers (mock_osrm.py, mock_nominatim.py)
+and at empty caches in a scratch directory.
+"""
+import os
+
+
+def configure_environment(workdir: str, osrm_url: str, nominatim_url: str) -> None:
+    """Point routing at the mocks and at empty caches; must run before routing is imported"""
+    os.environ["LOGILINK_OSRM_URL"] = osrm_url
+    os.environ["LOGILINK_NOMINATIM_URL"] = nominatim_url
+    os.environ["LOGILINK_NOMINATIM_INTERVAL"] = "0"
+    os.environ["LOGILINK_GEOCODE_DB"] = os.path.join(workdir, "geocode_cache.sqlite3")
+    os.environ["LOGILINK_ROAD_CACHE_DB"] = os.path.join(workdir, "road_cache.sqlite3")
+    os.environ.pop("LOGILINK_SNAPSHOT", None)
@@ -0,0 +1,185 @@
+from collections import ChainMap
+from typing import Any, Dict, Iterator
+
+import networkx as nx
+
+
+class OverlayNodeView:
+    """
+    Read view over the nodes of an OverlayNetwork.
+    Supports the subset of networkx.NodeView used by the router:
+    G.nodes[n], G.nodes(data=True), iteration and membership.
+    """
+
+    def __init__(self, graph: "OverlayNetwork"):
+        self._graph = graph
+
+    def __getitem__(self, node):
+        return self._graph._node_attrs(node)
+
+    def __contains__(self, node) -> bool:
+        return node in self._graph
+
+    def __iter__(self) -> Iterator:
+        return iter(self._graph)
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+    def __call__(self, data: bool = False):
+        if data:
+            return self.items()
+        return list(self._graph)
+
+    def items(self):
+        return [(n, self._graph._node_attrs(n)) for n in self._graph]
+
+
+class OverlayAdjacency:
+    """
+    Merged successor (or predecessor) mapping: overlay edges shadow base edges
+    with the same endpoints.
+    """
+
+    def __init__(self, base_adj, overlay_adj: Dict[Any, Dict[Any, Dict[str, Any]]]):
+        self._base_adj = base_adj
+        self._overlay_adj = overlay_adj
+
+    def __getitem__(self, node):
+        in_base = node in self._base_adj
+        if node not in self._overlay_adj:
+            if not in_base:
+                raise KeyError(node)
+            return self._base_adj[node]
+        if not in_base:
+            return self._overlay_adj[node]
+        return ChainMap(self._overlay_adj[node], self._base_adj[node])
+
+    def __contains__(self, node) -> bool:
+        return node in self._overlay_adj or node in self._base_adj
+
+
+class OverlayNetwork:
+    """
+    Lightweight per-request network layered over the shared base network.
+
+    The base network (flights, shipping lanes and their coordinates) is built
+    once at startup and frozen. Request-specific city nodes and road legs are
+    written to the overlay only, so concurrent requests never mutate shared
+    state and nothing is copied from the base graph.
+    """
+
+    def __init__(self, base: nx.DiGraph):
+        self.base = base
+        self.graph = {}
+        # Bumped on every change so derived structures know to rebuild
+        self.mutations = 0
+        self._node: Dict[Any, Dict[str, Any]] = {}
+        self._succ: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+        self._pred: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+
+    # ----- node access -----
+    @property
+    def nodes(self) -> OverlayNodeView:
+        return OverlayNodeView(self)
+
+    def _node_attrs(self, node):
+        in_base = node in self.base
+        if node not in self._node:
+            if not in_base:
+                raise KeyError(node)
+            return self.base.nodes[node]
+        if not in_base:
+            return self._node[node]
+        return ChainMap(self._node[node], self.base.nodes[node])
+
+    def __contains__(self, node) -> bool:
+        return node in self._node or node in self.base
+
+    def __iter__(self) -> Iterator:
+        yield from self.base
+        for node in self._node:
+            if node not in self.base:
+                yield node
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for n in self._node if n not in self.base)
+
+    def has_node(self, node) -> bool:
+        return node in self
+
+    def add_node(self, node, **attr) -> None:
+        self.mutations += 1
+        self._node.setdefault(node, {}).update(attr)
+        self._succ.setdefault(node, {})
+        self._pred.setdefault(node, {})
+
+    # ----- edge access -----
+    @property
+    def succ(self) -> OverlayAdjacency:
+        return OverlayAdjacency(self.base.succ, self._succ)
+
+    adj = succ
+
+    @property
+    def pred(self) -> OverlayAdjacency:
+        return OverlayAdjacency(self.base.pred, self._pred)
+
+    def __getitem__(self, node):
+        return self.succ[node]
+
+    def has_edge(self, u, v) -> bool:
+        if u in self._succ and v in self._succ[u]:
+            return True
+        return self.base.has_edge(u, v)
+
+    def add_edge(self, u, v, **attr) -> None:
+        self.mutations += 1
+        for node in (u, v):
+            if node not in self._succ:
+                self._succ[node] = {}
+                self._pred[node] = {}
+                if node not in self.base:
+                    self._node.setdefault(node, {})
+        data = self._succ[u].get(v, {})
+        data.update(attr)
+        self._succ[u][v] = data
+        self._pred[v][u] = data
+
+    def successors(self, node) -> Iterator:
+        return iter(self.succ[node])
+
+    def predecessors(self, node) -> Iterator:
+        return iter(self.pred[node])
+
+    def edges(self, data: bool = False):
+        for u in self:
+            for v, attrs in self.succ[u].items():
+                yield (u, v, attrs) if data else (u, v)
+
+    def overlay_edges(self, data: bool = False):
+        """Edges added on top of the base network"""
+        for u, nbrs in self._succ.items():
+            for v, attrs in nbrs.items():
+                yield (u, v, attrs) if data else (u, v)
+
+    def with_base(self, base) -> "OverlayNetwork":
+        """The same overlay nodes and edges on top of another copy of the base network"""
+        G = OverlayNetwork(base)
+        for node, attrs in self._node.items():
+            G.add_node(node, **attrs)
+        for u, v, attrs in self.overlay_edges(data=True):
+            G.add_edge(u, v, **attrs)
+        return G
+
+    def overlay_nbytes(self) -> int:
+        """Approximate memory held by the overlay (road geometries dominate)"""
+        total = 0
+        for _, _, attrs in self.overlay_edges(data=True):
+            total += 256 + sum(len(value) for value in attrs.values() if isinstance(value, str))
+        return total + 256 * len(self._node)
+
+    def number_of_edges(self) -> int:
+        overlay_only = sum(1 for u, nbrs in self._succ.items()
+                           for v in nbrs if not self.base.has_edge(u, v))
+        return self.base.number_of_edges() + overlay_only
@@ -0,0 +1,49 @@
+from typing import List
+
+import numpy as np
+
+
+def dominance_matrix(F: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    Boolean matrix D where D[i, j] is True if solution i dominates j
+    (no worse in every objective and strictly better in at least one).
+    All objectives are minimized. Rows are computed in chunks to bound
+    the size of the intermediate (chunk, n, n_obj) arrays.
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    D = np.zeros((n, n), dtype=bool)
+    for start in range(0, n, chunk_size):
+        block = F[start:start + chunk_size, None, :]
+        no_worse = (block <= F[None, :, :]).all(axis=2)
+        better = (block < F[None, :, :]).any(axis=2)
+        D[start:start + chunk_size] = no_worse & better
+    return D
+
+
+def fast_non_dominated_sort(F: np.ndarray) -> List[np.ndarray]:
+    """
+    Deb's fast non-dominated sort. Returns the fronts as arrays of row
+    indices into F, best (non-dominated) front first.
+    """
+    F = np.asarray(F, dtype=float)
+    if len(F) == 0:
+        return []
+    D = dominance_matrix(F)
+    dominated_by = D.sum(axis=0)
+    assigned = np.zeros(len(F), dtype=bool)
+
+    fronts = []
+    current = np.flatnonzero(dominated_by == 0)
+    while current.size:
+        fronts.append(current)
+        assigned[current] = True
+        dominated_by = dominated_by - D[current].sum(axis=0)
+        current = np.flatnonzero((dominated_by == 0) & ~assigned)
+    return fronts
+
+
+def pareto_front(F: np.ndarray) -> np.ndarray:
+    """Indices of the non-dominated rows of F"""
+    fronts = fast_non_dominated_sort(F)
+    return fronts[0] if fronts else np.array([], dtype=int)
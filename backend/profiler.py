@@ -0,0 +1,143 @@
+"""
+On-demand sampling profiler for single routing requests.
+
+While a profiled request runs, a background thread samples the Python
+stacks of the threads working on it: the event loop thread, but only while
+the request's own task is the one running on it, and the executor thread
+running the optimizer. Samples are aggregated as folded stacks
+("frame;frame;frame count" lines), the input format of flamegraph.pl,
+speedscope and inferno. Requests that are not profiled run no extra code.
+"""
+import asyncio
+import collections
+import functools
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Seconds between samples
+DEFAULT_INTERVAL = 0.005
+
+# Pseudo-frame for ticks where no watched thread was working on the request
+WAITING_FRAME = "(waiting)"
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$")
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_stack(frame, root: str) -> str:
+    """Outermost-first stack of frame, prefixed with root"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples the stacks of watched threads on a timer while started"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: collections.Counter = collections.Counter()
+        self.samples = 0
+        self.duration = 0.0
+        # thread id -> (event loop, task) the samples are restricted to, or None for the whole thread
+        self._threads: Dict[int, Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Task]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+            self.duration += time.perf_counter() - self._started
+
+    @contextmanager
+    def profile_task(self, task: asyncio.Task = None) -> Iterator["SamplingProfiler"]:
+        """Profile the block, watching the event loop thread while task (default: current) runs"""
+        task = task or asyncio.current_task()
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads[thread_id] = (task.get_loop(), task)
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+            with self._lock:
+                self._threads.pop(thread_id, None)
+
+    def wrap(self, fn: Callable) -> Callable:
+        """fn, watching the thread that calls it for as long as it runs (e.g. on an executor)"""
+        @functools.wraps(fn)
+        def watched(*args, **kwargs):
+            thread_id = threading.get_ident()
+            with self._lock:
+                self._threads[thread_id] = None
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._threads.pop(thread_id, None)
+        return watched
+
+    def _run(self) -> None:
+        names = {}
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                watched = list(self._threads.items())
+            frames = sys._current_frames()
+            sampled = False
+            for thread_id, running in watched:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                if running is not None:
+                    loop, task = running
+                    if asyncio.current_task(loop) is not task:
+                        continue
+                if thread_id not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                self.stacks[fold_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+                sampled = True
+            if not sampled:
+                self.stacks[WAITING_FRAME] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Samples in the folded-stack format, one "stack count" line per distinct stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def save(self, directory: str) -> str:
+        """Write the folded stacks to <directory>/<profile id>.folded and return the ID"""
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(directory, exist_ok=True)
+        with open(profile_path(directory, profile_id), "w") as f:
+            f.write(self.folded())
+        return profile_id
+
+
+def profile_path(directory: str, profile_id: str) -> str:
+    """Path of a saved profile; raises ValueError for anything that is not a profile ID"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        raise ValueError(f"Invalid profile ID {profile_id!r}")
+    return os.path.join(directory, f"{profile_id}.folded")
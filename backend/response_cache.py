@@ -0,0 +1,85 @@
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, NamedTuple, Optional, Tuple
+
+
+class CachedRouting(NamedTuple):
+    """A computed /routes result and what is needed to re-price it"""
+    network: Any
+    routes: List[Tuple[List[str], dict]]
+    cargo_weight: float
+    response: bytes  # Serialized JSON body
+    nbytes: int
+
+
+def weight_bucket(cargo_weight: float, step: float) -> int:
+    """
+    Logarithmic weight bucket: weights within a factor of (1 + step) of each
+    other share a bucket. Zero (the API default) has its own bucket.
+    """
+    if cargo_weight <= 0:
+        return -1
+    return int(math.floor(math.log(cargo_weight) / math.log1p(step)))
+
+
+class ResponseCache:
+    """
+    LRU cache of /routes results keyed on
+    (source, destination, priority, goods type, weight bucket, dataset version),
+    bounded by the approximate bytes held by its entries.
+
+    Entries from other dataset versions are dropped as soon as a new version
+    is seen, so results never outlive the data they were computed from.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, weight_step: float = 0.1):
+        self.max_bytes = max_bytes
+        self.weight_step = weight_step
+        self.nbytes = 0
+        self._entries: "OrderedDict[Tuple, CachedRouting]" = OrderedDict()
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+
+    def key(self, source: str, destination: str, priority: str, goods_type: str,
+            cargo_weight: float, version: Hashable) -> Tuple:
+        return (source, destination, str(priority), str(goods_type),
+                weight_bucket(cargo_weight, self.weight_step), version)
+
+    def get(self, key: Tuple) -> Optional[CachedRouting]:
+        with self._lock:
+            self._retain_version(key[-1])
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, entry: CachedRouting) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._retain_version(key[-1])
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def _retain_version(self, version: Hashable) -> None:
+        # Caller holds self._lock
+        if version == self._version:
+            return
+        self._version = version
+        for key in [k for k in self._entries if k[-1] != version]:
+            self.nbytes -= self._entries.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
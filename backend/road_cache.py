@@ -0,0 +1,190 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def quantize_coords(coords: str, precision: int = 4) -> str:
+    """
+    Round "lon,lat" to a fixed precision (4 decimals is ~11 m) so that
+    the same place always maps to the same cache key.
+    """
+    lon, lat = (float(c) for c in coords.split(','))
+    return f"{round(lon, precision):.{precision}f},{round(lat, precision):.{precision}f}"
+
+
+class RoadLegCache:
+    """
+    Persistent cache of OSRM road legs keyed on quantized (source, destination)
+    coordinates. Stores distance, duration and geometry; costs are derived
+    from those by the caller.
+
+    A bounded in-memory LRU sits in front of a SQLite table. Entries expire
+    after `ttl` seconds, and the table is trimmed to `max_entries` by least
+    recent use. Writes and last-used updates are batched.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 200_000,
+                 memory_entries: int = 20_000, precision: int = 4,
+                 batch_size: int = 50, flush_interval: float = 5.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.precision = precision
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, float, Optional[str], float]]" = OrderedDict()
+        self._pending: Dict[str, Tuple[float, float, Optional[str], float]] = {}
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS road_legs ("
+            " key TEXT PRIMARY KEY,"
+            " distance_km REAL NOT NULL,"
+            " time_hr REAL NOT NULL,"
+            " geometry TEXT,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS road_legs_last_used ON road_legs (last_used)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def key(self, source_coords: str, destination_coords: str) -> str:
+        return (f"{quantize_coords(source_coords, self.precision)};"
+                f"{quantize_coords(destination_coords, self.precision)}")
+
+    def _remember(self, key: str, entry: Tuple[float, float, Optional[str], float]) -> None:
+        # Caller holds self._lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, source_coords: str, destination_coords: str) -> Optional[Dict[str, Any]]:
+        """Return {distance_km, time_hr, geometry} for a cached leg, or None"""
+        key = self.key(source_coords, destination_coords)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[3] > self.ttl:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None:
+            row = self._connection().execute(
+                "SELECT distance_km, time_hr, geometry, created_at FROM road_legs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[3] <= self.ttl:
+                entry = tuple(row)
+                with self._lock:
+                    self._remember(key, entry)
+
+        if entry is None:
+            return None
+        with self._lock:
+            self._touched[key] = now
+
+        distance_km, time_hr, geometry, _ = entry
+        return {"distance_km": distance_km, "time_hr": time_hr, "geometry": geometry}
+
+    def put(self, source_coords: str, destination_coords: str,
+            distance_km: float, time_hr: float, geometry: Optional[str]) -> None:
+        """Cache a leg; it is persisted with the next batched write"""
+        key = self.key(source_coords, destination_coords)
+        entry = (distance_km, time_hr, geometry, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            self._pending[key] = entry
+            due = (len(self._pending) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Persist queued legs and last-used times, then apply TTL and LRU limits"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.monotonic()
+        if not pending and not touched:
+            return 0
+
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO road_legs "
+                    "(key, distance_km, time_hr, geometry, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(k, d, t, g, created, now) for k, (d, t, g, created) in pending.items()]
+                )
+                conn.executemany(
+                    "UPDATE road_legs SET last_used = ? WHERE key = ?",
+                    [(used, k) for k, used in touched.items() if k not in pending]
+                )
+                conn.execute("DELETE FROM road_legs WHERE created_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM road_legs WHERE key IN ("
+                    " SELECT key FROM road_legs ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Could not save road legs to cache: %s", e)
+            with self._lock:
+                for k, entry in pending.items():
+                    self._pending.setdefault(k, entry)
+            return 0
+        return len(pending)
+
+    def items(self) -> Iterator[Tuple[str, float, float, Optional[str]]]:
+        """Iterate over all stored (key, distance_km, time_hr, geometry) legs"""
+        self.flush()
+        yield from self._connection().execute("SELECT key, distance_km, time_hr, geometry FROM road_legs")
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection().execute("SELECT COUNT(*) FROM road_legs").fetchone()[0]
+
+    def import_entries(self, rows: Iterable[Tuple[str, float, float, Optional[str]]]) -> int:
+        """Bulk-load (key, distance_km, time_hr, geometry) legs, keeping existing ones"""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO road_legs "
+                "(key, distance_km, time_hr, geometry, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(k, d, t, g, now, now) for k, d, t, g in rows]
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
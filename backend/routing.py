@@ -1,7 +1,7 @@
 import requests
 import pandas as pd
 import networkx as nx
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable
 import numpy as np
 import math
 from pymoo.algorithms.moo.nsga3 import NSGA3
@@ -9,10 +9,34 @@ from pymoo.util.ref_dirs import get_reference_directions
 from pymoo.core.problem import Problem
 from pymoo.optimize import minimize
 import time
-from functools import lru_cache
-import pickle
+import atexit
+import hashlib
 import os.path
 import concurrent.futures
+import logging
+import threading
+from collections import ChainMap, deque
+from network import OverlayNetwork
+from csr_graph import CSRGraph
+from geocode_store import GeocodeStore
+from road_cache import RoadLegCache
+from spatial_index import HubIndex, parse_coords
+from pareto import fast_non_dominated_sort, pareto_front
+from evaluation_cache import EvaluationCache
+from label_search import pareto_paths
+from transfer_table import TransferTable
+from containers import ContainerIndex
+from snapshot import load_snapshot, read_meta as read_snapshot_meta, snapshot_geocodes, snapshot_road_legs
+from metrics import count_cache, count_routes, count_upstream, time_stage
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the CSV datasets (defaults to this backend folder)
+DATA_DIR = os.environ.get("LOGILINK_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+FLIGHTS_CSV = "cargo_flights (1).csv"
+SHIPPING_CSV = "cargo_shipping.csv"
+CONTAINERS_CSV = "containers.csv"
+LOCATIONS_CSV = "city_coordinates.csv"
 
 # Add this after your imports section
 GOODS_TYPE_MULTIPLIER = {
@@ -37,10 +61,64 @@ def calculate_co2(mode, distance_km, weight_kg):
     else:
         raise ValueError("Invalid transport mode")
 
+# Extra handling cost per segment, as a fraction of the base cost
+GOODS_IMPACT_RATE = {
+    'perishable': 0.3,
+    'hazardous': 0.2,
+    'fragile': 0.1
+}
+
+def get_customs_rate(goods_type: str) -> float:
+    """Customs/tariff rate applied to air and sea segments"""
+    return 0.08 if goods_type in ['hazardous', 'high_value'] else 0.05
+
+def segment_cost_rate(goods_type: str, mode: str) -> float:
+    """Total segment cost per unit of base cost: goods multiplier, handling impact and customs"""
+    rate = GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0) + GOODS_IMPACT_RATE.get(goods_type, 0)
+    if mode in ['air', 'sea']:
+        rate += get_customs_rate(goods_type)
+    return rate
+
 # Create a cache for geocoded locations
 location_cache = {}
 country_cache = {}
 
+# Persistent geocode store (SQLite); replaces the old pickle cache file
+GEOCODE_DB = os.environ.get("LOGILINK_GEOCODE_DB", os.path.join(DATA_DIR, "geocode_cache.sqlite3"))
+LEGACY_GEOCODE_CACHE = os.path.join(DATA_DIR, "geocode_cache.pkl")
+geocode_store = GeocodeStore(GEOCODE_DB)
+atexit.register(geocode_store.close)
+
+# Geocodes loaded into the in-memory caches at startup; the rest of the store
+# is read one key at a time on first use
+GEOCODE_WARM_ENTRIES = int(os.environ.get("LOGILINK_GEOCODE_WARM_ENTRIES", 10_000))
+
+# Nominatim server and request headers
+NOMINATIM_URL = os.environ.get("LOGILINK_NOMINATIM_URL", "https://nominatim.openstreetmap.org").rstrip("/")
+NOMINATIM_HEADERS = {'User-Agent': 'MultiModalLogisticsOptimizer/1.0'}
+# Seconds between Nominatim requests (its usage policy allows at most one per second)
+NOMINATIM_INTERVAL = float(os.environ.get("LOGILINK_NOMINATIM_INTERVAL", 1.0))
+
+def migrate_geocode_cache() -> int:
+    """
+    Move entries from a legacy geocode_cache.pkl into the persistent store,
+    once. Returns the number of migrated entries.
+    """
+    return geocode_store.import_pickle(LEGACY_GEOCODE_CACHE)
+
+def load_geocode_cache(limit: int = None) -> int:
+    """
+    Warm the in-memory caches with the most recently geocoded locations
+    (GEOCODE_WARM_ENTRIES by default). The load is bounded so startup does
+    not grow with the store; other locations are read from it one key at a
+    time by geocode_location. Returns the number of entries loaded.
+    """
+    entries = geocode_store.recent(GEOCODE_WARM_ENTRIES if limit is None else limit)
+    for location, coords, country in entries:
+        location_cache[location] = coords
+        country_cache[location] = country
+    return len(entries)
+
 def geocode_location(location: str) -> tuple:
     """
     Get coordinates for a location using the Nominatim API with persistent caching
@@ -48,33 +126,34 @@ def geocode_location(location: str) -> tuple:
     """
     # First check in-memory cache
     if location in location_cache:
+        count_cache("geocode", True)
         return True, location_cache[location], country_cache.get(location, "Unknown")
     
-    # Then check persistent cache file
-    cache_file = "geocode_cache.pkl"
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'rb') as f:
-                cache_data = pickle.load(f)
-                if location in cache_data:
-                    coords, country = cache_data[location]
-                    # Update in-memory cache
-                    location_cache[location] = coords
-                    country_cache[location] = country
-                    return True, coords, country
-        except Exception as e:
-            print(f"Warning: Could not load cache: {e}")
-    
-    # If not in cache, make API request (rest of your original code)
-    url = f"https://nominatim.openstreetmap.org/search?q={location}&format=json&limit=1&addressdetails=1"
-    headers = {'User-Agent': 'MultiModalLogisticsOptimizer/1.0'}
+    # Then check the persistent store (indexed single-key lookup)
+    try:
+        cached = geocode_store.get(location)
+    except Exception as e:
+        logger.warning("Could not read geocode store: %s", e)
+        cached = None
+    count_cache("geocode", cached is not None)
+    if cached is not None:
+        coords, country = cached
+        # Update in-memory cache
+        location_cache[location] = coords
+        country_cache[location] = country
+        return True, coords, country
+    
+    # If not in cache, make API request
+    url = f"{NOMINATIM_URL}/search?q={location}&format=json&limit=1&addressdetails=1"
+    headers = NOMINATIM_HEADERS
     
     try:
-        # Rate limiting (Nominatim requires max 1 request per second)
-        time.sleep(1)
-        
-        response = requests.get(url, headers=headers)
-        data = response.json()
+        with time_stage("geocoding"):
+            # Rate limiting (Nominatim requires max 1 request per second)
+            time.sleep(NOMINATIM_INTERVAL)
+            
+            response = requests.get(url, headers=headers)
+            data = response.json()
         
         if data and len(data) > 0:
             # Get coordinates (lon,lat format for OSRM)
@@ -89,34 +168,55 @@ def geocode_location(location: str) -> tuple:
             location_cache[location] = coords
             country_cache[location] = country
             
-            # Update persistent cache
-            cache_data = {}
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, 'rb') as f:
-                        cache_data = pickle.load(f)
-                except:
-                    pass
-            
-            cache_data[location] = (coords, country)
-            try:
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(cache_data, f)
-            except Exception as e:
-                print(f"Warning: Could not save to cache: {e}")
+            # Queue for the next batched write to the persistent store
+            geocode_store.put(location, coords, country)
             
+            count_upstream("nominatim", "ok")
             return True, coords, country
         else:
-            print(f"Warning: Location '{location}' not found")
+            count_upstream("nominatim", "not_found")
+            logger.warning("Location '%s' not found", location)
             return False, None, None
             
     except Exception as e:
-        print(f"Error geocoding {location}: {e}")
+        count_upstream("nominatim", "error")
+        logger.error("Error geocoding %s: %s", location, e)
         return False, None, None
 
 # -------------------------------------------------------------------------
 # DATA LOADING AND PROCESSING FUNCTIONS
 # -------------------------------------------------------------------------
+# OSRM server (override to point at a self-hosted or mock instance)
+OSRM_URL = os.environ.get("LOGILINK_OSRM_URL", "http://router.project-osrm.org").rstrip("/")
+
+def build_road_leg(distance_km: float, time_hr: float, geometry: str = None) -> Dict[str, Any]:
+    """
+    Build the road edge attributes (costs included) for a leg of the given
+    distance and duration.
+    """
+    # Cost parameters
+    fuel_price_per_liter = 100  # INR per liter
+    vehicle_mileage = 12  # km per liter
+    driver_cost_per_hour = 150  # INR per hour
+    toll_cost_per_km = 1.5  # INR per km (assumed)
+    
+    # Calculate costs
+    fuel_cost = (distance_km / vehicle_mileage) * fuel_price_per_liter
+    toll_cost = distance_km * toll_cost_per_km
+    driver_wage = time_hr * driver_cost_per_hour
+    total_cost = fuel_cost + toll_cost + driver_wage
+    
+    return {
+        "distance_km": distance_km,
+        "time_hr": time_hr,
+        "fuel_cost": fuel_cost,
+        "toll_cost": toll_cost,
+        "driver_wage": driver_wage,
+        "total_cost": total_cost,
+        "success": True,
+        "geometry": geometry  # Store the polyline for mapping
+    }
+
 def get_road_route(source_coords: str, destination_coords: str) -> Dict[str, Any]:
     """
     Query OSRM to get road route details between two points.
@@ -128,7 +228,7 @@ def get_road_route(source_coords: str, destination_coords: str) -> Dict[str, Any
     Returns:
         Dictionary with distance_km, time_hr, and cost details
     """
-    osrm_url = f"http://router.project-osrm.org/route/v1/driving/{source_coords};{destination_coords}?overview=full"
+    osrm_url = f"{OSRM_URL}/route/v1/driving/{source_coords};{destination_coords}?overview=full"
     try:
         response = requests.get(osrm_url)
         data = response.json()
@@ -136,33 +236,13 @@ def get_road_route(source_coords: str, destination_coords: str) -> Dict[str, Any
         if "routes" in data and len(data["routes"]) > 0:
             distance_km = data["routes"][0]["distance"] / 1000  # Convert meters to km
             time_hr = data["routes"][0]["duration"] / 3600  # Convert seconds to hours
-            
-            # Cost parameters
-            fuel_price_per_liter = 100  # INR per liter
-            vehicle_mileage = 12  # km per liter
-            driver_cost_per_hour = 150  # INR per hour
-            toll_cost_per_km = 1.5  # INR per km (assumed)
-            
-            # Calculate costs
-            fuel_cost = (distance_km / vehicle_mileage) * fuel_price_per_liter
-            toll_cost = distance_km * toll_cost_per_km
-            driver_wage = time_hr * driver_cost_per_hour
-            total_cost = fuel_cost + toll_cost + driver_wage
-            
             geometry = data["routes"][0]["geometry"]  # This is encoded polyline
             
-            return {
-                "distance_km": distance_km,
-                "time_hr": time_hr,
-                "fuel_cost": fuel_cost,
-                "toll_cost": toll_cost,
-                "driver_wage": driver_wage,
-                "total_cost": total_cost,
-                "success": True,
-                "geometry": geometry  # Store the polyline for mapping
-            }
+            count_upstream("osrm_route", "ok")
+            return build_road_leg(distance_km, time_hr, geometry)
         else:
-            print(f"No route found between {source_coords} and {destination_coords}")
+            count_upstream("osrm_route", "not_found")
+            logger.debug("No route found between %s and %s", source_coords, destination_coords)
             return {
                 "success": False,
                 "distance_km": 0,
@@ -173,9 +253,107 @@ def get_road_route(source_coords: str, destination_coords: str) -> Dict[str, Any
                 "total_cost": 0
             }
     except Exception as e:
-        print(f"Error querying OSRM: {e}")
+        count_upstream("osrm_route", "error")
+        logger.error("Error querying OSRM: %s", e)
         return {"success": False}
 
+# Persistent road-leg cache in front of OSRM
+ROAD_CACHE_DB = os.environ.get("LOGILINK_ROAD_CACHE_DB", os.path.join(DATA_DIR, "road_cache.sqlite3"))
+ROAD_CACHE_TTL = float(os.environ.get("LOGILINK_ROAD_CACHE_TTL", 7 * 24 * 3600))
+road_leg_cache = RoadLegCache(ROAD_CACHE_DB, ttl=ROAD_CACHE_TTL)
+atexit.register(road_leg_cache.close)
+
+def cached_road_leg(source_coords: str, destination_coords: str) -> Optional[Dict[str, Any]]:
+    """
+    Road-leg cache lookup, counted in /metrics. An unreadable cache (locked
+    or corrupt database) is logged and treated as a miss.
+    """
+    try:
+        cached = road_leg_cache.get(source_coords, destination_coords)
+    except Exception as e:
+        logger.warning("Could not read road cache: %s", e)
+        cached = None
+    count_cache("road_leg", cached is not None)
+    return cached
+
+def get_cached_road_route(source_coords: str, destination_coords: str) -> Dict[str, Any]:
+    """
+    Road route lookup that checks the road-leg cache before querying OSRM.
+    Successful OSRM results are added to the cache.
+    """
+    cached = cached_road_leg(source_coords, destination_coords)
+    if cached is not None:
+        return build_road_leg(cached["distance_km"], cached["time_hr"], cached["geometry"])
+    
+    road_data = get_road_route(source_coords, destination_coords)
+    if road_data["success"]:
+        road_leg_cache.put(source_coords, destination_coords,
+                           road_data["distance_km"], road_data["time_hr"], road_data.get("geometry"))
+    return road_data
+
+# get_road_table entry for an endpoint whose table request failed (None means OSRM found no route)
+ROAD_TABLE_FAILED = object()
+
+def parse_road_table(data: Dict[str, Any], from_origin: bool, count: int) -> List[Optional[Tuple[float, float]]]:
+    """
+    (distance_km, time_hr) per endpoint, or None where there is no route,
+    from a one-to-many OSRM table response. Raises ValueError if the
+    response is not a table of `count` endpoints.
+    """
+    if data.get("code", "Ok") != "Ok":
+        raise ValueError(f"OSRM table returned {data.get('code')}: {data.get('message', '')}")
+    distances, durations = data["distances"], data["durations"]
+    # Flatten the 1xN (or Nx1) matrix
+    if from_origin:
+        distances, durations = distances[0], durations[0]
+    else:
+        distances = [row[0] for row in distances]
+        durations = [row[0] for row in durations]
+    if len(distances) != count or len(durations) != count:
+        raise ValueError(f"OSRM table has {len(distances)} entries for {count} endpoints")
+    return [None if distance is None or duration is None else (distance / 1000, duration / 3600)
+            for distance, duration in zip(distances, durations)]
+
+def get_road_table(origin_coords: str, other_coords: List[str], from_origin: bool = True,
+                   chunk_size: int = 99) -> List[Optional[Tuple[float, float]]]:
+    """
+    Query the OSRM table service for one-to-many road distances and durations.
+    
+    Args:
+        origin_coords: The shared endpoint as "lon,lat"
+        other_coords: The other endpoints as "lon,lat"
+        from_origin: True for origin -> others, False for others -> origin
+        chunk_size: Maximum endpoints per table request
+        
+    Returns:
+        One (distance_km, time_hr) tuple per entry in other_coords, None
+        where OSRM found no route, or ROAD_TABLE_FAILED where the request
+        for its chunk failed
+    """
+    results = []
+    for start in range(0, len(other_coords), chunk_size):
+        chunk = other_coords[start:start + chunk_size]
+        coords = ";".join([origin_coords] + chunk)
+        others = ";".join(str(i) for i in range(1, len(chunk) + 1))
+        if from_origin:
+            params = f"sources=0&destinations={others}"
+        else:
+            params = f"sources={others}&destinations=0"
+        osrm_url = f"{OSRM_URL}/table/v1/driving/{coords}?{params}&annotations=distance,duration"
+        
+        try:
+            response = requests.get(osrm_url)
+            response.raise_for_status()
+            legs = parse_road_table(response.json(), from_origin, len(chunk))
+        except Exception as e:
+            count_upstream("osrm_table", "error")
+            logger.error("Error querying OSRM table: %s", e)
+            results.extend([ROAD_TABLE_FAILED] * len(chunk))
+            continue
+        count_upstream("osrm_table", "ok")
+        results.extend(legs)
+    return results
+
 def load_flight_data(filepath: str) -> pd.DataFrame:
     """
     Load flight data from CSV file
@@ -183,7 +361,7 @@ def load_flight_data(filepath: str) -> pd.DataFrame:
     try:
         return pd.read_csv(filepath)
     except FileNotFoundError:
-        print(f"Error: Flight data file {filepath} not found.")
+        logger.error("Flight data file %s not found", filepath)
         return pd.DataFrame()
 
 def load_shipping_data(filepath: str) -> pd.DataFrame:
@@ -193,7 +371,7 @@ def load_shipping_data(filepath: str) -> pd.DataFrame:
     try:
         return pd.read_csv(filepath)
     except FileNotFoundError:
-        print(f"Error: Shipping data file {filepath} not found.")
+        logger.error("Shipping data file %s not found", filepath)
         return pd.DataFrame()
 
 def load_container_data(filepath: str) -> pd.DataFrame:
@@ -204,28 +382,15 @@ def load_container_data(filepath: str) -> pd.DataFrame:
         df["Weight Capacity (kg)"] = pd.to_numeric(df["Weight Capacity (kg)"], errors='coerce')
         return df
     except FileNotFoundError:
-        print(f"Warning: Container data file {filepath} not found")
+        logger.warning("Container data file %s not found", filepath)
         return pd.DataFrame()
 
-def get_container_type(mode: str, weight: float, container_df: pd.DataFrame) -> Tuple[str, bool]:
+def get_container_type(mode: str, weight: float, containers: ContainerIndex = None) -> Tuple[str, bool]:
     """
     Determine appropriate container type for given mode and weight.
     Returns (container_type, is_exceeding) tuple.
     """
-    # Filter containers for specific mode
-    mode_containers = container_df[container_df["Transport Mode"].str.lower() == mode.lower()]
-    if mode_containers.empty:
-        return "Unknown container type", False
-    
-    # Sort by capacity to find smallest suitable container
-    mode_containers = mode_containers.sort_values("Weight Capacity (kg)")
-    
-    suitable = mode_containers[mode_containers["Weight Capacity (kg)"] >= weight]
-    if suitable.empty:
-        max_container = mode_containers.iloc[-1]
-        return f"Exceeds {max_container['Container Type']} capacity ({max_container['Weight Capacity (kg)']} kg)", True
-    
-    return suitable.iloc[0]["Container Type"], False
+    return (containers if containers is not None else container_index).container_type(mode, weight)
 
 def load_location_database(filepath="city_coordinates.csv") -> Dict[str, Dict[str, Any]]:
     """
@@ -233,21 +398,19 @@ def load_location_database(filepath="city_coordinates.csv") -> Dict[str, Dict[st
     """
     try:
         df = pd.read_csv(filepath)
-        location_db = {}
-        
-        for _, row in df.iterrows():
-            key = row['code'] if pd.notna(row['code']) and row['code'] else row['city']
-            location_db[key] = {
-                'city': row['city'],
-                'country': row['country'],
-                'type': row['type'],
-                'coords': f"{row['lon']},{row['lat']}"  # OSRM uses "lon,lat"
-            }
-        
-        return location_db
     except FileNotFoundError:
-        print(f"Warning: Location database file {filepath} not found.")
+        logger.warning("Location database file %s not found", filepath)
         return {}
+    
+    # Keyed on the location code, falling back to the city name
+    has_code = df['code'].notna() & (df['code'].astype(str) != "")
+    keys = df['code'].where(has_code, df['city'])
+    coords = df['lon'].astype(str) + "," + df['lat'].astype(str)  # OSRM uses "lon,lat"
+    
+    return {key: {'city': city, 'country': country, 'type': loc_type, 'coords': xy}
+            for key, city, country, loc_type, xy in zip(keys.tolist(), df['city'].tolist(),
+                                                         df['country'].tolist(), df['type'].tolist(),
+                                                         coords.tolist())}
 
 port_coordinates = {
     'Port of Houston': '-95.297241, 29.614658',  # Correct coordinates
@@ -258,24 +421,36 @@ port_coordinates = {
 }
 
 
-def get_location_coords(location: str) -> str:
+def resolve_static_coords(location: str) -> str:
     """
-    Convert location name to coordinates using API with fallbacks
+    Resolve a location without geocoding: raw "lon,lat" input or a
+    hardcoded port. Returns None if the location needs a lookup.
     """
-    # If it's already coordinates (lon,lat), return as is
-    if "," in location and all(c.replace('.', '', 1).isdigit() or c in ['-', ','] for c in location):
-        return location
+    # If it's already coordinates (lon,lat), return them normalized
+    point = parse_coords(location)
+    if point is not None:
+        return f"{point[0]},{point[1]}"
     
     # Check hardcoded port coordinates first
     if location in port_coordinates:
         return port_coordinates[location]
     
+    return None
+
+def get_location_coords(location: str) -> str:
+    """
+    Convert location name to coordinates using API with fallbacks
+    """
+    coords = resolve_static_coords(location)
+    if coords is not None:
+        return coords
+    
     # Try API geocoding
     success, coords, _ = geocode_location(location)
     if success:
         return coords
     else:
-        print(f"Warning: Using default coordinates for {location}")
+        logger.warning("Using default coordinates for %s", location)
         return "77.1025,28.7041"  # Default to Delhi
 
 # -------------------------------------------------------------------------
@@ -283,50 +458,33 @@ def get_location_coords(location: str) -> str:
 # -------------------------------------------------------------------------
 def create_transportation_network(flight_data: pd.DataFrame, shipping_data: pd.DataFrame) -> nx.DiGraph:
     """
-    Create a directed graph representing the transportation network
+    Create a directed graph representing the transportation network.
+    Each distinct node's country is resolved once; nodes and edges are then
+    added in bulk.
     """
     G = nx.DiGraph()  # Using directed graph since costs/times might differ by direction
     
-    # Add flight edges
-    for _, row in flight_data.iterrows():
-        dep = row["departure_airport"]
-        arr = row["arrival_airport"]
-        cost = row["cost"]  # cost per kg
-        time = row["travel_time"]  # Hours
-        
-        # Try to get flight distance (assumes CSV has a column "distance_km")
-        distance = row["distance_km"] if "distance_km" in row and not pd.isna(row["distance_km"]) else None
-        
-        dep_country = get_country_for_node(dep)
-        arr_country = get_country_for_node(arr)
-        
-        if dep not in G:
-            G.add_node(dep, type="airport", country=dep_country)
-        if arr not in G:
-            G.add_node(arr, type="airport", country=arr_country)
-        
-        # Store distance (if available) in the edge attributes
-        G.add_edge(dep, arr, mode="air", cost_per_kg=cost, time_hr=time, distance_km=distance)
-    
-    # Add shipping edges (unchanged)
-    for _, row in shipping_data.iterrows():
-        dep = row["departure_port"]
-        arr = row["arrival_port"]
-        cost = row["cost"]  # cost per kg
-        time = row["travel_time"] * 24.0  # Convert days to hours
-        
-        dep_country = get_country_for_node(dep)
-        arr_country = get_country_for_node(arr)
-        
-        if dep not in G:
-            G.add_node(dep, type="port", country=dep_country)
-        if arr not in G:
-            G.add_node(arr, type="port", country=arr_country)
-        
-        G.add_edge(dep, arr, mode="sea", cost_per_kg=cost, time_hr=time)
+    nodes, edges = network_from_data(flight_data, shipping_data)
+    G.add_nodes_from((node, {"type": node_type, "country": get_country_for_node(node)})
+                     for node, node_type in nodes.items())
+    G.add_edges_from((u, v, attrs) for (u, v), attrs in edges.items())
     
     return G
 
+def nearest_hub_country(location: str) -> str:
+    """
+    Country of the hub nearest to a raw "lon,lat" location, or None if the
+    location is not coordinates or no hub is close enough.
+    """
+    point = parse_coords(location)
+    base = _base_network
+    if point is None or base is None:
+        return None
+    nearest = get_hub_index(base).nearest(*point, k=1, radius_km=COORDS_COUNTRY_RADIUS_KM)
+    if not nearest:
+        return None
+    return base.nodes[nearest[0][0]].get('country', "Unknown")
+
 def get_country_for_node(node_name: str) -> str:
     """
     Determine country for a node using the API
@@ -335,6 +493,11 @@ def get_country_for_node(node_name: str) -> str:
     if node_name in country_cache:
         return country_cache[node_name]
     
+    # Raw "lon,lat" input: take the country of the nearest hub
+    country = nearest_hub_country(node_name)
+    if country is not None:
+        return country
+    
     # If not, try to geocode it
     success, _, country = geocode_location(node_name)
     if success:
@@ -354,6 +517,316 @@ def add_coordinates_to_network(G: nx.DiGraph) -> nx.DiGraph:
         G.nodes[node]['coords'] = coords
     return G
 
+# Shared, read-only base network (built once, swapped atomically)
+_base_network = None
+_base_network_lock = threading.RLock()
+container_df = pd.DataFrame()
+# Capacity index over container_df, rebuilt whenever it is reloaded
+container_index = ContainerIndex([])
+location_database = {}
+
+def dataset_version(data_dir: str = None) -> str:
+    """Digest of the datasets that define the base network's edges"""
+    data_dir = data_dir or DATA_DIR
+    digest = hashlib.sha1()
+    for name in (FLIGHTS_CSV, SHIPPING_CSV):
+        with open(os.path.join(data_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def build_base_network(data_dir: str = None) -> nx.DiGraph:
+    """
+    Load the flight and shipping datasets and build the frozen base network
+    with coordinates on every node. Request-specific cities and road legs are
+    never added to this graph; they live in a per-request OverlayNetwork.
+    """
+    data_dir = data_dir or DATA_DIR
+    with time_stage("data_load"):
+        flight_data = load_flight_data(os.path.join(data_dir, FLIGHTS_CSV))
+        shipping_data = load_shipping_data(os.path.join(data_dir, SHIPPING_CSV))
+
+    if flight_data.empty or shipping_data.empty:
+        raise RuntimeError("Could not load required data files")
+
+    with time_stage("network_build"):
+        logger.info("Building transportation network...")
+        G = create_transportation_network(flight_data, shipping_data)
+
+        logger.info("Adding geographical coordinates...")
+        G = add_coordinates_to_network(G)
+        G.graph['version'] = dataset_version(data_dir)
+
+    return nx.freeze(G)
+
+# Compiled snapshot directory to boot from (see snapshot.py)
+SNAPSHOT_DIR = os.environ.get("LOGILINK_SNAPSHOT")
+
+def load_base_snapshot(snapshot_dir: str, data_dir: str = None) -> nx.DiGraph:
+    """
+    Base network from a compiled snapshot, or None if the snapshot is missing,
+    unreadable or older than the datasets. Geocodes and road legs stored in
+    the snapshot seed the persistent caches when those are behind.
+    """
+    try:
+        meta = read_snapshot_meta(snapshot_dir)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read snapshot %s: %s", snapshot_dir, e)
+        return None
+    try:
+        current = dataset_version(data_dir)
+    except OSError:
+        current = None  # Deployed with the snapshot only
+    if current is not None and current != meta["dataset_version"]:
+        logger.warning("Snapshot %s is stale (datasets changed), rebuilding from CSV", snapshot_dir)
+        return None
+
+    with time_stage("data_load"):
+        base, meta = load_snapshot(snapshot_dir)
+    if len(geocode_store) < meta["geocodes"]:
+        geocode_store.import_entries(snapshot_geocodes(snapshot_dir, meta))
+    if len(road_leg_cache) < meta["road_legs"]:
+        road_leg_cache.import_entries(snapshot_road_legs(snapshot_dir, meta))
+    logger.info("Loaded snapshot %s (version %s)", snapshot_dir, meta['dataset_version'])
+    return base
+
+def load_base_network(data_dir: str = None, snapshot_dir: str = None) -> nx.DiGraph:
+    """
+    Build the base network and supporting datasets and install them for all
+    subsequent requests. Called once at application startup. With a compiled
+    snapshot (argument or LOGILINK_SNAPSHOT) the network is loaded from it
+    instead of being rebuilt from the CSVs.
+    """
+    global container_df, container_index, location_database
+    data_dir = data_dir or DATA_DIR
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+
+    with _base_network_lock:
+        base = load_base_snapshot(snapshot_dir, data_dir) if snapshot_dir else None
+
+        migrated = migrate_geocode_cache()
+        if migrated:
+            logger.info("Migrated %d geocoded locations from %s to %s", migrated, LEGACY_GEOCODE_CACHE, GEOCODE_DB)
+        cached = load_geocode_cache()
+        logger.info("Loaded %d geocoded locations from %s", cached, GEOCODE_DB)
+
+        if base is None:
+            logger.info("Loading transportation data...")
+            base = build_base_network(data_dir)
+            # Persist locations geocoded while building the network
+            geocode_store.flush()
+        with time_stage("data_load"):
+            container_df = load_container_data(os.path.join(data_dir, CONTAINERS_CSV))
+            container_index = ContainerIndex.from_dataframe(container_df)
+            location_database = load_location_database(os.path.join(data_dir, LOCATIONS_CSV))
+        install_base_network(base)
+
+    logger.info("Base network ready: %d nodes, %d edges", base.number_of_nodes(), base.number_of_edges())
+    return base
+
+def install_base_network(base: nx.DiGraph) -> None:
+    """
+    Build the derived indexes of a frozen base network and swap it in.
+    Requests already running keep the network they started with.
+    """
+    global _base_network
+    with time_stage("network_build"):
+        get_hub_index(base)
+        table = get_transfer_table(base)
+        if CSR_NETWORK:
+            get_compact_base(base)
+    logger.info("Transfer table: %d backbone paths between %d hubs", len(table), len(table.hubs))
+    with _base_network_lock:
+        previous = _base_network
+        _base_network = base
+    # Evaluations computed on replaced data can never be valid again
+    if previous is not None and get_network_version(previous) != get_network_version(base):
+        evaluation_cache.invalidate_prefix(get_network_version(previous))
+
+def _unique_endpoints(dep: np.ndarray, arr: np.ndarray) -> np.ndarray:
+    """Distinct node names in first-seen order (row 0 dep, row 0 arr, row 1 dep, ...)"""
+    return pd.unique(np.column_stack((dep, arr)).ravel())
+
+def _last_row_per_edge(dep: np.ndarray, arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deduplicate (dep, arr) pairs. Returns the first row of each distinct pair
+    (in first-seen order) and the last row of the same pair: networkx keeps an
+    edge where it was first added, with the attributes it was last given.
+    """
+    pairs = pd.DataFrame({"dep": dep, "arr": arr})
+    group = pairs.groupby(["dep", "arr"], sort=False).ngroup().to_numpy()
+    first = np.flatnonzero(~pairs.duplicated(keep="first").to_numpy())
+    last = np.full(len(first), -1, dtype=np.int64)
+    np.maximum.at(last, group, np.arange(len(group)))
+    return first, last
+
+def network_from_data(flight_data: pd.DataFrame, shipping_data: pd.DataFrame
+                      ) -> Tuple[Dict[str, str], Dict[Tuple[str, str], Dict[str, Any]]]:
+    """
+    The node types and edge attributes of the transportation network, built
+    from column arrays without resolving countries or coordinates. Nodes and
+    edges are in the order row-by-row insertion would give: airports before
+    ports, and a node keeps the type of the dataset it first appears in.
+    """
+    edges = {}
+
+    dep = flight_data["departure_airport"].to_numpy()
+    arr = flight_data["arrival_airport"].to_numpy()
+    nodes = dict.fromkeys(_unique_endpoints(dep, arr).tolist(), "airport")
+    first, last = _last_row_per_edge(dep, arr)
+    if "distance_km" in flight_data.columns:
+        distance = flight_data["distance_km"].to_numpy()[last]
+        distance = np.where(pd.isna(distance), None, distance).tolist()
+    else:
+        distance = [None] * len(last)
+    for u, v, cost, time_hr, dist in zip(dep[first].tolist(), arr[first].tolist(),
+                                         flight_data["cost"].to_numpy()[last].tolist(),
+                                         flight_data["travel_time"].to_numpy()[last].tolist(), distance):
+        edges[(u, v)] = {"mode": "air", "cost_per_kg": cost, "time_hr": time_hr, "distance_km": dist}
+
+    dep = shipping_data["departure_port"].to_numpy()
+    arr = shipping_data["arrival_port"].to_numpy()
+    for node in _unique_endpoints(dep, arr).tolist():
+        nodes.setdefault(node, "port")
+    first, last = _last_row_per_edge(dep, arr)
+    time_hr = (shipping_data["travel_time"].to_numpy()[last] * 24.0).tolist()  # Days to hours
+    for u, v, cost, hours in zip(dep[first].tolist(), arr[first].tolist(),
+                                 shipping_data["cost"].to_numpy()[last].tolist(), time_hr):
+        edges.setdefault((u, v), {}).update(mode="sea", cost_per_kg=cost, time_hr=hours)
+
+    return nodes, edges
+
+def patch_base_network(base: nx.DiGraph, flight_data: pd.DataFrame,
+                       shipping_data: pd.DataFrame) -> Tuple[nx.DiGraph, Dict[str, int]]:
+    """
+    Apply changed datasets to a copy of the base network: only added, removed
+    or changed edges and nodes are touched, and only new nodes are geocoded.
+    Returns the new (frozen) network and counts of what changed.
+    """
+    nodes, edges = network_from_data(flight_data, shipping_data)
+    G = nx.DiGraph(base)
+    # Derived indexes belong to the old network
+    G.graph = {}
+    stats = {"edges_added": 0, "edges_removed": 0, "edges_changed": 0, "nodes_added": 0, "nodes_removed": 0,
+             "nodes_changed": 0}
+
+    for u, v in [(u, v) for u, v in G.edges() if (u, v) not in edges]:
+        G.remove_edge(u, v)
+        stats["edges_removed"] += 1
+    for node in [n for n in G.nodes() if n not in nodes]:
+        G.remove_node(node)
+        stats["nodes_removed"] += 1
+
+    for node, node_type in nodes.items():
+        if node not in G:
+            G.add_node(node, type=node_type, country=get_country_for_node(node),
+                       coords=get_location_coords(node))
+            stats["nodes_added"] += 1
+        elif G.nodes[node].get('type') != node_type:
+            # A hub moved between the flight and shipping feeds
+            G.nodes[node]['type'] = node_type
+            stats["nodes_changed"] += 1
+    for (u, v), attrs in edges.items():
+        if not G.has_edge(u, v):
+            G.add_edge(u, v, **attrs)
+            stats["edges_added"] += 1
+        elif G[u][v] != attrs:
+            G[u][v].clear()
+            G[u][v].update(attrs)
+            stats["edges_changed"] += 1
+
+    return nx.freeze(G), stats
+
+def reload_datasets(changed: List[str] = None, data_dir: str = None) -> bool:
+    """
+    Pick up edited dataset files without a restart. Flight/shipping changes
+    are patched into a new version of the base network, which is swapped in
+    atomically; container and location tables are reloaded whole. Returns
+    True if anything was reloaded.
+    """
+    global container_df, container_index, location_database
+    data_dir = data_dir or DATA_DIR
+    changed = set(changed) if changed is not None else {FLIGHTS_CSV, SHIPPING_CSV, CONTAINERS_CSV, LOCATIONS_CSV}
+    reloaded = False
+
+    if changed & {FLIGHTS_CSV, SHIPPING_CSV}:
+        with _base_network_lock:
+            current = get_base_network()
+            version = dataset_version(data_dir)
+            if version != current.graph.get('version'):
+                flight_data = load_flight_data(os.path.join(data_dir, FLIGHTS_CSV))
+                shipping_data = load_shipping_data(os.path.join(data_dir, SHIPPING_CSV))
+                if flight_data.empty or shipping_data.empty:
+                    logger.warning("Ignoring dataset change, could not load flight and shipping data")
+                else:
+                    base, stats = patch_base_network(current, flight_data, shipping_data)
+                    base.graph['version'] = version
+                    geocode_store.flush()
+                    install_base_network(base)
+                    logger.info("Base network patched to version %s: %s", version, stats)
+                    reloaded = True
+
+    if CONTAINERS_CSV in changed:
+        container_df = load_container_data(os.path.join(data_dir, CONTAINERS_CSV))
+        container_index = ContainerIndex.from_dataframe(container_df)
+        # Road costs depend on container capacities
+        evaluation_cache.invalidate()
+        reloaded = True
+    if LOCATIONS_CSV in changed:
+        location_database = load_location_database(os.path.join(data_dir, LOCATIONS_CSV))
+        reloaded = True
+    return reloaded
+
+def get_base_network() -> nx.DiGraph:
+    """Return the shared base network, building it on first use"""
+    if _base_network is None:
+        with _base_network_lock:
+            if _base_network is None:
+                load_base_network()
+    return _base_network
+
+def build_request_network(source: str, destination: str, base: nx.DiGraph = None) -> OverlayNetwork:
+    """
+    Create the per-request overlay: source/destination city nodes and their
+    road legs on top of the shared base network.
+    """
+    G = OverlayNetwork(base if base is not None else get_base_network())
+    add_road_connections(G, source, destination)
+    return G
+
+# Run the optimizer on an array-backed copy of the base network
+CSR_NETWORK = os.environ.get("LOGILINK_CSR_NETWORK", "0") == "1"
+
+def get_compact_base(G) -> CSRGraph:
+    """
+    Array-backed (CSR) copy of the (base) network, built on first use and
+    cached on it. It shares the base network's version and derived indexes,
+    so cached evaluations and the table join carry over unchanged.
+    """
+    base = getattr(G, 'base', G)
+    if isinstance(base, CSRGraph):
+        return base
+    csr = base.graph.get('csr')
+    if csr is None:
+        with _base_network_lock:
+            csr = base.graph.get('csr')
+            if csr is None:
+                csr = CSRGraph.from_graph(base, version=get_network_version(base))
+                csr.graph['hub_index'] = get_hub_index(base)
+                csr.graph['transfer_table'] = get_transfer_table(base)
+                csr.graph['edge_arrays'] = (0, get_edge_arrays(base))
+                base.graph['csr'] = csr
+    return csr
+
+def compact_network(G):
+    """
+    Request network for the optimizer's hot loops: the request's own city
+    nodes and road legs over the array-backed copy of its base network.
+    Only the overlay is copied; the base CSR is shared by every request.
+    """
+    if isinstance(G, OverlayNetwork):
+        return G.with_base(get_compact_base(G))
+    return get_compact_base(G)
+
 def are_in_same_continent(country1: str, country2: str) -> bool:
     """Check if two countries are on the same continent"""
     continent_map = {
@@ -387,17 +860,30 @@ def is_road_connection_feasible(source_country: str, dest_country: str, distance
         
     return True
 
-def parallel_road_connections(G, source_node, nodes_to_connect, is_source_to_nodes=True):
+# Use the OSRM table service to rank hubs before fetching full routes
+ROAD_MATRIX_MODE = os.environ.get("LOGILINK_ROAD_MATRIX", "1") == "1"
+# Optional cap on the road legs kept per hub type (airport/port) after matrix
+# ranking. Unset, every candidate hub OSRM can reach is kept, so matrix mode
+# adds the same legs as the per-hub path; a cap trades legs for fewer routes.
+ROAD_MATRIX_KEEP = (int(os.environ["LOGILINK_ROAD_MATRIX_KEEP"])
+                    if os.environ.get("LOGILINK_ROAD_MATRIX_KEEP") else None)
+
+def parallel_road_connections(G, source_node, nodes_to_connect, is_source_to_nodes=True, use_matrix=None):
     """Process road connections in parallel"""
+    if use_matrix is None:
+        use_matrix = ROAD_MATRIX_MODE
+    if use_matrix:
+        return matrix_road_connections(G, source_node, nodes_to_connect, is_source_to_nodes)
+    
     results = {}
     source_coords = G.nodes[source_node]['coords']
     
     def process_connection(node):
         node_coords = G.nodes[node]['coords']
         if is_source_to_nodes:
-            road_data = get_road_route(source_coords, node_coords)
+            road_data = get_cached_road_route(source_coords, node_coords)
         else:
-            road_data = get_road_route(node_coords, source_coords)
+            road_data = get_cached_road_route(node_coords, source_coords)
         return node, road_data
     
     # Use ThreadPoolExecutor to parallelize API calls
@@ -411,6 +897,120 @@ def parallel_road_connections(G, source_node, nodes_to_connect, is_source_to_nod
     
     return results
 
+def rank_hub_legs(G, estimates: Dict[str, Tuple[float, float]], max_per_type: Optional[int]) -> List[str]:
+    """
+    Keep the fastest `max_per_type` hubs of each type (all of them for None),
+    given {node: (distance_km, time_hr)} road-leg estimates.
+    """
+    by_type = {}
+    for node, (distance_km, time_hr) in estimates.items():
+        by_type.setdefault(G.nodes[node].get('type'), []).append((time_hr, node))
+    return [node for legs in by_type.values() for _, node in sorted(legs)[:max_per_type]]
+
+def matrix_road_connections(G, source_node, nodes_to_connect, is_source_to_nodes=True,
+                            max_per_type: int = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Connect a city to many hubs with a single OSRM table request.
+    Distances/durations for all uncached hubs come from one matrix call, and
+    full routes (with geometry) are fetched only for hubs OSRM can reach,
+    limited to the fastest `max_per_type` per hub type when a cap is set
+    (default ROAD_MATRIX_KEEP). Hubs are pre-screened for feasibility by
+    candidate_hubs, so without a cap the legs are the ones the per-hub path
+    adds. Hubs whose table request failed fall back to one route request each.
+    """
+    if max_per_type is None:
+        max_per_type = ROAD_MATRIX_KEEP
+    source_coords = G.nodes[source_node]['coords']
+    
+    def leg_coords(node):
+        node_coords = G.nodes[node]['coords']
+        return (source_coords, node_coords) if is_source_to_nodes else (node_coords, source_coords)
+    
+    def fetch_routes(nodes):
+        routes = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {executor.submit(get_cached_road_route, *leg_coords(node)): node for node in nodes}
+            for future in concurrent.futures.as_completed(futures):
+                road_data = future.result()
+                if road_data["success"]:
+                    routes[futures[future]] = road_data
+        return routes
+    
+    # Cached legs don't need the matrix call
+    estimates = {}
+    uncached = []
+    for node in nodes_to_connect:
+        cached = cached_road_leg(*leg_coords(node))
+        if cached is not None:
+            estimates[node] = (cached["distance_km"], cached["time_hr"])
+        else:
+            uncached.append(node)
+    
+    failed = []
+    if uncached:
+        table = get_road_table(source_coords, [G.nodes[n]['coords'] for n in uncached], is_source_to_nodes)
+        for node, leg in zip(uncached, table):
+            if leg is ROAD_TABLE_FAILED:
+                failed.append(node)
+            elif leg is not None:
+                estimates[node] = leg
+    
+    # Without the matrix, those hubs are routed one by one, as with LOGILINK_ROAD_MATRIX=0
+    fetched = fetch_routes(failed) if failed else {}
+    for node, road_data in fetched.items():
+        estimates[node] = (road_data["distance_km"], road_data["time_hr"])
+    
+    survivors = rank_hub_legs(G, estimates, max_per_type)
+    
+    # Fetch full routes (geometry) for the surviving legs only
+    results = {node: fetched[node] for node in survivors if node in fetched}
+    results.update(fetch_routes([node for node in survivors if node not in fetched]))
+    return results
+
+def country_hub_nodes(G, country: str, exclude: Tuple[str, ...] = ()) -> List[str]:
+    """Nodes in the given country that can be connected by road"""
+    return [n for n, data in G.nodes(data=True)
+            if data.get('country') == country and n not in exclude]
+
+# Nearest-hub search limits for road connections
+HUB_SEARCH_K = int(os.environ.get("LOGILINK_HUB_SEARCH_K", 20))
+HUB_SEARCH_RADIUS_KM = float(os.environ.get("LOGILINK_HUB_SEARCH_RADIUS_KM", 5000))
+# Raw coordinates take the country of a hub at most this far away
+COORDS_COUNTRY_RADIUS_KM = 500
+
+def get_hub_index(G) -> HubIndex:
+    """Spatial index over the airports and ports of the (base) network"""
+    base = getattr(G, 'base', G)
+    index = base.graph.get('hub_index')
+    if index is None:
+        index = HubIndex.from_graph(base)
+        base.graph['hub_index'] = index
+    return index
+
+def candidate_hubs(G, city: str, country: str, exclude: Tuple[str, ...] = ()) -> List[str]:
+    """
+    The HUB_SEARCH_K nearest hubs in the city's country within
+    HUB_SEARCH_RADIUS_KM. Hubs are pre-screened with is_road_connection_feasible
+    on great-circle distance, a lower bound on the road distance, so no road
+    query is made for a leg that could never be feasible.
+    """
+    point = parse_coords(G.nodes[city]['coords'])
+    if point is None:
+        return country_hub_nodes(G, country, exclude)
+    
+    hubs = []
+    for node, distance_km in get_hub_index(G).within(*point, HUB_SEARCH_RADIUS_KM):
+        hub_country = G.nodes[node].get('country')
+        if node in exclude or hub_country != country:
+            continue
+        if not is_road_connection_feasible(country, hub_country, distance_km):
+            continue
+        hubs.append(node)
+        if len(hubs) >= HUB_SEARCH_K:
+            break
+    return hubs
+
+@time_stage("road_augmentation")
 def add_road_connections(G: nx.DiGraph, source: str, destination: str) -> nx.DiGraph:
     """
     Add road connections from source to airports/ports and from airports/ports to destination
@@ -423,35 +1023,29 @@ def add_road_connections(G: nx.DiGraph, source: str, destination: str) -> nx.DiG
     source_country = get_country_for_node(source)
     dest_country = get_country_for_node(destination)
     
-    print(f"Adding road connections for {source} ({source_country}) to {destination} ({dest_country})")
+    logger.debug("Adding road connections for %s (%s) to %s (%s)", source, source_country, destination, dest_country)
     
     # Add source and destination to the graph
     G.add_node(source, type="city", country=source_country, coords=source_coords)
     G.add_node(destination, type="city", country=dest_country, coords=dest_coords)
     
     # Check if direct road connection is feasible
-    road_data = get_road_route(source_coords, dest_coords)
+    road_data = get_cached_road_route(source_coords, dest_coords)
     if road_data["success"] and is_road_connection_feasible(source_country, dest_country, road_data["distance_km"]):
         G.add_edge(source, destination, **road_data, mode="road")
-        print(f"Added direct road connection: {source} -> {destination} ({road_data['distance_km']:.1f} km)")
-    
-    # Find nodes in source country
-    source_country_nodes = [n for n, data in G.nodes(data=True) 
-                           if data.get('country') == source_country and 
-                           n != source and n != destination]
+        logger.debug("Added direct road connection: %s -> %s (%.1f km)", source, destination, road_data['distance_km'])
     
-    # Find nodes in destination country
-    dest_country_nodes = [n for n, data in G.nodes(data=True) 
-                         if data.get('country') == dest_country and 
-                         n != source and n != destination]
+    # Find the nearest feasible hubs in the source and destination countries
+    source_country_nodes = candidate_hubs(G, source, source_country, (source, destination))
+    dest_country_nodes = candidate_hubs(G, destination, dest_country, (source, destination))
     
-    print(f"Connecting {source} to {len(source_country_nodes)} nodes in {source_country}")
+    logger.debug("Connecting %s to %d nodes in %s", source, len(source_country_nodes), source_country)
     # Connect source to nodes in its country
     source_airport_connections = parallel_road_connections(G, source, source_country_nodes, True)
     for node, road_data in source_airport_connections.items():
         G.add_edge(source, node, **road_data, mode="road")
     
-    print(f"Connecting {len(dest_country_nodes)} nodes in {dest_country} to {destination}")
+    logger.debug("Connecting %d nodes in %s to %s", len(dest_country_nodes), dest_country, destination)
     # Connect destination country nodes to destination
     dest_airport_connections = parallel_road_connections(G, destination, dest_country_nodes, False)
     for node, road_data in dest_airport_connections.items():
@@ -462,12 +1056,15 @@ def add_road_connections(G: nx.DiGraph, source: str, destination: str) -> nx.DiG
 # -------------------------------------------------------------------------
 # ROUTE GENERATION AND EVALUATION FUNCTIONS
 # -------------------------------------------------------------------------
-def find_multimodal_routes(G: nx.DiGraph, source: str, destination: str, max_routes: int = 20) -> List[List[str]]:
+def find_multimodal_routes(G: nx.DiGraph, source: str, destination: str, max_routes: int = 20,
+                           cargo_weight: float = 100.0, goods_type: str = 'standard') -> List[List[str]]:
     """
     Find realistic multi-modal routes:
-    1. Direct road route if available
-    2. Source -> port (road) -> destination (road) if in same continent
-    3. Source -> port (road) -> port -> destination (road) for intercontinental travel
+    1. Pareto-optimal multi-hop routes from the label-setting search
+       (road -> one or more flights/sailings -> road), for the given cargo
+    2. Direct road route if available
+    3. Source -> hub (road) -> hub -> destination (road) single-leg templates
+    Every Pareto route is returned; templates fill up to max_routes.
     """
     routes = []
     source_country = G.nodes[source].get('country', 'Unknown')
@@ -476,12 +1073,12 @@ def find_multimodal_routes(G: nx.DiGraph, source: str, destination: str, max_rou
     # Check if countries are on the same continent
     same_continent = are_in_same_continent(source_country, dest_country)
     
-    print(f"Finding routes from {source} ({source_country}) to {destination} ({dest_country})")
-    print(f"Same continent: {same_continent}")
+    logger.debug("Finding routes from %s (%s) to %s (%s), same continent: %s",
+                 source, source_country, destination, dest_country, same_continent)
     
     # 1. Check for direct road connection
     if G.has_edge(source, destination) and G[source][destination]['mode'] == 'road':
-        print("Direct road route available")
+        logger.debug("Direct road route available")
         routes.append([source, destination])
     
     # Get airports/ports in source country with road connections from source
@@ -518,128 +1115,234 @@ def find_multimodal_routes(G: nx.DiGraph, source: str, destination: str, max_rou
             if G.has_edge(src_port, dest_port):
                 routes.append([source, src_port, dest_port, destination])
     
-    return routes[:max_routes]
+    pareto = find_pareto_routes(G, source, destination, cargo_weight, goods_type)
+    logger.debug("Label-setting search found %d Pareto-optimal routes", len(pareto))
+    
+    merged = list(pareto)
+    for route in routes:
+        if route not in merged:
+            merged.append(route)
+    return merged[:max(max_routes, len(pareto))]
+
+# Backbone (air/sea) legs allowed between the first and last road leg
+MAX_BACKBONE_LEGS = int(os.environ.get("LOGILINK_MAX_BACKBONE_LEGS", 3))
+
+def find_pareto_routes(G, source: str, destination: str, cargo_weight: float, goods_type: str,
+                       max_backbone_legs: int = None) -> List[List[str]]:
+    """
+    Pareto-optimal routes over (cost, time, emissions). Routes take a road
+    leg from the source, then up to max_backbone_legs flights or sailings,
+    then a road leg to the destination; the direct road leg is the only
+    all-road route.
+
+    Request overlays (and compacted copies of them) join their road legs with
+    the base network's transfer table; other networks run the label-setting
+    search directly.
+    """
+    if max_backbone_legs is None:
+        max_backbone_legs = MAX_BACKBONE_LEGS
+    if source not in G or destination not in G:
+        return []
+    if isinstance(G, (OverlayNetwork, CSRGraph)):
+        table = get_transfer_table(G)
+        if table.max_legs == max_backbone_legs:
+            return join_transfer_table(G, table, source, destination, cargo_weight, goods_type)
+    
+    objectives = {}
+    
+    def edge_objectives(u, v):
+        key = (u, v)
+        if key not in objectives:
+            segment = evaluate_segment(G, u, v, cargo_weight, goods_type)
+            objectives[key] = (segment['total_segment_cost'], segment['time_hr'], segment['co2_emissions'])
+        return objectives[key]
+    
+    # State is (node, whether a backbone leg has been taken)
+    def expand(state):
+        node, on_backbone = state
+        for nbr, data in G.succ[node].items():
+            if data['mode'] == 'road':
+                if node == source and not on_backbone:
+                    yield (nbr, False), edge_objectives(node, nbr)
+                elif nbr == destination and on_backbone:
+                    yield (nbr, True), edge_objectives(node, nbr)
+            elif nbr not in (source, destination):
+                yield (nbr, True), edge_objectives(node, nbr)
+    
+    paths = pareto_paths((source, False), lambda state: state[0] == destination, expand,
+                         n_objectives=3, max_hops=max_backbone_legs + 2)
+    return [[node for node, _ in path] for _, path in paths]
+
+def backbone_objectives(data: Dict[str, Any]) -> Tuple[float, float, float]:
+    """
+    Per-kg (cost, time, emissions) of a flight or sailing edge. Backbone
+    costs and emissions scale linearly with cargo weight, and every backbone
+    leg gets the same goods-type cost factor, so Pareto sets over these
+    per-kg values hold for any cargo.
+    """
+    mode = data['mode']
+    if mode == 'air':
+        distance = data.get('distance_km', None)
+        if distance is None:
+            distance = data['time_hr'] * 800
+    else:
+        distance = data.get('distance_km', data['time_hr'] * 40)
+    return data['cost_per_kg'], data['time_hr'], calculate_co2(mode, distance, 1.0)
+
+def build_transfer_table(G: nx.DiGraph, max_legs: int = None) -> TransferTable:
+    """Pareto backbone paths with up to max_legs flights/sailings between all hubs"""
+    if max_legs is None:
+        max_legs = MAX_BACKBONE_LEGS
+    objectives = {}
+    
+    def expand(node):
+        for nbr, data in G.succ[node].items():
+            if data['mode'] in ('air', 'sea'):
+                key = (node, nbr)
+                if key not in objectives:
+                    objectives[key] = backbone_objectives(data)
+                yield nbr, objectives[key]
+    
+    hubs = [n for n, data in G.nodes(data=True) if data.get('type') in ('airport', 'port')]
+    return TransferTable.build(hubs, expand, n_objectives=3, max_legs=max_legs)
+
+def get_transfer_table(G) -> TransferTable:
+    """Transfer table of the (base) network, built on first use"""
+    base = getattr(G, 'base', G)
+    table = base.graph.get('transfer_table')
+    if table is None:
+        with _base_network_lock:
+            table = base.graph.get('transfer_table')
+            if table is None:
+                table = build_transfer_table(base)
+                base.graph['transfer_table'] = table
+    return table
+
+def join_transfer_table(G, table: TransferTable, source: str, destination: str,
+                        cargo_weight: float, goods_type: str) -> List[List[str]]:
+    """
+    Pareto routes from the request's road legs and the precomputed transfer
+    table: source -> hub (road), table path, hub -> destination (road).
+    Work depends on the number of road legs, not on the backbone size.
+    """
+    factor = (GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0) + GOODS_IMPACT_RATE.get(goods_type, 0) +
+              get_customs_rate(goods_type))
+    per_kg = np.array([cargo_weight * factor, 1.0, cargo_weight])
+    
+    def road_objectives(u, v):
+        segment = evaluate_segment(G, u, v, cargo_weight, goods_type)
+        return np.array([segment['total_segment_cost'], segment['time_hr'], segment['co2_emissions']])
+    
+    vectors, routes = [], []
+    if G.has_edge(source, destination) and G[source][destination]['mode'] == 'road':
+        vectors.append(road_objectives(source, destination))
+        routes.append([source, destination])
     
-    print(f"Generated {len(routes)} routes so far")
+    first_legs = [(hub, road_objectives(source, hub)) for hub, data in G.succ[source].items()
+                  if data['mode'] == 'road' and hub in table]
+    last_legs = [(hub, road_objectives(hub, destination)) for hub, data in G.pred[destination].items()
+                 if data['mode'] == 'road' and hub in table]
+    for first_hub, first_vector in first_legs:
+        for last_hub, last_vector in last_legs:
+            for entry in table.entries(first_hub, last_hub):
+                vectors.append(first_vector + table.objectives[entry] * per_kg + last_vector)
+                routes.append([source] + table.path(entry) + [destination])
     
-    # 4. If we still need more routes and same continent, try mixed-mode connections
-    if len(routes) < max_routes:
-        all_src_hubs = source_airports + source_seaports
-        all_dst_hubs = dest_airports + dest_seaports
-        
-        for src_hub in all_src_hubs:
-            for dst_hub in all_dst_hubs:
-                # Skip if already have this direct connection
-                if [source, src_hub, dst_hub, destination] in routes:
-                    continue
-                    
-                # Try to find a path with at most 2 intermediate stops
-                try:
-                    paths = nx.all_simple_paths(G, src_hub, dst_hub, cutoff=2)
-                    for path in paths:
-                        if len(path) > 2:  # Only if it's not a direct connection
-                            full_path = [source] + path + [destination]
-                            if full_path not in routes:
-                                routes.append(full_path)
-                            if len(routes) >= max_routes:
-                                break
-                except (nx.NetworkXNoPath, nx.NodeNotFound):
-                    continue
-    
-    print(f"Final route count: {len(routes)}")
-    return routes[:max_routes]
+    if not routes:
+        return []
+    F = np.array(vectors)
+    front = sorted(pareto_front(F), key=lambda i: tuple(F[i]))
+    pareto_routes, seen = [], set()
+    for i in front:
+        if tuple(F[i]) not in seen:
+            seen.add(tuple(F[i]))
+            pareto_routes.append(routes[i])
+    return pareto_routes
 
-def evaluate_route(G: nx.DiGraph, route: List[str], cargo_weight: float, goods_type: str) -> Dict[str, Any]:
+def evaluate_segment(G: nx.DiGraph, start: str, end: str, cargo_weight: float, goods_type: str) -> Dict[str, Any]:
     """
-    Evaluate a route based on total cost, time, and CO2 emissions.
+    Cost, time and emissions of a single edge of a route.
+    Returns None if there is no edge between start and end.
     """
+    if not G.has_edge(start, end):
+        return None
+
+    multiplier = GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0)
+    edge_data = G[start][end]
+    mode = edge_data['mode']
+    containers = container_index.count(mode, cargo_weight)
+    
+    if mode == 'road':
+        # Road legs are priced per truck, one container each
+        segment_cost = edge_data['total_cost'] * containers
+        segment_time = edge_data['time_hr']
+        segment_distance = edge_data['distance_km']
+        segment_geometry = edge_data.get('geometry', None)
+        segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
+    
+    elif mode == 'air':
+        # Use flight distance from CSV if available; otherwise, estimate using time and an average speed (800 km/h)
+        segment_distance = edge_data.get('distance_km', None)
+        if segment_distance is None:
+            segment_distance = edge_data['time_hr'] * 800
+        segment_cost = edge_data['cost_per_kg'] * cargo_weight
+        segment_time = edge_data['time_hr']
+        segment_geometry = None
+        segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
+    
+    elif mode == 'sea':
+        segment_cost = edge_data['cost_per_kg'] * cargo_weight
+        segment_time = edge_data['time_hr']
+        segment_distance = edge_data.get('distance_km', edge_data['time_hr'] * 40)
+        segment_geometry = None
+        segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
+    
+    adjusted_cost = segment_cost * multiplier
+    
+    goods_impact = 0
+    if goods_type in GOODS_IMPACT_RATE:
+        goods_impact = segment_cost * GOODS_IMPACT_RATE[goods_type]
+    
+    customs_cost = 0
+    if mode in ['air', 'sea']:
+        customs_cost = segment_cost * get_customs_rate(goods_type)
+    
+    segment_total_cost = adjusted_cost + goods_impact + customs_cost
+    
+    segment_data = {
+        'start': start,
+        'end': end,
+        'mode': mode,
+        'distance_km': segment_distance,
+        'time_hr': segment_time,
+        'base_cost': segment_cost,
+        'goods_type_multiplier': multiplier,
+        'adjusted_cost': adjusted_cost,
+        'goods_impact': goods_impact,
+        'customs_cost': customs_cost,
+        'total_segment_cost': segment_total_cost,
+        'co2_emissions': segment_emissions,
+        'containers': containers
+    }
+    if segment_geometry:
+        segment_data['geometry'] = segment_geometry
+    return segment_data
+
+def combine_segments(segments: List[Dict[str, Any]], goods_type: str) -> Dict[str, Any]:
+    """Route totals for a list of evaluated segments"""
     total_cost = 0
     total_time = 0
     total_distance = 0
     total_emissions = 0
-    segments = []
-    
-    multiplier = GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0)
     
-    for i in range(len(route) - 1):
-        start = route[i]
-        end = route[i+1]
-        
-        if G.has_edge(start, end):
-            edge_data = G[start][end]
-            mode = edge_data['mode']
-            
-            if mode == 'road':
-                segment_cost = edge_data['total_cost']
-                segment_time = edge_data['time_hr']
-                segment_distance = edge_data['distance_km']
-                segment_geometry = edge_data.get('geometry', None)
-                segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
-            
-            elif mode == 'air':
-                # Use flight distance from CSV if available; otherwise, estimate using time and an average speed (800 km/h)
-                segment_distance = edge_data.get('distance_km', None)
-                if segment_distance is None:
-                    segment_distance = edge_data['time_hr'] * 800
-                segment_cost = edge_data['cost_per_kg'] * cargo_weight
-                segment_time = edge_data['time_hr']
-                segment_geometry = None
-                segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
-            
-            elif mode == 'sea':
-                segment_cost = edge_data['cost_per_kg'] * cargo_weight
-                segment_time = edge_data['time_hr']
-                segment_distance = edge_data.get('distance_km', edge_data['time_hr'] * 40)
-                segment_geometry = None
-                segment_emissions = calculate_co2(mode, segment_distance, cargo_weight)
-            
-            adjusted_cost = segment_cost * multiplier
-            
-            goods_impact = 0
-            if goods_type == 'perishable':
-                goods_impact = segment_cost * 0.3
-            elif goods_type == 'hazardous':
-                goods_impact = segment_cost * 0.2
-            elif goods_type == 'fragile':
-                goods_impact = segment_cost * 0.1
-            
-            customs_cost = 0
-            if mode in ['air', 'sea']:
-                customs_rate = 0.05
-                if goods_type in ['hazardous', 'high_value']:
-                    customs_rate = 0.08
-                customs_cost = segment_cost * customs_rate
-            
-            segment_total_cost = adjusted_cost + goods_impact + customs_cost
-            
-            total_cost += segment_total_cost
-            total_time += segment_time
-            if mode == 'road':
-                total_distance += segment_distance
-            total_emissions += segment_emissions
-            
-            segment_data = {
-                'start': start,
-                'end': end,
-                'mode': mode,
-                'distance_km': segment_distance,
-                'time_hr': segment_time,
-                'base_cost': segment_cost,
-                'goods_type_multiplier': multiplier,
-                'adjusted_cost': adjusted_cost,
-                'goods_impact': goods_impact,
-                'customs_cost': customs_cost,
-                'total_segment_cost': segment_total_cost,
-                'co2_emissions': segment_emissions
-            }
-            if segment_geometry:
-                segment_data['geometry'] = segment_geometry
-                
-            segments.append(segment_data)
-        else:
-            print(f"Error: No edge between {start} and {end}")
-            return {'valid': False, 'total_cost': float('inf'), 'total_time': float('inf')}
+    for segment in segments:
+        total_cost += segment['total_segment_cost']
+        total_time += segment['time_hr']
+        if segment['mode'] == 'road':
+            total_distance += segment['distance_km']
+        total_emissions += segment['co2_emissions']
     
+    multiplier = GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0)
     goods_type_score = 0 if goods_type in ['standard', 'raw'] else multiplier * math.sqrt(total_time) * 10
     
     return {
@@ -653,20 +1356,232 @@ def evaluate_route(G: nx.DiGraph, route: List[str], cargo_weight: float, goods_t
         'segments': segments
     }
 
-# Add this near the top of your file
-from functools import lru_cache
+def evaluate_route(G: nx.DiGraph, route: List[str], cargo_weight: float, goods_type: str) -> Dict[str, Any]:
+    """
+    Evaluate a route based on total cost, time, and CO2 emissions.
+    """
+    segments = []
+    
+    for i in range(len(route) - 1):
+        start = route[i]
+        end = route[i+1]
+        
+        segment_data = evaluate_segment(G, start, end, cargo_weight, goods_type)
+        if segment_data is None:
+            logger.debug("No edge between %s and %s", start, end)
+            return {'valid': False, 'total_cost': float('inf'), 'total_time': float('inf')}
+        segments.append(segment_data)
+    
+    return combine_segments(segments, goods_type)
 
-# Create a route evaluation cache wrapper
-@lru_cache(maxsize=256)
-def cached_route_evaluation(route_tuple, cargo_weight, goods_type, G):
-    """Cache-friendly wrapper for route evaluation"""
-    route = list(route_tuple)
-    return evaluate_route(G, route, cargo_weight, goods_type)
+# Evaluations shared across requests; keyed on the network version so a
+# data reload or a different set of road legs never reuses stale results
+EVALUATION_CACHE_SIZE = int(os.environ.get("LOGILINK_EVAL_CACHE_SIZE", 50_000))
+evaluation_cache = EvaluationCache(EVALUATION_CACHE_SIZE)
+
+def get_network_version(G) -> str:
+    """
+    Version string for the edges of a network. The base network carries the
+    dataset version; a request overlay appends a digest of its own edges, so
+    requests that add identical road legs share cached evaluations.
+    """
+    if not isinstance(G, OverlayNetwork):
+        return G.graph.get('version') or f"graph-{id(G)}"
+
+    cached = G.graph.get('overlay_version')
+    if cached is not None and cached[0] == G.mutations:
+        return cached[1]
+    digest = hashlib.sha1()
+    for u, v, data in sorted(G.overlay_edges(data=True), key=lambda e: (str(e[0]), str(e[1]))):
+        digest.update(repr((u, v, sorted(data.items()))).encode())
+    version = f"{get_network_version(G.base)}+{digest.hexdigest()[:16]}"
+    G.graph['overlay_version'] = (G.mutations, version)
+    return version
 
-# Then modify your route evaluation calls like:
 def evaluate_with_cache(G, route, cargo_weight, goods_type):
-    """Cached route evaluation"""
-    return cached_route_evaluation(tuple(route), cargo_weight, goods_type, G)
+    """
+    Cached route evaluation. The returned dict is shared with the cache and
+    must not be modified; copy it first (see copy_evaluation).
+    """
+    key = EvaluationCache.key(get_network_version(G), route, cargo_weight, goods_type)
+    evaluation = evaluation_cache.get(key)
+    count_cache("evaluation", evaluation is not None)
+    if evaluation is None:
+        evaluation = evaluate_route(G, route, cargo_weight, goods_type)
+        evaluation_cache.put(key, evaluation)
+    return evaluation
+
+def copy_evaluation(evaluation: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an evaluation whose segments can be modified safely"""
+    evaluation = dict(evaluation)
+    if 'segments' in evaluation:
+        evaluation['segments'] = [dict(segment) for segment in evaluation['segments']]
+    return evaluation
+
+# -------------------------------------------------------------------------
+# BATCH (VECTORIZED) ROUTE EVALUATION
+# -------------------------------------------------------------------------
+MODE_CODES = {'road': 0, 'air': 1, 'sea': 2}
+MODE_CO2_FACTORS = np.array([CO2_FACTORS['road'], CO2_FACTORS['air'], CO2_FACTORS['sea']])
+
+class EdgeArrays:
+    """
+    Columnar copy of the edge attributes evaluate_route reads, with an
+    (u, v) -> row lookup. The last row is an all-zero padding edge.
+    
+    fixed_cost: per-trip cost (road legs, times the number of containers),
+    cost_per_kg: per-kg rate (air/sea),
+    distance_km: distance used for emissions (with the same air/sea
+    fallbacks as evaluate_route), road_km: distance counted in total_distance.
+    """
+    def __init__(self, edges):
+        self.index = {}
+        fixed_cost, cost_per_kg, time_hr, distance_km, road_km, mode = [], [], [], [], [], []
+        
+        for u, v, data in edges:
+            edge_mode = data['mode']
+            if edge_mode == 'road':
+                fixed, per_kg, distance = data['total_cost'], 0.0, data['distance_km']
+            elif edge_mode == 'air':
+                fixed, per_kg = 0.0, data['cost_per_kg']
+                distance = data.get('distance_km', None)
+                if distance is None:
+                    distance = data['time_hr'] * 800
+            else:
+                fixed, per_kg = 0.0, data['cost_per_kg']
+                distance = data.get('distance_km', data['time_hr'] * 40)
+            
+            row = self.index.get((u, v))
+            values = (fixed, per_kg, data['time_hr'], distance,
+                      distance if edge_mode == 'road' else 0.0, MODE_CODES[edge_mode])
+            if row is None:
+                self.index[(u, v)] = len(mode)
+                for column, value in zip((fixed_cost, cost_per_kg, time_hr, distance_km, road_km, mode), values):
+                    column.append(value)
+            else:
+                # A later edge with the same endpoints shadows the earlier one
+                for column, value in zip((fixed_cost, cost_per_kg, time_hr, distance_km, road_km, mode), values):
+                    column[row] = value
+        
+        self.pad = len(mode)
+        self.fixed_cost = np.array(fixed_cost + [0.0], dtype=float)
+        self.cost_per_kg = np.array(cost_per_kg + [0.0], dtype=float)
+        self.time_hr = np.array(time_hr + [0.0], dtype=float)
+        self.distance_km = np.array(distance_km + [0.0], dtype=float)
+        self.road_km = np.array(road_km + [0.0], dtype=float)
+        self.mode = np.array(mode + [MODE_CODES['road']], dtype=np.int8)
+
+    def extended(self, edges) -> "EdgeArrays":
+        """A copy of these arrays with extra edges appended (shadowing existing ones)"""
+        extra = EdgeArrays(edges)
+        merged = EdgeArrays.__new__(EdgeArrays)
+        merged.index = dict(self.index)
+        for key, row in extra.index.items():
+            merged.index[key] = self.pad + row
+        merged.pad = self.pad + extra.pad
+        for column in ('fixed_cost', 'cost_per_kg', 'time_hr', 'distance_km', 'road_km', 'mode'):
+            setattr(merged, column, np.concatenate((getattr(self, column)[:-1], getattr(extra, column))))
+        return merged
+
+    def compile_routes(self, routes: List[List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Turn routes into a (n_routes, max_segments) matrix of edge rows,
+        padded with the zero edge. Also returns a validity mask.
+        """
+        width = max((len(r) - 1 for r in routes), default=0)
+        rows = np.full((len(routes), max(width, 1)), self.pad, dtype=np.int64)
+        valid = np.ones(len(routes), dtype=bool)
+        index = self.index
+        for i, route in enumerate(routes):
+            for j in range(len(route) - 1):
+                row = index.get((route[j], route[j + 1]))
+                if row is None:
+                    valid[i] = False
+                    break
+                rows[i, j] = row
+        return rows, valid
+
+def get_edge_arrays(G) -> EdgeArrays:
+    """
+    Edge arrays for a network, cached on the graph. For a request overlay the
+    base network's edges come first and overlay edges shadow them.
+    """
+    version = getattr(G, 'mutations', 0)
+    cached = G.graph.get('edge_arrays')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    if isinstance(G, OverlayNetwork):
+        arrays = get_edge_arrays(G.base).extended(G.overlay_edges(data=True))
+    else:
+        arrays = EdgeArrays(G.edges(data=True))
+    G.graph['edge_arrays'] = (version, arrays)
+    return arrays
+
+def evaluate_routes_batch(G, routes: List[List[str]], cargo_weight: float, goods_type: str) -> Dict[str, np.ndarray]:
+    """
+    Evaluate many routes in one vectorized pass.
+    Returns arrays (one entry per route) of valid, total_cost, total_time,
+    total_distance, total_emissions and goods_type_score, matching what
+    evaluate_route reports. Invalid routes have infinite cost and time.
+    """
+    arrays = get_edge_arrays(G)
+    rows, valid = arrays.compile_routes(routes)
+    
+    multiplier = GOODS_TYPE_MULTIPLIER.get(goods_type, 1.0)
+    impact_rate = GOODS_IMPACT_RATE.get(goods_type, 0.0)
+    customs_rate = get_customs_rate(goods_type)
+    
+    mode = arrays.mode[rows]
+    trips = container_index.count('road', cargo_weight)
+    base_cost = arrays.fixed_cost[rows] * trips + arrays.cost_per_kg[rows] * cargo_weight
+    rate = multiplier + impact_rate + np.where(mode == MODE_CODES['road'], 0.0, customs_rate)
+    
+    total_cost = (base_cost * rate).sum(axis=1)
+    total_time = arrays.time_hr[rows].sum(axis=1)
+    total_distance = arrays.road_km[rows].sum(axis=1)
+    total_emissions = (arrays.distance_km[rows] * cargo_weight * MODE_CO2_FACTORS[mode] / 1000).sum(axis=1)
+    
+    total_cost[~valid] = np.inf
+    total_time[~valid] = np.inf
+    if goods_type in ['standard', 'raw']:
+        goods_type_score = np.zeros(len(routes))
+    else:
+        goods_type_score = multiplier * np.sqrt(total_time) * 10
+    
+    return {
+        'valid': valid,
+        'total_cost': total_cost,
+        'total_time': total_time,
+        'total_distance': total_distance,
+        'total_emissions': total_emissions,
+        'goods_type_score': goods_type_score
+    }
+
+def summarize_routes_batch(G, routes: List[List[str]], cargo_weight: float, goods_type: str,
+                           batch: Dict[str, np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    Batch-evaluate routes into evaluation dicts without segment details.
+    Use evaluate_route for routes whose segments are needed. Pass `batch` to
+    reuse an existing evaluate_routes_batch result for the same routes.
+    """
+    if batch is None:
+        batch = evaluate_routes_batch(G, routes, cargo_weight, goods_type)
+    summaries = []
+    for i in range(len(routes)):
+        if not batch['valid'][i]:
+            summaries.append({'valid': False, 'total_cost': float('inf'), 'total_time': float('inf')})
+            continue
+        summaries.append({
+            'valid': True,
+            'total_cost': float(batch['total_cost'][i]),
+            'total_time': float(batch['total_time'][i]),
+            'total_distance': float(batch['total_distance'][i]),
+            'total_emissions': float(batch['total_emissions'][i]),
+            'goods_type': goods_type,
+            'goods_type_score': float(batch['goods_type_score'][i])
+        })
+    return summaries
 
 # -------------------------------------------------------------------------
 # MULTI-OBJECTIVE OPTIMIZATION USING NSGA-III
@@ -677,7 +1592,7 @@ def optimize_routes_nsga3(G: nx.DiGraph, route_options: List[List[str]], cargo_w
     Returns multiple optimized routes
     """
     if not route_options:
-        print("No routes to optimize!")
+        logger.debug("No routes to optimize")
         return []
         
     # Create optimization problem
@@ -695,31 +1610,17 @@ def optimize_routes_nsga3(G: nx.DiGraph, route_options: List[List[str]], cargo_w
                             xl=0,
                             xu=len(routes)-1)
                             
+            # Evaluate every candidate once, vectorized; generations only index into it
+            batch = evaluate_routes_batch(G, routes, cargo_weight, goods_type)
+            goods_score = np.zeros(len(routes)) if goods_type == 'standard' else batch['goods_type_score']
+            self.objectives = np.column_stack([batch['total_cost'], batch['total_time'], goods_score])
+                            
         def _evaluate(self, x, out, *args, **kwargs):
             # Extract decision variables (route indices)
             route_indices = x.astype(int).flatten()
             
-            # Initialize objective arrays
-            f1 = np.zeros(len(route_indices))  # Cost
-            f2 = np.zeros(len(route_indices))  # Time
-            f3 = np.zeros(len(route_indices))  # Goods impact
-            
-            # Evaluate each route
-            for i, idx in enumerate(route_indices):
-                route = self.routes[idx]
-                evaluation = evaluate_route(self.G, route, self.cargo_weight, self.goods_type)
-                
-                f1[i] = evaluation['total_cost']
-                f2[i] = evaluation['total_time']
-                
-                # Fix: properly set the third objective for standard vs. non-standard goods
-                if self.goods_type == 'standard':
-                    f3[i] = 0
-                else:
-                    f3[i] = evaluation['goods_type_score']
-            
-            # Set objectives (minimize all)
-            out["F"] = np.column_stack([f1, f2, f3])
+            # Set objectives (minimize all): cost, time, goods impact
+            out["F"] = self.objectives[route_indices]
 
     # Set up the optimization problem
     problem = RouteOptimizationProblem(G, route_options, cargo_weight, goods_type)
@@ -729,66 +1630,194 @@ def optimize_routes_nsga3(G: nx.DiGraph, route_options: List[List[str]], cargo_w
     algorithm = NSGA3(pop_size=100, ref_dirs=ref_dirs)
     
     # Run the optimization
-    print("\nApplying multi-objective optimization (NSGA-III)...")
+    logger.debug("Applying multi-objective optimization (NSGA-III)...")
     res = minimize(problem,
                    algorithm,
                    ('n_gen', 50),
                    seed=42,
                    verbose=False)
     
-    # Get optimized routes with their evaluations
+    # Get optimized routes with their evaluations (summaries; tabu search re-evaluates in full)
+    summaries = summarize_routes_batch(G, route_options, cargo_weight, goods_type)
     optimized_routes = []
     for i, x in enumerate(res.X):
         route_idx = int(x[0])
-        route = route_options[route_idx]
-        evaluation = evaluate_route(G, route, cargo_weight, goods_type)
-        optimized_routes.append((route, evaluation))
+        optimized_routes.append((route_options[route_idx], summaries[route_idx]))
 
     existing_routes = {tuple(route) for route, _ in optimized_routes}
-    for route in route_options:
+    for route, evaluation in zip(route_options, summaries):
         if tuple(route) not in existing_routes:
-            evaluation = evaluate_route(G, route, cargo_weight, goods_type)
             optimized_routes.append((route, evaluation))
                   
     return optimized_routes
 
+# -------------------------------------------------------------------------
+# EXACT PARETO FRONT
+# -------------------------------------------------------------------------
+# Up to this many candidates the Pareto set is computed exactly;
+# NSGA-III is only used for larger search spaces
+EXACT_PARETO_MAX_CANDIDATES = int(os.environ.get("LOGILINK_EXACT_PARETO_MAX", 5000))
+
+def optimize_routes_pareto(G, route_options: List[List[str]], cargo_weight: float, goods_type: str) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    Exact multi-objective optimization over an enumerable candidate set.
+    Every route is evaluated once (vectorized) and ordered by fast
+    non-dominated sorting over cost, time, emissions and goods score:
+    the Pareto-optimal routes come first, then each following front.
+    """
+    if not route_options:
+        logger.debug("No routes to optimize")
+        return []
+    
+    batch = evaluate_routes_batch(G, route_options, cargo_weight, goods_type)
+    summaries = summarize_routes_batch(G, route_options, cargo_weight, goods_type, batch)
+    objectives = np.column_stack([batch['total_cost'], batch['total_time'],
+                                  batch['total_emissions'], batch['goods_type_score']])
+    
+    fronts = fast_non_dominated_sort(objectives[batch['valid']])
+    valid_indices = np.flatnonzero(batch['valid'])
+    logger.debug("Exact Pareto front: %d of %d routes", len(fronts[0]) if fronts else 0, len(route_options))
+    
+    return [(route_options[i], summaries[i])
+            for front in fronts for i in valid_indices[np.sort(front)]]
+
+def optimize_routes(G, route_options: List[List[str]], cargo_weight: float, goods_type: str) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    Pick the optimizer by candidate count: the exact Pareto engine for sets
+    that can be enumerated, NSGA-III for larger ones.
+    """
+    if len(route_options) <= EXACT_PARETO_MAX_CANDIDATES:
+        return optimize_routes_pareto(G, route_options, cargo_weight, goods_type)
+    return optimize_routes_nsga3(G, route_options, cargo_weight, goods_type)
+
+def pareto_optimal_routes(routes: List[Tuple[List[str], Dict[str, Any]]]) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    The routes of an optimizer result that no other route in it dominates on
+    cost, time, emissions and goods score (optimize_routes returns every
+    front), in their original order.
+    """
+    if not routes:
+        return []
+    objectives = np.array([[evaluation['total_cost'], evaluation['total_time'],
+                            evaluation['total_emissions'], evaluation['goods_type_score']]
+                           for _, evaluation in routes])
+    return [routes[i] for i in np.sort(pareto_front(objectives))]
+
 # -------------------------------------------------------------------------
 # TABU SEARCH FOR LOCAL REFINEMENT
 # -------------------------------------------------------------------------
+class NeighbourIndex:
+    """
+    Replacement hubs for tabu search. For a route position between prev and
+    nxt, the only hubs that can be swapped in are successors of prev that
+    are also predecessors of nxt, so candidates come from the two local
+    adjacency lists instead of a scan over every node in the network.
+    """
+
+    def __init__(self, G):
+        self.G = G
+        self._rank = get_node_rank(G)
+        self._bridges: Dict[Tuple[str, str], List[str]] = {}
+
+    def bridges(self, prev: str, nxt: str) -> List[str]:
+        """Nodes n with edges prev -> n -> nxt, in network node order"""
+        key = (prev, nxt)
+        nodes = self._bridges.get(key)
+        if nodes is None:
+            successors = self.G.succ[prev]
+            predecessors = self.G.pred[nxt]
+            if len(predecessors) < len(successors):
+                successors, predecessors = predecessors, successors
+            nodes = sorted((n for n in successors if n in predecessors), key=self._rank.__getitem__)
+            self._bridges[key] = nodes
+        return nodes
+
+    def replacements(self, route: List[str], pos: int) -> List[str]:
+        """Same-type hubs that can replace route[pos] without breaking the route"""
+        current = route[pos]
+        node_type = self.G.nodes[current].get('type', None)
+        if node_type not in ['airport', 'port']:
+            return []
+        return [n for n in self.bridges(route[pos - 1], route[pos + 1])
+                if n != current and self.G.nodes[n].get('type') == node_type]
+
+def get_node_rank(G) -> Dict[str, int]:
+    """Position of every node in the network's node order, cached on the graph"""
+    if isinstance(G, OverlayNetwork):
+        version = G.mutations
+        cached = G.graph.get('node_rank')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        base_rank = get_node_rank(G.base)
+        rank = ChainMap({}, base_rank)
+        for node in G:
+            if node not in base_rank:
+                rank[node] = len(base_rank) + len(rank.maps[0])
+        G.graph['node_rank'] = (version, rank)
+        return rank
+    
+    rank = G.graph.get('node_rank')
+    if rank is None:
+        rank = {node: i for i, node in enumerate(G)}
+        G.graph['node_rank'] = rank
+    return rank
+
+def get_neighbour_index(G) -> NeighbourIndex:
+    """Neighbour index for a network, shared by every tabu search on it"""
+    version = getattr(G, 'mutations', 0)
+    cached = G.graph.get('neighbour_index')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = NeighbourIndex(G)
+    G.graph['neighbour_index'] = (version, index)
+    return index
+
 def tabu_search(G: nx.DiGraph, initial_route: List[str], cargo_weight: float, goods_type: str, 
                 priority_int: int, max_iterations: int = 50, tabu_size: int = 7) -> Tuple[List[str], Dict[str, Any]]:
     """
     Apply Tabu Search to refine a route locally.
     If priority_int==2 (minimize time), it uses total_time only.
     Otherwise, it uses a weighted sum (total_cost + total_time*1000) for selection.
+    
+    Neighbours replace one transit hub; only the two segments touching the
+    replaced hub are evaluated, the rest are reused from the current route.
     """
     current_route = initial_route
-    current_eval = evaluate_route(G, current_route, cargo_weight, goods_type)
+    current_eval = evaluate_with_cache(G, current_route, cargo_weight, goods_type)
     
     best_route = current_route
     best_eval = current_eval
+    if not current_eval['valid']:
+        return best_route, best_eval
+    
+    index = get_neighbour_index(G)
+    segment_cache = {}
+    
+    def segment(start, end):
+        key = (start, end)
+        if key not in segment_cache:
+            segment_cache[key] = evaluate_segment(G, start, end, cargo_weight, goods_type)
+        return segment_cache[key]
     
-    tabu_list = []  # List of recently visited solutions
+    # Recently visited solutions; the set mirrors the deque for O(1) lookups
+    tabu_list = deque()
+    tabu_set = set()
     
     for i in range(max_iterations):
         neighbors = []
         
         # Simple neighborhood: try replacing transit hubs
         if len(current_route) >= 4:  # at least one intermediate node
+            segments = current_eval['segments']
             for pos in range(1, len(current_route) - 1):
-                node_type = G.nodes[current_route[pos]].get('type', None)
-                if node_type in ['airport', 'port']:
-                    # Find potential replacement nodes of the same type (excluding the current)
-                    replacements = [n for n, data in G.nodes(data=True)
-                                    if data.get('type') == node_type and n != current_route[pos]]
-                    for replacement in replacements:
-                        # Check if replacing creates valid edges
-                        if G.has_edge(current_route[pos-1], replacement) and G.has_edge(replacement, current_route[pos+1]):
-                            new_route = current_route[:pos] + [replacement] + current_route[pos+1:]
-                            if tuple(new_route) not in tabu_list:
-                                new_eval = evaluate_route(G, new_route, cargo_weight, goods_type)
-                                if new_eval['valid']:
-                                    neighbors.append((new_route, new_eval))
+                for replacement in index.replacements(current_route, pos):
+                    new_route = current_route[:pos] + [replacement] + current_route[pos+1:]
+                    if tuple(new_route) not in tabu_set:
+                        new_segments = (segments[:pos-1] +
+                                        [segment(current_route[pos-1], replacement),
+                                         segment(replacement, current_route[pos+1])] +
+                                        segments[pos+1:])
+                        neighbors.append((new_route, combine_segments(new_segments, goods_type)))
         
         if not neighbors:
             break  # No valid neighbors found
@@ -809,8 +1838,9 @@ def tabu_search(G: nx.DiGraph, initial_route: List[str], cargo_weight: float, go
         
         # Add current solution to tabu list
         tabu_list.append(tuple(current_route))
+        tabu_set.add(tuple(current_route))
         if len(tabu_list) > tabu_size:
-            tabu_list.pop(0)
+            tabu_set.discard(tabu_list.popleft())
         
         # Update best solution (using same objective as neighbor-sorting)
         if priority_int == 2:
@@ -834,22 +1864,22 @@ def rank_routes(optimized_routes: List[Tuple[List[str], Dict[str, Any]]], priori
     if not optimized_routes:
         return []
 
-    print("Optimized routes:", len(optimized_routes))
+    logger.debug("Ranking %d optimized routes", len(optimized_routes))
     
     # Create a copy to avoid modifying original
     routes_to_rank = optimized_routes.copy()
     
     if priority == 4:  # Minimize emissions
-        print("Ranking strictly by CO2 emissions, ascending.")
+        logger.debug("Ranking strictly by CO2 emissions, ascending.")
         sorted_routes = sorted(routes_to_rank, key=lambda x: x[1]['total_emissions'])
     elif priority == 2:  # Minimize time
-        print("Ranking strictly by total time, ascending.")
+        logger.debug("Ranking strictly by total time, ascending.")
         sorted_routes = sorted(routes_to_rank, key=lambda x: x[1]['total_time'])
     elif priority == 1:  # Minimize cost
-        print("Ranking strictly by total cost, ascending.")
+        logger.debug("Ranking strictly by total cost, ascending.")
         sorted_routes = sorted(routes_to_rank, key=lambda x: x[1]['total_cost'])
     else:  # Balanced
-        print("Ranking by normalized combination of cost, time, and emissions.")
+        logger.debug("Ranking by normalized combination of cost, time, and emissions.")
         min_cost = min(r[1]['total_cost'] for r in routes_to_rank)
         max_cost = max(r[1]['total_cost'] for r in routes_to_rank)
         min_time = min(r[1]['total_time'] for r in routes_to_rank)
@@ -865,11 +1895,8 @@ def rank_routes(optimized_routes: List[Tuple[List[str], Dict[str, Any]]], priori
         
         sorted_routes = sorted(routes_to_rank, key=lambda x: balanced_score(x[1]))
 
-    print("Sorted:", len(sorted_routes))
-    
     unique_routes = []
     for route in sorted_routes:
-        print("->".join(route[0]))
         if route not in unique_routes:
             unique_routes.append(route)
 
@@ -948,86 +1975,84 @@ def create_arc_path(start, end, num_points=10):
     return points
 
 def print_route_details(route: List[str], evaluation: Dict[str, Any], 
-                       cargo_weight: float = 0, container_df: pd.DataFrame = None) -> None:
+                       cargo_weight: float = 0, containers: ContainerIndex = None) -> None:
     """
-    Print detailed information about a route
+    Log detailed information about a route (debug level)
     """
-    print("\n" + "=" * 60)
-    print(f"Route: {' -> '.join(route)}")
-    print("-" * 60)
-    print(f"Total Cost: ₹{evaluation['total_cost']:.2f}")
-    print(f"Total Time: {evaluation['total_time']:.2f} hours")
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    lines = ["\n" + "=" * 60]
+    lines.append(f"Route: {' -> '.join(route)}")
+    lines.append("-" * 60)
+    lines.append(f"Total Cost: ₹{evaluation['total_cost']:.2f}")
+    lines.append(f"Total Time: {evaluation['total_time']:.2f} hours")
     if 'total_distance' in evaluation:
-        print(f"Total Distance: {evaluation['total_distance']:.2f} km (road segments only)")
-    print(f"Total CO2 Emissions: {evaluation['total_emissions']:.2f} tonnes")
-    print(f"Cargo Type: {evaluation['goods_type'].title()}")
-    print("-" * 60)
-    print("Segment Details:")
+        lines.append(f"Total Distance: {evaluation['total_distance']:.2f} km (road segments only)")
+    lines.append(f"Total CO2 Emissions: {evaluation['total_emissions']:.2f} tonnes")
+    lines.append(f"Cargo Type: {evaluation['goods_type'].title()}")
+    lines.append("-" * 60)
+    lines.append("Segment Details:")
     
     for segment in evaluation['segments']:
-        print(f"  {segment['start']} -> {segment['end']} ({segment['mode']})")
+        lines.append(f"  {segment['start']} -> {segment['end']} ({segment['mode']})")
         
         # Handle different data types for distance
         if isinstance(segment['distance_km'], (int, float)):
-            print(f"    Distance: {segment['distance_km']:.2f} km")
+            lines.append(f"    Distance: {segment['distance_km']:.2f} km")
         else:
-            print(f"    Distance: {segment['distance_km']}")
+            lines.append(f"    Distance: {segment['distance_km']}")
             
-        print(f"    Time: {segment['time_hr']:.2f} hours")
-        print(f"    CO2 Emissions: {segment['co2_emissions']:.3f} tonnes")
-        print(f"    Base Cost: ₹{segment['base_cost']:.2f}")
-        print(f"    {evaluation['goods_type'].title()} Multiplier: {segment['goods_type_multiplier']:.2f}x")
+        lines.append(f"    Time: {segment['time_hr']:.2f} hours")
+        lines.append(f"    CO2 Emissions: {segment['co2_emissions']:.3f} tonnes")
+        lines.append(f"    Base Cost: ₹{segment['base_cost']:.2f}")
+        lines.append(f"    {evaluation['goods_type'].title()} Multiplier: {segment['goods_type_multiplier']:.2f}x")
         if segment.get('goods_impact', 0) > 0:
-            print(f"    Goods-Specific Impact: ₹{segment['goods_impact']:.2f}")
+            lines.append(f"    Goods-Specific Impact: ₹{segment['goods_impact']:.2f}")
         if segment.get('customs_cost', 0) > 0:
-            print(f"    Customs/Tariff: ₹{segment['customs_cost']:.2f}")
-        print(f"    Total Segment Cost: ₹{segment['total_segment_cost']:.2f}")
+            lines.append(f"    Customs/Tariff: ₹{segment['customs_cost']:.2f}")
+        lines.append(f"    Total Segment Cost: ₹{segment['total_segment_cost']:.2f}")
         
         # Add container information if available
-        if container_df is not None and segment['mode'] in ['road', 'air', 'sea']:
-            container_type, exceeds = get_container_type(segment['mode'], cargo_weight, container_df)
-            print(f"    Container: {container_type}")
-            if exceeds:
-                print("    WARNING: Cargo weight exceeds container capacity!")
+        if containers is not None and segment['mode'] in ['road', 'air', 'sea']:
+            plan = containers.plan(segment['mode'], cargo_weight)
+            lines.append(f"    Containers: {plan.describe()} ({plan.utilisation:.0%} full)")
         
-        print()
+        lines.append("")
 
-    print("=" * 60)
+    lines.append("=" * 60)
+    logger.debug("\n".join(lines))
 
 def print_all_routes(routes_with_evaluations: List[Tuple[List[str], Dict[str, Any]]]) -> None:
     """
-    Print details of all possible routes in text format
+    Log details of all possible routes in text format (debug level)
     """
-    print("\n" + "=" * 80)
-    print(f"ALL POSSIBLE ROUTES ({len(routes_with_evaluations)} total)")
-    print("=" * 80)
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    lines = ["\n" + "=" * 80]
+    lines.append(f"ALL POSSIBLE ROUTES ({len(routes_with_evaluations)} total)")
+    lines.append("=" * 80)
     
     for i, (route, evaluation) in enumerate(routes_with_evaluations):
-        print(f"\nRoute Option {i+1}: {' -> '.join(route)}")
-        print(f"  Total Cost: ₹{evaluation['total_cost']:.2f}")
-        print(f"  Total Time: {evaluation['total_time']:.2f} hours")
-        print(f"  Total CO2: {evaluation['total_emissions']:.2f} tonnes")
-        print(f"  Segments: {len(evaluation['segments'])}")
+        lines.append(f"\nRoute Option {i+1}: {' -> '.join(route)}")
+        lines.append(f"  Total Cost: ₹{evaluation['total_cost']:.2f}")
+        lines.append(f"  Total Time: {evaluation['total_time']:.2f} hours")
+        lines.append(f"  Total CO2: {evaluation['total_emissions']:.2f} tonnes")
+        lines.append(f"  Segments: {len(route) - 1}")
         
-        # Print brief segment info
-        for segment in evaluation['segments']:
-            print(f"    {segment['start']} -> {segment['end']} ({segment['mode']}): " +
-                  f"₹{segment['total_segment_cost']:.2f}, {segment['time_hr']:.1f} hrs, " +
-                  f"{segment['co2_emissions']:.3f} tonnes CO2")
-    
-    print("\n" + "=" * 80)
+        # Brief segment info (batch summaries carry no segment details)
+        for segment in evaluation.get('segments', []):
+            lines.append(f"    {segment['start']} -> {segment['end']} ({segment['mode']}): " +
+                         f"₹{segment['total_segment_cost']:.2f}, {segment['time_hr']:.1f} hrs, " +
+                         f"{segment['co2_emissions']:.3f} tonnes CO2")
+    
+    lines.append("\n" + "=" * 80)
+    logger.debug("\n".join(lines))
 
-def get_routing(source: str, destination: str, priority_choice: str, goods_type_choice: str, cargo_weight: float) -> List[Tuple[List[str], Dict[str, Any]]]:
+def parse_routing_options(priority_choice: str, goods_type_choice: str) -> Tuple[str, int, str]:
     """
-    Main function to run the multi-modal logistics route optimizer
+    Map the API priority and goods type choices to
+    (priority name, priority number, goods type)
     """
-    # Initialize the global location database
-    global location_database
-    location_database = load_location_database("city_coordinates.csv")
-    
-    print("Multi-Modal Logistics Route Optimizer")
-    print("====================================\n")
-    
     priority_int = 3  # Default to balanced
 
     if priority_choice == "cost":
@@ -1053,221 +2078,277 @@ def get_routing(source: str, destination: str, priority_choice: str, goods_type_
     }
      
     goods_type = goods_type_map.get(goods_type_choice, "standard")
-    print(f"Selected cargo type: {goods_type.title()} (cost multiplier: {GOODS_TYPE_MULTIPLIER[goods_type]}x)")
+    return priority, priority_int, goods_type
 
+def get_routing(source: str, destination: str, priority_choice: str, goods_type_choice: str, cargo_weight: float) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    Main function to run the multi-modal logistics route optimizer
+    """
+    priority, priority_int, goods_type = parse_routing_options(priority_choice, goods_type_choice)
+    logger.debug("Selected cargo type: %s (cost multiplier: %sx)", goods_type.title(), GOODS_TYPE_MULTIPLIER[goods_type])
     
-     # Load data from CSV files
-    print("\nLoading transportation data...")
-    flights_csv = "cargo_flights (1).csv"
-    shipping_csv = "cargo_shipping.csv"
-    
-    flight_data = load_flight_data(flights_csv)
-    shipping_data = load_shipping_data(shipping_csv)
-    # Load container data early
-    container_df = load_container_data("containers.csv")
-    
-    if flight_data.empty or shipping_data.empty:
-        print("Error: Could not load required data files")
-        return
-    
-    # Build transportation network
-    print("Building transportation network...")
-    G = create_transportation_network(flight_data, shipping_data)
-    
-    # Add coordinates to nodes
-    print("Adding geographical coordinates...")
-    G = add_coordinates_to_network(G)
+    # The base network is built once at startup; only the request overlay is built here
+    base = get_base_network()
     
     # Add road connections
-    print("Adding road connections...")
-    G = add_road_connections(G, source, destination)
+    logger.debug("Adding road connections...")
+    G = build_request_network(source, destination, base)
     
+    return optimize_request_routes(G, source, destination, priority, priority_int, goods_type, cargo_weight)
+
+def order_ranked_routes(routes: List[Tuple[List[str], Dict[str, Any]]], priority_int: int) -> None:
+    """Sort the final (deduplicated) routes in place by the priority objective"""
+    if priority_int == 1:
+        routes.sort(key=lambda x: x[1]['total_cost'])
+    elif priority_int == 2:
+        routes.sort(key=lambda x: x[1]['total_time'])
+    elif priority_int == 4:
+        routes.sort(key=lambda x: x[1]['total_emissions'])
+    else:
+        # For balanced, recompute balanced score over the unique set
+        min_cost = min(r[1]['total_cost'] for r in routes)
+        max_cost = max(r[1]['total_cost'] for r in routes)
+        min_time = min(r[1]['total_time'] for r in routes)
+        max_time = max(r[1]['total_time'] for r in routes)
+        min_emissions = min(r[1]['total_emissions'] for r in routes)
+        max_emissions = max(r[1]['total_emissions'] for r in routes)
+        
+        def balanced_score(eval_data):
+            norm_cost = ((eval_data['total_cost'] - min_cost) / (max_cost - min_cost)) if max_cost > min_cost else 0
+            norm_time = ((eval_data['total_time'] - min_time) / (max_time - min_time)) if max_time > min_time else 0
+            norm_emissions = ((eval_data['total_emissions'] - min_emissions) / (max_emissions - min_emissions)) if max_emissions > min_emissions else 0
+            return (0.4 * norm_cost) + (0.4 * norm_time) + (0.2 * norm_emissions)
+        
+        routes.sort(key=lambda x: balanced_score(x[1]))
+
+def reprice_routes(G, routes: List[Tuple[List[str], Dict[str, Any]]], priority_choice: str,
+                   goods_type_choice: str, cargo_weight: float) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    Re-evaluate an earlier result's routes on the same request network for a
+    different cargo weight, keeping its route set and re-sorting by priority.
+    Used to answer queries whose weight is close to a cached one.
+    """
+    _, priority_int, goods_type = parse_routing_options(priority_choice, goods_type_choice)
+    repriced = [(route, copy_evaluation(evaluate_with_cache(G, route, cargo_weight, goods_type)))
+                for route, _ in routes]
+    repriced = [(route, evaluation) for route, evaluation in repriced if evaluation['valid']]
+    if repriced:
+        order_ranked_routes(repriced, priority_int)
+    for route, evaluation in repriced:
+        attach_coordinates(G, route, evaluation)
+    return repriced
+
+def get_dataset_version() -> str:
+    """Version of the datasets behind the current base network"""
+    return get_network_version(get_base_network())
+
+def attach_coordinates(G, route: List[str], evaluation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the modes list and per-segment (lat, lon) endpoints the API returns.
+    Modifies evaluation in place, so pass a copy of a cached evaluation.
+    """
+    segments_with_coordinates = []
+
+    evaluation["modes"] = []
+
+    for j in range(len(route) - 1):
+        segment = next((s for s in evaluation['segments']
+                        if s['start'] == route[j] and s['end'] == route[j + 1]), None)
+
+        if segment:
+            start_coords_str = G.nodes[route[j]]['coords'].split(',')
+            end_coords_str = G.nodes[route[j + 1]]['coords'].split(',')
+
+            start_lon = float(start_coords_str[0])
+            start_lat = float(start_coords_str[1])
+            end_lon = float(end_coords_str[0])
+            end_lat = float(end_coords_str[1])
+
+            segment['coordinates'] = [
+                (start_lat, start_lon), (end_lat, end_lon)
+            ]
+
+            if segment["mode"] not in evaluation["modes"]:
+                evaluation["modes"].append(segment["mode"])
+
+            segments_with_coordinates.append(segment)
+
+    evaluation["segments"] = segments_with_coordinates
+    return evaluation
+
+def optimize_request_routes(G, source: str, destination: str, priority: str, priority_int: int,
+                            goods_type: str, cargo_weight: float,
+                            on_route: Callable[[List[str], Dict[str, Any]], None] = None) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """
+    CPU-bound part of the optimizer: candidate generation, NSGA-III, tabu
+    search and ranking on a request network that already has its road legs.
+
+    If on_route is given, it is called with (route, evaluation) for each
+    Pareto-optimal route as soon as the multi-objective optimization has run
+    and for each route tabu search changes, before ranking. Dominated routes
+    only appear in the returned ranking. Evaluations passed to it are copies with
+    coordinates attached, in the same shape as the returned ones.
+    """
+    if CSR_NETWORK and not isinstance(getattr(G, 'base', G), CSRGraph):
+        G = compact_network(G)
+    reported = set()
+
+    def report(route, evaluation):
+        if on_route is None or tuple(route) in reported:
+            return
+        reported.add(tuple(route))
+        if 'segments' not in evaluation:
+            evaluation = evaluate_with_cache(G, route, cargo_weight, goods_type)
+        on_route(route, attach_coordinates(G, route, copy_evaluation(evaluation)))
+
     # Find multi-modal routes
-    print("Generating candidate routes...")
-    routes = find_multimodal_routes(G, source, destination)
+    logger.debug("Generating candidate routes...")
+    with time_stage("candidate_generation"):
+        routes = find_multimodal_routes(G, source, destination, cargo_weight=cargo_weight, goods_type=goods_type)
+    count_routes("candidates", len(routes))
     
     if not routes:
-        print("No routes found between the given source and destination.")
+        logger.info("No routes found between %s and %s", source, destination)
         return
     
-    print(f"Found {len(routes)} candidate routes")
+    logger.debug("Found %d candidate routes", len(routes))
     
     # Pre-filter extreme outliers for all priority types
-    print("Pre-filtering routes before optimization...")
-    route_evaluations = []
-    for route in routes:
-        evaluation = evaluate_route(G, route, cargo_weight, goods_type)
-        if evaluation['valid']:
-            route_evaluations.append((route, evaluation))
-    
-    # Define all_evaluated_routes as a copy of the candidate evaluations—this fixes the missing variable error.
-    all_evaluated_routes = route_evaluations.copy()
-    
-    if route_evaluations:
-        min_cost = min(route_evaluations, key=lambda x: x[1]['total_cost'])[1]['total_cost']
-        min_time = min(route_evaluations, key=lambda x: x[1]['total_time'])[1]['total_time']
-        min_emissions = min(route_evaluations, key=lambda x: x[1]['total_emissions'])[1]['total_emissions']
+    with time_stage("prefilter"):
+        # One vectorized pass; segment details are only built for returned routes
+        route_evaluations = [(route, evaluation)
+                             for route, evaluation in zip(routes, summarize_routes_batch(G, routes, cargo_weight, goods_type))
+                             if evaluation['valid']]
+    
+        # Define all_evaluated_routes as a copy of the candidate evaluations—this fixes the missing variable error.
+        all_evaluated_routes = route_evaluations.copy()
+    
+        if route_evaluations:
+            min_cost = min(route_evaluations, key=lambda x: x[1]['total_cost'])[1]['total_cost']
+            min_time = min(route_evaluations, key=lambda x: x[1]['total_time'])[1]['total_time']
+            min_emissions = min(route_evaluations, key=lambda x: x[1]['total_emissions'])[1]['total_emissions']
 
-        filtered_routes = []
+            filtered_routes = []
         
-        if priority == "minimize_emissions":
-            # Include routes with emissions up to 8x the minimum
-            for route, eval in route_evaluations:
-                if eval['total_emissions'] <= min_emissions * 8:
-                    filtered_routes.append(route)
-        elif priority == "minimize_time":
-            for route, eval in route_evaluations:
-                if eval['total_time'] <= min_time * 2:
-                    filtered_routes.append(route)
-        elif priority == "minimize_cost":
-            for route, eval in route_evaluations:
-                if eval['total_cost'] <= min_cost * 3:
-                    filtered_routes.append(route)
-        else:  # Balanced
-            for route, eval in route_evaluations:
-                if (eval['total_cost'] <= min_cost * 5 or 
-                    eval['total_time'] <= min_time * 3 or 
-                    eval['total_emissions'] <= min_emissions * 5):
-                    filtered_routes.append(route)
-
-        # Always ensure we have at least 3 routes
-        if len(filtered_routes) < 3 and route_evaluations:
-            print("Warning: Too few routes after filtering. Adding back some routes...")
             if priority == "minimize_emissions":
-                # Sort remaining routes by emissions for eco-priority
-                remaining_routes = sorted(
-                    [(r[0], r[1]['total_emissions']) for r in route_evaluations if r[0] not in filtered_routes],
-                    key=lambda x: x[1]
-                )
-                filtered_routes.extend([r[0] for r in remaining_routes[:3 - len(filtered_routes)]])
-            else:
-                remaining_routes = [r[0] for r in route_evaluations if r[0] not in filtered_routes]
-                filtered_routes.extend(remaining_routes[:3 - len(filtered_routes)])
+                # Include routes with emissions up to 8x the minimum
+                for route, eval in route_evaluations:
+                    if eval['total_emissions'] <= min_emissions * 8:
+                        filtered_routes.append(route)
+            elif priority == "minimize_time":
+                for route, eval in route_evaluations:
+                    if eval['total_time'] <= min_time * 2:
+                        filtered_routes.append(route)
+            elif priority == "minimize_cost":
+                for route, eval in route_evaluations:
+                    if eval['total_cost'] <= min_cost * 3:
+                        filtered_routes.append(route)
+            else:  # Balanced
+                for route, eval in route_evaluations:
+                    if (eval['total_cost'] <= min_cost * 5 or 
+                        eval['total_time'] <= min_time * 3 or 
+                        eval['total_emissions'] <= min_emissions * 5):
+                        filtered_routes.append(route)
 
-        print(f"Pre-filtered from {len(routes)} to {len(filtered_routes)} routes")
-        routes = filtered_routes
+            # Always ensure we have at least 3 routes
+            if len(filtered_routes) < 3 and route_evaluations:
+                logger.debug("Too few routes after filtering, adding back some routes")
+                if priority == "minimize_emissions":
+                    # Sort remaining routes by emissions for eco-priority
+                    remaining_routes = sorted(
+                        [(r[0], r[1]['total_emissions']) for r in route_evaluations if r[0] not in filtered_routes],
+                        key=lambda x: x[1]
+                    )
+                    filtered_routes.extend([r[0] for r in remaining_routes[:3 - len(filtered_routes)]])
+                else:
+                    remaining_routes = [r[0] for r in route_evaluations if r[0] not in filtered_routes]
+                    filtered_routes.extend(remaining_routes[:3 - len(filtered_routes)])
+
+            logger.debug("Pre-filtered from %d to %d routes", len(routes), len(filtered_routes))
+            routes = filtered_routes
+    count_routes("prefiltered", len(routes))
 
-    # Apply NSGA-III optimization
-    print("\nApplying multi-objective optimization (NSGA-III)...")
-    optimized_routes = optimize_routes_nsga3(G, routes, cargo_weight, goods_type)
+    # Apply multi-objective optimization (exact Pareto sort, NSGA-III for large sets)
+    logger.debug("Applying multi-objective optimization...")
+    with time_stage("optimization"):
+        optimized_routes = optimize_routes(G, routes, cargo_weight, goods_type)
+    count_routes("optimized", len(optimized_routes))
     
     if not optimized_routes:
-        print("No feasible routes found after optimization.")
+        logger.info("No feasible routes found after optimization")
         return
     
-    print(f"Optimization complete: {len(optimized_routes)} Pareto-optimal routes identified")
+    logger.debug("Optimization complete: %d Pareto-optimal routes identified", len(optimized_routes))
+    if on_route is not None:
+        for route, evaluation in pareto_optimal_routes(optimized_routes):
+            report(route, evaluation)
     
     # Apply Tabu Search for local refinement
-    print("\nApplying local refinement (Tabu Search)...")
+    logger.debug("Applying local refinement (Tabu Search)...")
     refined_routes = []
-    for route, evaluation in optimized_routes:
-        refined_route, refined_eval = tabu_search(G, route, cargo_weight, goods_type, priority_int)
-        refined_routes.append((refined_route, refined_eval))
-    
-    print("Local refinement complete:", len(refined_routes))
+    with time_stage("tabu"):
+        for route, evaluation in optimized_routes:
+            refined_route, refined_eval = tabu_search(G, route, cargo_weight, goods_type, priority_int)
+            refined_routes.append((refined_route, refined_eval))
+            if refined_route != route:
+                report(refined_route, refined_eval)
     
     # Rank routes based on user priority using refined_routes
-    print(f"\nRanking routes based on priority: {priority}")
-    ranked_routes = rank_routes(refined_routes, priority_int)
-
-    print("Ranking complete:", len(ranked_routes))
-    
-    # Remove duplicate routes (same nodes in same order)
-    unique_ranked_routes = []
-    seen_routes = set()
-    for route, evaluation in ranked_routes:
-        route_str = "→".join(route)
-        print(route_str)
-        print(seen_routes)
-        if route_str not in seen_routes:
-            seen_routes.add(route_str)
-            unique_ranked_routes.append((route, evaluation))
-
-    # If we have fewer than 3 refined routes, supplement from candidate routes.
-    if priority_int == 2 and len(unique_ranked_routes) < 3:
-        sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_time'])
-        for route, evaluation in sorted_candidates:
-            route_str = "→".join(route)
-            if route_str not in seen_routes and len(unique_ranked_routes) < 3:
-                unique_ranked_routes.append((route, evaluation))
-                seen_routes.add(route_str)
-    elif priority_int == 1 and len(unique_ranked_routes) < 3:
-        sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_cost'])
-        for route, evaluation in sorted_candidates:
+    logger.debug("Ranking routes based on priority: %s", priority)
+    with time_stage("ranking"):
+        ranked_routes = rank_routes(refined_routes, priority_int)
+
+        # Remove duplicate routes (same nodes in same order)
+        unique_ranked_routes = []
+        seen_routes = set()
+        for route, evaluation in ranked_routes:
             route_str = "→".join(route)
-            if route_str not in seen_routes and len(unique_ranked_routes) < 3:
-                unique_ranked_routes.append((route, evaluation))
+            if route_str not in seen_routes:
                 seen_routes.add(route_str)
-    elif priority_int == 4 and len(unique_ranked_routes) < 3:  # For emissions priority
-        sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_emissions'])
-        for route, evaluation in sorted_candidates:
-            route_str = "→".join(route)
-            if route_str not in seen_routes and len(unique_ranked_routes) < 3:
                 unique_ranked_routes.append((route, evaluation))
-                seen_routes.add(route_str)
 
-    # After duplicate removal:
-    # 'unique_ranked_routes' now holds the routes in the order produced by rank_routes.
-    # To ensure the order remains consistent, re-sort based on the objective:
-    if priority_int == 1:
-        unique_ranked_routes.sort(key=lambda x: x[1]['total_cost'])
-    elif priority_int == 2:
-        unique_ranked_routes.sort(key=lambda x: x[1]['total_time'])
-    elif priority_int == 4:
-        unique_ranked_routes.sort(key=lambda x: x[1]['total_emissions'])
-    else:
-        # For balanced, recompute balanced score over the unique set
-        min_cost = min(r[1]['total_cost'] for r in unique_ranked_routes)
-        max_cost = max(r[1]['total_cost'] for r in unique_ranked_routes)
-        min_time = min(r[1]['total_time'] for r in unique_ranked_routes)
-        max_time = max(r[1]['total_time'] for r in unique_ranked_routes)
-        min_emissions = min(r[1]['total_emissions'] for r in unique_ranked_routes)
-        max_emissions = max(r[1]['total_emissions'] for r in unique_ranked_routes)
-        
-        def balanced_score(eval_data):
-            norm_cost = ((eval_data['total_cost'] - min_cost) / (max_cost - min_cost)) if max_cost > min_cost else 0
-            norm_time = ((eval_data['total_time'] - min_time) / (max_time - min_time)) if max_time > min_time else 0
-            norm_emissions = ((eval_data['total_emissions'] - min_emissions) / (max_emissions - min_emissions)) if max_emissions > min_emissions else 0
-            return (0.4 * norm_cost) + (0.4 * norm_time) + (0.2 * norm_emissions)
-        
-        unique_ranked_routes.sort(key=lambda x: balanced_score(x[1]))
+        # If we have fewer than 3 refined routes, supplement from candidate routes.
+        if priority_int == 2 and len(unique_ranked_routes) < 3:
+            sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_time'])
+            for route, evaluation in sorted_candidates:
+                route_str = "→".join(route)
+                if route_str not in seen_routes and len(unique_ranked_routes) < 3:
+                    unique_ranked_routes.append((route, evaluation))
+                    seen_routes.add(route_str)
+        elif priority_int == 1 and len(unique_ranked_routes) < 3:
+            sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_cost'])
+            for route, evaluation in sorted_candidates:
+                route_str = "→".join(route)
+                if route_str not in seen_routes and len(unique_ranked_routes) < 3:
+                    unique_ranked_routes.append((route, evaluation))
+                    seen_routes.add(route_str)
+        elif priority_int == 4 and len(unique_ranked_routes) < 3:  # For emissions priority
+            sorted_candidates = sorted(all_evaluated_routes, key=lambda x: x[1]['total_emissions'])
+            for route, evaluation in sorted_candidates:
+                route_str = "→".join(route)
+                if route_str not in seen_routes and len(unique_ranked_routes) < 3:
+                    unique_ranked_routes.append((route, evaluation))
+                    seen_routes.add(route_str)
+
+        # After duplicate removal:
+        # 'unique_ranked_routes' now holds the routes in the order produced by rank_routes.
+        # To ensure the order remains consistent, re-sort based on the objective:
+        order_ranked_routes(unique_ranked_routes, priority_int)
     
-    print_all_routes(all_evaluated_routes)
+        # Routes supplemented from the candidate summaries still need their segments
+        # (copied, since the coordinates added below must not leak into the cache)
+        unique_ranked_routes = [(route, copy_evaluation(evaluation if 'segments' in evaluation
+                                                        else evaluate_with_cache(G, route, cargo_weight, goods_type)))
+                                for route, evaluation in unique_ranked_routes]
     
-    # Now container_df is available when we call print_route_details
-    for i, (route, evaluation) in enumerate(unique_ranked_routes):
-        print(f"\nROUTE OPTION {i+1}:")
-        print_route_details(route, evaluation, cargo_weight, container_df)
+    count_routes("ranked", len(unique_ranked_routes))
     
-    print("\nOptimization complete! Review the route details above and check the generated map.")
-
-    for i, (route, evaluation) in enumerate(unique_ranked_routes):
-        segments_with_coordinates = []
-
-        evaluation["modes"] = []
-
-        for j in range(len(route) - 1):
-            segment = next((s for s in evaluation['segments']
-                            if s['start'] == route[j] and s['end'] == route[j + 1]), None)
-
-            if segment:
-                start_coords_str = G.nodes[route[j]]['coords'].split(',')
-                end_coords_str = G.nodes[route[j + 1]]['coords'].split(',')
-
-                start_lon = float(start_coords_str[0])
-                start_lat = float(start_coords_str[1])
-                end_lon = float(end_coords_str[0])
-                end_lat = float(end_coords_str[1])
-
-                segment['coordinates'] = [
-                    (start_lat, start_lon), (end_lat, end_lon)
-                ]
-
-                if segment["mode"] not in evaluation["modes"]:
-                    evaluation["modes"].append(segment["mode"])
-
-                segments_with_coordinates.append(segment)
+    print_all_routes(all_evaluated_routes)
+    
+    for route, evaluation in unique_ranked_routes:
+        print_route_details(route, evaluation, cargo_weight, container_index)
 
-        unique_ranked_routes[i][1]["segments"] = segments_with_coordinates
+    for route, evaluation in unique_ranked_routes:
+        attach_coordinates(G, route, evaluation)
 
     return unique_ranked_routes
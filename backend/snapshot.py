@@ -0,0 +1,247 @@
+"""
+Compiled network snapshots.
+
+A snapshot is a directory of .npy column arrays plus meta.json holding the
+base network (nodes with resolved countries and coordinates, flight and
+shipping edges), its transfer table, and the geocode and road-leg caches.
+Loading reads the network and cache columns in bulk and memory-maps the
+transfer table, which is used in place, so a server or worker starts
+without parsing CSVs or calling Nominatim.
+
+Compile one from the datasets with:
+
+    python snapshot.py compile snapshots/current
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from transfer_table import TransferTable
+
+SNAPSHOT_FORMAT = 1
+MODES = ("road", "air", "sea")
+
+# distance_km is missing on sea edges and may be None on air edges
+_DISTANCE_MISSING, _DISTANCE_NONE, _DISTANCE_VALUE = 0, 1, 2
+
+
+def _strings(values) -> np.ndarray:
+    values = list(values)
+    return np.array(values, dtype=str) if values else np.array([], dtype="<U1")
+
+
+def _pack_optional_strings(values) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Variable-length strings (or None) as one byte blob, offsets and a presence mask"""
+    encoded = [value.encode() if value is not None else b"" for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    present = np.array([value is not None for value in values], dtype=bool)
+    return blob, offsets, present
+
+
+def _unpack_optional_string(blob: np.ndarray, offsets: np.ndarray, present: np.ndarray, i: int) -> Optional[str]:
+    if not present[i]:
+        return None
+    return blob[offsets[i]:offsets[i + 1]].tobytes().decode()
+
+
+def network_arrays(G: nx.DiGraph) -> Dict[str, np.ndarray]:
+    """Column arrays for the nodes and edges of a base network"""
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=True))
+
+    distance_state = np.full(len(edges), _DISTANCE_MISSING, dtype=np.int8)
+    distance = np.full(len(edges), np.nan)
+    for i, (_, _, data) in enumerate(edges):
+        if 'distance_km' in data:
+            if data['distance_km'] is None:
+                distance_state[i] = _DISTANCE_NONE
+            else:
+                distance_state[i] = _DISTANCE_VALUE
+                distance[i] = data['distance_km']
+
+    return {
+        "node_name": _strings(nodes),
+        "node_type": _strings(G.nodes[n].get('type', '') for n in nodes),
+        "node_country": _strings(G.nodes[n].get('country', '') for n in nodes),
+        "node_coords": _strings(G.nodes[n].get('coords', '') for n in nodes),
+        "edge_src": np.array([index[u] for u, _, _ in edges], dtype=np.int32),
+        "edge_dst": np.array([index[v] for _, v, _ in edges], dtype=np.int32),
+        "edge_mode": np.array([MODES.index(d['mode']) for _, _, d in edges], dtype=np.int8),
+        "edge_cost_per_kg": np.array([d.get('cost_per_kg', np.nan) for _, _, d in edges], dtype=float),
+        "edge_time_hr": np.array([d['time_hr'] for _, _, d in edges], dtype=float),
+        "edge_distance_km": distance,
+        "edge_distance_state": distance_state,
+    }
+
+
+def write_snapshot(path: str, G: nx.DiGraph, table: TransferTable,
+                   geocodes=(), road_legs=(), extra_meta: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Write a snapshot directory. The directory is assembled next to its
+    destination and renamed into place, so readers never see a partial one.
+    """
+    arrays = network_arrays(G)
+    for name, array in table.arrays().items():
+        arrays[f"table_{name}"] = array
+    arrays["table_hubs"] = _strings(table.hubs)
+
+    geocodes = list(geocodes)
+    arrays["geocode_location"] = _strings(g[0] for g in geocodes)
+    arrays["geocode_coords"] = _strings(g[1] for g in geocodes)
+    arrays["geocode_country"] = _strings(g[2] for g in geocodes)
+
+    road_legs = list(road_legs)
+    arrays["road_key"] = _strings(leg[0] for leg in road_legs)
+    arrays["road_distance_km"] = np.array([leg[1] for leg in road_legs], dtype=float)
+    arrays["road_time_hr"] = np.array([leg[2] for leg in road_legs], dtype=float)
+    (arrays["road_geometry_blob"], arrays["road_geometry_offsets"],
+     arrays["road_geometry_present"]) = _pack_optional_strings([leg[3] for leg in road_legs])
+
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "dataset_version": G.graph.get('version'),
+        "created_at": time.time(),
+        "nodes": G.number_of_nodes(),
+        "edges": G.number_of_edges(),
+        "transfer_paths": len(table),
+        "max_backbone_legs": table.max_legs,
+        "geocodes": len(geocodes),
+        "road_legs": len(road_legs),
+        "arrays": sorted(arrays),
+    }
+    meta.update(extra_meta or {})
+
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".snapshot-", dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), array, allow_pickle=False)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return meta
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {meta.get('format')} in {path}")
+    return meta
+
+
+def open_arrays(path: str, meta: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Load every array of a snapshot. The transfer table arrays are
+    memory-mapped, since TransferTable reads them in place; the rest are
+    turned into Python objects right away, so they are read whole.
+    """
+    return {name: np.load(os.path.join(path, f"{name}.npy"),
+                          mmap_mode="r" if name.startswith("table_") else None, allow_pickle=False)
+            for name in meta["arrays"]}
+
+
+def load_snapshot(path: str) -> Tuple[nx.DiGraph, Dict[str, Any]]:
+    """
+    Rebuild the frozen base network from a snapshot, with its version and
+    transfer table attached. Returns (network, meta).
+    """
+    meta = read_meta(path)
+    arrays = open_arrays(path, meta)
+
+    names = arrays["node_name"].tolist()
+    G = nx.DiGraph()
+    G.add_nodes_from(
+        (name, {"type": node_type, "country": country, "coords": coords})
+        for name, node_type, country, coords in zip(names, arrays["node_type"].tolist(),
+                                                    arrays["node_country"].tolist(),
+                                                    arrays["node_coords"].tolist())
+    )
+
+    def edge_attrs(mode, cost, time_hr, distance, state):
+        attrs = {"mode": MODES[mode], "cost_per_kg": cost, "time_hr": time_hr}
+        if state == _DISTANCE_VALUE:
+            attrs["distance_km"] = distance
+        elif state == _DISTANCE_NONE:
+            attrs["distance_km"] = None
+        return attrs
+
+    G.add_edges_from(
+        (names[u], names[v], edge_attrs(*attrs))
+        for u, v, *attrs in zip(arrays["edge_src"].tolist(), arrays["edge_dst"].tolist(),
+                                arrays["edge_mode"].tolist(), arrays["edge_cost_per_kg"].tolist(),
+                                arrays["edge_time_hr"].tolist(), arrays["edge_distance_km"].tolist(),
+                                arrays["edge_distance_state"].tolist())
+    )
+
+    G.graph['version'] = meta["dataset_version"]
+    G.graph['transfer_table'] = TransferTable(
+        arrays["table_hubs"].tolist(),
+        *(arrays[f"table_{name}"] for name in TransferTable.ARRAYS),
+        max_legs=meta["max_backbone_legs"],
+    )
+    return nx.freeze(G), meta
+
+
+def snapshot_geocodes(path: str, meta: Dict[str, Any] = None):
+    """(location, coords, country) entries stored in a snapshot"""
+    arrays = open_arrays(path, meta or read_meta(path))
+    return zip(arrays["geocode_location"].tolist(), arrays["geocode_coords"].tolist(),
+               arrays["geocode_country"].tolist())
+
+
+def snapshot_road_legs(path: str, meta: Dict[str, Any] = None):
+    """(key, distance_km, time_hr, geometry) road legs stored in a snapshot"""
+    arrays = open_arrays(path, meta or read_meta(path))
+    blob, offsets, present = (arrays["road_geometry_blob"], arrays["road_geometry_offsets"],
+                              arrays["road_geometry_present"])
+    for i, (key, distance, time_hr) in enumerate(zip(arrays["road_key"].tolist(),
+                                                     arrays["road_distance_km"].tolist(),
+                                                     arrays["road_time_hr"].tolist())):
+        yield key, distance, time_hr, _unpack_optional_string(blob, offsets, present, i)
+
+
+def compile_snapshot(path: str, data_dir: str = None) -> Dict[str, Any]:
+    """Build the base network from the datasets and write it as a snapshot"""
+    import routing
+
+    routing.migrate_geocode_cache()
+    base = routing.build_base_network(data_dir)
+    table = routing.get_transfer_table(base)
+    return write_snapshot(path, base, table,
+                          geocodes=routing.geocode_store.items(),
+                          road_legs=routing.road_leg_cache.items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LogiLink network snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="compile the datasets into a snapshot directory")
+    compile_parser.add_argument("path", help="snapshot directory to write")
+    compile_parser.add_argument("--data-dir", default=None, help="directory holding the dataset CSVs")
+    args = parser.parse_args()
+    logging.basicConfig(level=os.environ.get("LOGILINK_LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.command == "compile":
+        meta = compile_snapshot(args.path, args.data_dir)
+        print(f"Wrote snapshot {args.path}: {meta['nodes']} nodes, {meta['edges']} edges, "
+              f"{meta['transfer_paths']} transfer paths, {meta['road_legs']} road legs")
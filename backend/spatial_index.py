@@ -0,0 +1,96 @@
+import math
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0
+
+_COORDS_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_coords(coords: str) -> Optional[Tuple[float, float]]:
+    """
+    Parse a "lon,lat" string into (lon, lat) floats.
+    Returns None if the string is not a valid coordinate pair.
+    """
+    match = _COORDS_PATTERN.match(coords)
+    if not match:
+        return None
+    lon, lat = float(match.group(1)), float(match.group(2))
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        return None
+    return lon, lat
+
+
+def haversine_km(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance in km between two lon/lat points"""
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    h = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+
+def _to_unit_xyz(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    lon, lat = np.radians(lon), np.radians(lat)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _km_to_chord(distance_km: float) -> float:
+    # Straight-line distance through the unit sphere for a great-circle distance
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class HubIndex:
+    """
+    KD-tree over hub coordinates for nearest-hub queries by great-circle
+    distance. Points are stored as unit vectors, where straight-line (chord)
+    distance is monotonic in great-circle distance, so a plain KD-tree gives
+    exact haversine neighbours.
+    """
+
+    def __init__(self, nodes: List[str], lonlat: np.ndarray):
+        self.nodes = list(nodes)
+        self.lonlat = np.asarray(lonlat, dtype=float).reshape(-1, 2)
+        self._tree = cKDTree(_to_unit_xyz(self.lonlat[:, 0], self.lonlat[:, 1])) if self.nodes else None
+
+    @classmethod
+    def from_graph(cls, G, types: Iterable[str] = ("airport", "port")) -> "HubIndex":
+        """Index every node of the given types that has valid coordinates"""
+        types = set(types)
+        nodes, lonlat = [], []
+        for node, data in G.nodes(data=True):
+            if data.get('type') not in types or 'coords' not in data:
+                continue
+            point = parse_coords(data['coords'])
+            if point is not None:
+                nodes.append(node)
+                lonlat.append(point)
+        return cls(nodes, np.array(lonlat, dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def within(self, lon: float, lat: float, radius_km: float) -> List[Tuple[str, float]]:
+        """All hubs within radius_km, as (node, haversine km) sorted nearest first"""
+        if self._tree is None:
+            return []
+        point = _to_unit_xyz(np.array([lon]), np.array([lat]))[0]
+        indices = self._tree.query_ball_point(point, _km_to_chord(radius_km))
+        hits = [(self.nodes[i], haversine_km(lon, lat, *self.lonlat[i])) for i in indices]
+        hits.sort(key=lambda hit: hit[1])
+        return hits
+
+    def nearest(self, lon: float, lat: float, k: int = 1,
+                radius_km: float = math.inf) -> List[Tuple[str, float]]:
+        """The k nearest hubs (optionally within radius_km), nearest first"""
+        if self._tree is None or k <= 0:
+            return []
+        point = _to_unit_xyz(np.array([lon]), np.array([lat]))[0]
+        k = min(k, len(self.nodes))
+        bound = _km_to_chord(radius_km) if math.isfinite(radius_km) else np.inf
+        _, indices = self._tree.query(point, k=k, distance_upper_bound=bound)
+        indices = np.atleast_1d(indices)
+        return [(self.nodes[i], haversine_km(lon, lat, *self.lonlat[i]))
+                for i in indices if i < len(self.nodes)]
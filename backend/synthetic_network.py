@@ -0,0 +1,211 @@
+"""
+Synthetic transportation datasets for scaling tests.
+
+Writes flight, shipping, container and location CSVs in the schemas the
+routing loaders read, with any number of edges (10^2 to 10^6 and beyond),
+so the router can be exercised on networks much larger than the shipped
+datasets. Hubs are spread over the countries the road-feasibility rules
+know about, and every hub is listed in the generated city_coordinates.csv
+so the geocode store (or the mock Nominatim) can resolve it offline.
+
+Hub i has the same name and coordinates at every size, so networks of
+different sizes can share one geocode and road-leg cache.
+
+Usage:
+    python synthetic_network.py /tmp/synthetic-10k --edges 10000
+    LOGILINK_DATA_DIR=/tmp/synthetic-10k fastapi dev main.py
+"""
+import argparse
+import csv
+import math
+import os
+import shutil
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+# File names the loaders in routing.py read
+FLIGHTS_CSV = "cargo_flights (1).csv"
+SHIPPING_CSV = "cargo_shipping.csv"
+CONTAINERS_CSV = "containers.csv"
+LOCATIONS_CSV = "city_coordinates.csv"
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Region(NamedTuple):
+    country: str
+    lon: float
+    lat: float
+    spread_deg: float   # hubs are scattered this far (std. dev.) around the centre
+    weight: float       # share of the hubs placed in this country
+
+
+# Countries are_in_same_continent() knows, so road legs between them behave as in production
+REGIONS = [
+    Region("India", 78.9, 21.0, 5.0, 0.25),
+    Region("USA", -97.0, 38.5, 10.0, 0.25),
+    Region("China", 110.0, 31.0, 7.0, 0.20),
+    Region("UAE", 54.4, 24.3, 1.0, 0.08),
+    Region("UK", -2.0, 53.0, 1.5, 0.08),
+    Region("Netherlands", 5.3, 52.1, 0.6, 0.06),
+    Region("Singapore", 103.8, 1.35, 0.1, 0.04),
+    Region("Hong Kong", 114.17, 22.3, 0.1, 0.04),
+]
+
+# Request endpoints: cities at fixed offsets from each country's centre
+CITIES_PER_COUNTRY = 3
+CARRIERS = ("Maersk Line", "MSC", "CMA CGM", "Hapag-Lloyd", "COSCO", "Evergreen")
+
+AIR_SPEED_KMH = 800.0
+SEA_KM_PER_DAY = 500.0
+SEA_DETOUR_FACTOR = 1.3
+
+
+class SyntheticNetwork(NamedTuple):
+    data_dir: str
+    airports: int
+    ports: int
+    flights: int
+    sailings: int
+    cities: List[str]
+
+
+def city_name(country: str, k: int) -> str:
+    return f"Synthetic {country} {k + 1}"
+
+
+def _haversine_km(lon1, lat1, lon2, lat2) -> np.ndarray:
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(h))
+
+
+def _place_hubs(count: int, seed: int, stream: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (region index, lon, lat) of `count` hubs. Each column comes from its own
+    generator, so the first n hubs are identical whatever the total count.
+    """
+    weights = np.array([region.weight for region in REGIONS])
+    regions = np.random.default_rng([seed, stream, 0]).choice(len(REGIONS), size=count, p=weights / weights.sum())
+    offsets = np.random.default_rng([seed, stream, 1]).standard_normal((count, 2))
+    centre = np.array([(region.lon, region.lat) for region in REGIONS])[regions]
+    spread = np.array([region.spread_deg for region in REGIONS])[regions]
+    lon = centre[:, 0] + offsets[:, 0] * spread
+    lat = np.clip(centre[:, 1] + offsets[:, 1] * spread * 0.6, -80.0, 80.0)
+    return regions, np.round(lon, 4), np.round(lat, 4)
+
+
+def _sample_edges(regions: np.ndarray, count: int, local_fraction: float,
+                  rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `count` distinct directed (u, v) hub pairs without self-loops. A
+    local_fraction of them stay within the origin's country, the rest go to
+    any hub.
+    """
+    n = len(regions)
+    if count > n * (n - 1):
+        raise ValueError(f"Cannot place {count} distinct edges between {n} hubs")
+    # Hubs grouped by country, for drawing domestic destinations
+    by_region = np.argsort(regions, kind="stable")
+    region_start = np.searchsorted(regions[by_region], np.arange(len(REGIONS)))
+    region_size = np.bincount(regions, minlength=len(REGIONS))
+
+    keys = np.empty(0, dtype=np.int64)
+    while len(keys) < count:
+        batch = max(2 * (count - len(keys)), 64)
+        u = rng.integers(0, n, size=batch)
+        v = rng.integers(0, n, size=batch)
+        local = rng.random(batch) < local_fraction
+        r = regions[u[local]]
+        v[local] = by_region[region_start[r] + (rng.random(local.sum()) * region_size[r]).astype(np.int64)]
+        new = u.astype(np.int64) * n + v
+        new = new[u != v]
+        # Keep the first occurrence of each pair, in draw order
+        keys = np.concatenate((keys, new))
+        _, first = np.unique(keys, return_index=True)
+        keys = keys[np.sort(first)]
+    keys = keys[:count]
+    return keys // n, keys % n
+
+
+def generate_network(data_dir: str, edges: int, sea_fraction: float = 0.1, mean_degree: float = 8.0,
+                     local_fraction: float = 0.5, seed: int = 0) -> SyntheticNetwork:
+    """
+    Write a synthetic dataset with `edges` flights and sailings to data_dir.
+    Hub counts follow from mean_degree (outgoing edges per hub).
+    """
+    if edges < 2:
+        raise ValueError("A synthetic network needs at least 2 edges")
+    n_sailings = max(1, int(round(edges * sea_fraction)))
+    n_flights = edges - n_sailings
+    # Enough hubs for the edges to be distinct pairs
+    n_airports = max(4, math.ceil(n_flights / mean_degree), math.isqrt(n_flights) + 2)
+    n_ports = max(4, math.ceil(n_sailings / mean_degree), math.isqrt(n_sailings) + 2)
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    airport_region, airport_lon, airport_lat = _place_hubs(n_airports, seed, 1)
+    airports = [f"SA{i:06d}" for i in range(n_airports)]
+    dep, arr = _sample_edges(airport_region, n_flights, local_fraction, rng)
+    distance = _haversine_km(airport_lon[dep], airport_lat[dep], airport_lon[arr], airport_lat[arr])
+    travel_time = np.round(distance / AIR_SPEED_KMH + 1.0, 2)  # Plus taxi and handling
+    cost = np.round(distance * rng.uniform(0.015, 0.1, size=n_flights), 2)
+    with open(os.path.join(data_dir, FLIGHTS_CSV), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["departure_airport", "arrival_airport", "distance_km", "travel_time", "cost"])
+        writer.writerows(zip([airports[i] for i in dep.tolist()], [airports[i] for i in arr.tolist()],
+                             np.round(distance, 2).tolist(), travel_time.tolist(), cost.tolist()))
+
+    port_region, port_lon, port_lat = _place_hubs(n_ports, seed, 2)
+    ports = [f"Synthetic Port {i}" for i in range(n_ports)]
+    dep, arr = _sample_edges(port_region, n_sailings, local_fraction, rng)
+    distance = np.round(_haversine_km(port_lon[dep], port_lat[dep], port_lon[arr], port_lat[arr])
+                        * SEA_DETOUR_FACTOR)
+    days = np.maximum(1, np.ceil(distance / SEA_KM_PER_DAY)).astype(int)
+    cost = np.round(distance * rng.uniform(0.0004, 0.0006, size=n_sailings), 2)
+    carriers = rng.choice(len(CARRIERS), size=n_sailings)
+    with open(os.path.join(data_dir, SHIPPING_CSV), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["departure_port", "arrival_port", "Carrier Name", "Distance (km)", "travel_time", "cost"])
+        writer.writerows(zip([ports[i] for i in dep.tolist()], [ports[i] for i in arr.tolist()],
+                             [CARRIERS[i] for i in carriers.tolist()], distance.astype(int).tolist(),
+                             days.tolist(), cost.tolist()))
+
+    cities = []
+    with open(os.path.join(data_dir, LOCATIONS_CSV), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", "country", "type", "code", "lat", "lon"])
+        for region in REGIONS:
+            for k in range(CITIES_PER_COUNTRY):
+                angle = 2 * math.pi * k / CITIES_PER_COUNTRY
+                name = city_name(region.country, k)
+                cities.append(name)
+                writer.writerow([name, region.country, "city", "",
+                                 round(region.lat + 0.5 * region.spread_deg * math.sin(angle), 4),
+                                 round(region.lon + 0.5 * region.spread_deg * math.cos(angle), 4)])
+        writer.writerows((f"Synthetic Airport {i}", REGIONS[r].country, "airport", code, lat, lon)
+                         for i, (code, r, lat, lon) in enumerate(zip(airports, airport_region.tolist(),
+                                                                     airport_lat.tolist(), airport_lon.tolist())))
+        writer.writerows((name, REGIONS[r].country, "port", "", lat, lon)
+                         for name, r, lat, lon in zip(ports, port_region.tolist(),
+                                                      port_lat.tolist(), port_lon.tolist()))
+
+    shutil.copyfile(os.path.join(SOURCE_DIR, CONTAINERS_CSV), os.path.join(data_dir, CONTAINERS_CSV))
+    return SyntheticNetwork(data_dir, n_airports, n_ports, n_flights, n_sailings, cities)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic transportation dataset")
+    parser.add_argument("data_dir", help="directory to write the CSVs to")
+    parser.add_argument("--edges", type=int, default=10_000, help="flights plus sailings")
+    parser.add_argument("--sea-fraction", type=float, default=0.1, help="share of the edges that are sailings")
+    parser.add_argument("--mean-degree", type=float, default=8.0, help="outgoing edges per hub")
+    parser.add_argument("--local-fraction", type=float, default=0.5, help="share of domestic edges")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    network = generate_network(args.data_dir, args.edges, args.sea_fraction, args.mean_degree,
+                               args.local_fraction, args.seed)
+    print(f"Wrote {network.flights} flights between {network.airports} airports and "
+          f"{network.sailings} sailings between {network.ports} ports to {args.data_dir}")
@@ -0,0 +1,41 @@
+"""
+Shared test setup. routing reads its upstream URLs and cache paths at import
+time, so the mock OSRM and Nominatim servers are started and the caches
+pointed at a temporary directory before any test imports it. The geocode
+store is seeded with every place the mock knows, so building networks from
+the bundled datasets needs no upstream requests.
+
+Run from backend/:  python -m pytest -q tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import mock_nominatim  # noqa: E402
+import mock_osrm  # noqa: E402
+from mock_upstreams import configure_environment  # noqa: E402
+
+_workdir = tempfile.mkdtemp(prefix="logilink-tests-")
+_osrm = mock_osrm.start_server()
+_nominatim = mock_nominatim.start_server()
+configure_environment(_workdir, f"http://127.0.0.1:{_osrm.server_port}",
+                      f"http://127.0.0.1:{_nominatim.server_port}")
+
+
+@pytest.fixture(scope="session")
+def routing():
+    import routing
+
+    routing.geocode_store.import_entries(mock_nominatim.recorded_geocodes())
+    yield routing
+    routing.geocode_store.close()
+    routing.road_leg_cache.close()
+    _osrm.shutdown()
+    _nominatim.shutdown()
+    shutil.rmtree(_workdir, ignore_errors=True)
@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="module")
+def base(routing):
+    return routing.build_base_network()
+
+
+def test_compact_base_matches_the_base_network(routing, base):
+    csr = routing.get_compact_base(base)
+
+    assert list(csr.nodes(data=True)) == list(base.nodes(data=True))
+    assert sorted(csr.edges()) == sorted(base.edges())
+    for u, v, attrs in base.edges(data=True):
+        assert dict(csr[u][v]) == attrs, (u, v)
+    assert routing.get_network_version(csr) == routing.get_network_version(base)
+
+
+def test_requests_share_the_compact_base(routing, base):
+    first = routing.compact_network(routing.build_request_network("Mumbai", "New York", base))
+    second = routing.compact_network(routing.build_request_network("Delhi", "Dubai", base))
+
+    assert first.base is second.base is routing.get_compact_base(base)
+    # Only the request's own road legs sit on top of the shared arrays
+    assert all(data['mode'] == 'road' for _, _, data in first.overlay_edges(data=True))
+
+
+def test_compact_request_network_gives_the_same_routes(routing, base):
+    G = routing.build_request_network("Mumbai", "New York", base)
+    compact = routing.compact_network(G)
+
+    assert routing.get_network_version(compact) == routing.get_network_version(G)
+    expected = routing.optimize_request_routes(G, "Mumbai", "New York", "balanced", 2, "general", 500)
+    assert routing.optimize_request_routes(compact, "Mumbai", "New York", "balanced", 2, "general", 500) == expected
+
+
+def test_patch_builds_a_new_compact_base(routing, base):
+    csr = routing.get_compact_base(base)
+    flights = routing.load_flight_data(os.path.join(routing.DATA_DIR, routing.FLIGHTS_CSV))
+    shipping = routing.load_shipping_data(os.path.join(routing.DATA_DIR, routing.SHIPPING_CSV))
+    flights = pd.concat([flights.iloc[1:], flights.iloc[:1].assign(cost=flights.iloc[0]["cost"] + 1.0)],
+                        ignore_index=True)
+
+    patched, _ = routing.patch_base_network(base, flights, shipping)
+    patched_csr = routing.get_compact_base(patched)
+
+    assert patched_csr is not csr
+    u, v = flights.iloc[-1][["departure_airport", "arrival_airport"]]
+    assert patched_csr[u][v]['cost_per_kg'] == patched[u][v]['cost_per_kg'] != base[u][v]['cost_per_kg']
@@ -0,0 +1,93 @@
+import math
+import os
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+
+def iterrows_network(routing, flight_data: pd.DataFrame, shipping_data: pd.DataFrame) -> nx.DiGraph:
+    """The row-by-row construction create_transportation_network replaced"""
+    G = nx.DiGraph()
+    for _, row in flight_data.iterrows():
+        dep, arr = row["departure_airport"], row["arrival_airport"]
+        distance = row["distance_km"] if "distance_km" in row and not pd.isna(row["distance_km"]) else None
+        if dep not in G:
+            G.add_node(dep, type="airport", country=routing.get_country_for_node(dep))
+        if arr not in G:
+            G.add_node(arr, type="airport", country=routing.get_country_for_node(arr))
+        G.add_edge(dep, arr, mode="air", cost_per_kg=row["cost"], time_hr=row["travel_time"], distance_km=distance)
+    for _, row in shipping_data.iterrows():
+        dep, arr = row["departure_port"], row["arrival_port"]
+        if dep not in G:
+            G.add_node(dep, type="port", country=routing.get_country_for_node(dep))
+        if arr not in G:
+            G.add_node(arr, type="port", country=routing.get_country_for_node(arr))
+        G.add_edge(dep, arr, mode="sea", cost_per_kg=row["cost"], time_hr=row["travel_time"] * 24.0)
+    return G
+
+
+def iterrows_locations(filepath: str) -> dict:
+    """The row-by-row load_location_database"""
+    df = pd.read_csv(filepath)
+    location_db = {}
+    for _, row in df.iterrows():
+        key = row['code'] if pd.notna(row['code']) and row['code'] else row['city']
+        location_db[key] = {'city': row['city'], 'country': row['country'], 'type': row['type'],
+                            'coords': f"{row['lon']},{row['lat']}"}
+    return location_db
+
+
+def same_value(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def assert_same_graph(G: nx.DiGraph, expected: nx.DiGraph) -> None:
+    # Insertion order matters too: candidate generation and tabu search iterate in it
+    assert list(G.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(G.edges()) == list(expected.edges())
+    for u, v, attrs in expected.edges(data=True):
+        assert G[u][v].keys() == attrs.keys(), (u, v)
+        for key, value in attrs.items():
+            assert same_value(G[u][v][key], value), (u, v, key, G[u][v][key], value)
+
+
+def test_bundled_datasets(routing):
+    flights = routing.load_flight_data(os.path.join(routing.DATA_DIR, routing.FLIGHTS_CSV))
+    shipping = routing.load_shipping_data(os.path.join(routing.DATA_DIR, routing.SHIPPING_CSV))
+    # The bundled flights repeat routes, so last-row-wins is exercised here too
+    assert flights.duplicated(["departure_airport", "arrival_airport"]).any()
+
+    assert_same_graph(routing.create_transportation_network(flights, shipping),
+                      iterrows_network(routing, flights, shipping))
+
+
+@pytest.mark.parametrize("with_distance", [True, False])
+def test_duplicates_and_missing_values(routing, with_distance):
+    flights = pd.DataFrame({
+        "departure_airport": ["BOM", "DEL", "BOM", "JFK", "DEL", "BOM"],
+        "arrival_airport": ["DEL", "BOM", "DEL", "LHR", "BOM", "JFK"],
+        "distance_km": [1150.0, float("nan"), 1148.0, 5540.0, 1152.0, float("nan")],
+        "travel_time": [2.0, 2.1, 2.2, 7.0, 2.3, 16.0],
+        "cost": [1.0, 1.1, 1.2, 4.0, float("nan"), 6.0],
+    })
+    if not with_distance:
+        flights = flights.drop(columns="distance_km")
+    shipping = pd.DataFrame({
+        "departure_port": ["Mumbai Port", "Port of Jebel Ali", "Mumbai Port", "BOM"],
+        "arrival_port": ["Port of Jebel Ali", "Mumbai Port", "Port of Jebel Ali", "DEL"],
+        "Carrier Name": ["Maersk Line", "MSC", "COSCO", "MSC"],
+        "Distance (km)": [1900, 1900, 1900, 1150],
+        "travel_time": [4, 5, 6, 3],
+        "cost": [0.05, 0.06, float("nan"), 0.02],
+    })
+
+    assert_same_graph(routing.create_transportation_network(flights, shipping),
+                      iterrows_network(routing, flights, shipping))
+
+
+def test_location_database(routing):
+    path = os.path.join(routing.DATA_DIR, routing.LOCATIONS_CSV)
+    assert routing.load_location_database(path) == iterrows_locations(path)
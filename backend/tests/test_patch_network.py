@@ -0,0 +1,89 @@
+import os
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+
+def build_network(routing, flights: pd.DataFrame, shipping: pd.DataFrame) -> nx.DiGraph:
+    """What build_base_network makes of the given datasets"""
+    G = routing.create_transportation_network(flights, shipping)
+    return nx.freeze(routing.add_coordinates_to_network(G))
+
+
+def graph_data(G: nx.DiGraph):
+    return dict(G.nodes(data=True)), {(u, v): attrs for u, v, attrs in G.edges(data=True)}
+
+
+@pytest.fixture(scope="module")
+def datasets(routing):
+    flights = routing.load_flight_data(os.path.join(routing.DATA_DIR, routing.FLIGHTS_CSV))
+    shipping = routing.load_shipping_data(os.path.join(routing.DATA_DIR, routing.SHIPPING_CSV))
+    return flights, shipping
+
+
+@pytest.fixture(scope="module")
+def base(routing, datasets):
+    return build_network(routing, *datasets)
+
+
+def edited_datasets(flights: pd.DataFrame, shipping: pd.DataFrame):
+    """
+    Datasets with every kind of edit: an airport moved to the shipping feed
+    (type change), an airport dropped, a new airport, a new route and a
+    changed fare.
+    """
+    airports = sorted(set(flights["departure_airport"]) | set(flights["arrival_airport"]))
+    moved, dropped = airports[0], airports[1]
+    touches = lambda name: (flights["departure_airport"] == name) | (flights["arrival_airport"] == name)
+    flights = flights[~touches(moved) & ~touches(dropped)].reset_index(drop=True)
+
+    flights.loc[0, "cost"] += 1.0
+    existing = set(zip(flights["departure_airport"], flights["arrival_airport"]))
+    remaining = sorted(set(flights["departure_airport"]))
+    new_route = next((u, v) for u in remaining for v in remaining if u != v and (u, v) not in existing)
+    new_rows = pd.DataFrame([
+        {"departure_airport": new_route[0], "arrival_airport": new_route[1],
+         "distance_km": 1000.0, "travel_time": 2.0, "cost": 3.0},
+        {"departure_airport": "INMAA", "arrival_airport": remaining[0],
+         "distance_km": 1500.0, "travel_time": 2.5, "cost": 4.0},
+    ])
+    flights = pd.concat([flights, new_rows], ignore_index=True)
+
+    port = shipping.loc[0, "departure_port"]
+    shipping = pd.concat([shipping, pd.DataFrame([
+        {"departure_port": moved, "arrival_port": port, "Carrier Name": "Maersk Line",
+         "Distance (km)": 800, "travel_time": 2, "cost": 0.5},
+    ])], ignore_index=True)
+    return flights, shipping, moved, dropped
+
+
+def test_patch_equals_fresh_build(routing, datasets, base, monkeypatch):
+    flights, shipping, moved, dropped = edited_datasets(*datasets)
+    expected = build_network(routing, flights, shipping)
+
+    geocoded = []
+    get_location_coords = routing.get_location_coords
+    monkeypatch.setattr(routing, "get_location_coords",
+                        lambda location: geocoded.append(location) or get_location_coords(location))
+    patched, stats = routing.patch_base_network(base, flights, shipping)
+
+    assert graph_data(patched) == graph_data(expected)
+    assert patched.nodes[moved]["type"] == "port"
+    assert dropped not in patched
+    # Only the new node is geocoded
+    assert geocoded == ["INMAA"]
+    assert stats["nodes_added"] == 1
+    assert stats["nodes_removed"] >= 1
+    assert stats["nodes_changed"] == 1
+    assert stats["edges_added"] >= 3
+    assert stats["edges_removed"] >= 1
+    assert stats["edges_changed"] == 1
+
+
+def test_patch_without_changes(routing, datasets, base):
+    patched, stats = routing.patch_base_network(base, *datasets)
+
+    assert graph_data(patched) == graph_data(base)
+    assert not any(stats.values())
+    assert nx.is_frozen(patched)
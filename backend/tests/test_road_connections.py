@@ -0,0 +1,58 @@
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def base(routing):
+    return routing.build_base_network()
+
+
+@pytest.fixture(scope="module")
+def dense_base(routing, tmp_path_factory):
+    """A synthetic network with more hubs per country than the bundled one"""
+    import mock_nominatim
+    import synthetic_network
+
+    network = synthetic_network.generate_network(str(tmp_path_factory.mktemp("dense")), 2000)
+    locations = os.path.join(network.data_dir, synthetic_network.LOCATIONS_CSV)
+    routing.geocode_store.import_entries(mock_nominatim.recorded_geocodes(locations))
+    return routing.build_base_network(network.data_dir)
+
+
+def request_network(routing, base, city: str):
+    G = routing.OverlayNetwork(base)
+    country = routing.get_country_for_node(city)
+    G.add_node(city, type="city", country=country, coords=routing.get_location_coords(city))
+    return G, routing.candidate_hubs(G, city, country, (city,))
+
+
+@pytest.mark.parametrize("network, city, to_hubs", [
+    ("base", "Mumbai", True),
+    ("base", "New York", False),
+    ("dense_base", "Synthetic India 1", True),
+    ("dense_base", "Synthetic USA 2", False),
+])
+def test_matrix_mode_adds_the_per_hub_legs(routing, request, network, city, to_hubs):
+    G, hubs = request_network(routing, request.getfixturevalue(network), city)
+    assert len(hubs) > 1
+
+    # Matrix mode first, so its legs come from the table call and not the cache
+    matrix = routing.parallel_road_connections(G, city, hubs, to_hubs, use_matrix=True)
+    per_hub = routing.parallel_road_connections(G, city, hubs, to_hubs, use_matrix=False)
+
+    assert matrix.keys() == per_hub.keys()
+    for hub, leg in per_hub.items():
+        assert matrix[hub] == leg
+
+
+def test_matrix_mode_survives_an_unreadable_cache(routing, base, monkeypatch):
+    G, hubs = request_network(routing, base, "Delhi")
+    expected = routing.parallel_road_connections(G, "Delhi", hubs, use_matrix=False)
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(routing.road_leg_cache, "get", locked)
+    assert routing.parallel_road_connections(G, "Delhi", hubs, use_matrix=True).keys() == expected.keys()
@@ -0,0 +1,97 @@
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+from label_search import pareto_paths_from
+
+Vector = Tuple[float, ...]
+
+
+class TransferTable:
+    """
+    Precomputed Pareto sets of backbone paths between every pair of hubs.
+
+    Entries are stored in flat arrays sorted by (origin, destination): the
+    entries for an origin hub are a contiguous slice, and the destination
+    column within that slice is sorted, so a lookup is two offset reads and
+    a binary search. Each entry has an objective vector and a path of hub
+    indices (stored as one flat array with offsets).
+    """
+
+    def __init__(self, hubs: List[str], origin_offsets: np.ndarray, dest: np.ndarray,
+                 objectives: np.ndarray, path_offsets: np.ndarray, path_nodes: np.ndarray,
+                 max_legs: int):
+        self.hubs = list(hubs)
+        self.hub_index = {hub: i for i, hub in enumerate(self.hubs)}
+        self.origin_offsets = origin_offsets
+        self.dest = dest
+        self.objectives = objectives
+        self.path_offsets = path_offsets
+        self.path_nodes = path_nodes
+        self.max_legs = max_legs
+
+    @classmethod
+    def build(cls, hubs: Iterable[str],
+              expand: Callable[[str], Iterable[Tuple[str, Vector]]],
+              n_objectives: int, max_legs: int) -> "TransferTable":
+        """
+        Run a one-to-all label-setting search from every hub. expand(hub)
+        yields (next hub, edge vector) over backbone edges only.
+        """
+        hubs = list(hubs)
+        hub_index = {hub: i for i, hub in enumerate(hubs)}
+        origin_offsets = [0]
+        dest, objectives, path_offsets, path_nodes = [], [], [0], []
+
+        for origin in hubs:
+            reachable = pareto_paths_from(origin, expand, n_objectives, max_legs)
+            for target in sorted(reachable, key=hub_index.__getitem__):
+                for vector, path in reachable[target]:
+                    dest.append(hub_index[target])
+                    objectives.append(vector)
+                    path_nodes.extend(hub_index[node] for node in path)
+                    path_offsets.append(len(path_nodes))
+            origin_offsets.append(len(dest))
+
+        return cls(hubs,
+                   np.array(origin_offsets, dtype=np.int64),
+                   np.array(dest, dtype=np.int32),
+                   np.array(objectives, dtype=float).reshape(-1, n_objectives),
+                   np.array(path_offsets, dtype=np.int64),
+                   np.array(path_nodes, dtype=np.int32),
+                   max_legs)
+
+    ARRAYS = ("origin_offsets", "dest", "objectives", "path_offsets", "path_nodes")
+
+    def arrays(self):
+        """The table's flat arrays by name, for serialization"""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def __len__(self) -> int:
+        return len(self.dest)
+
+    def __contains__(self, hub) -> bool:
+        return hub in self.hub_index
+
+    def entries(self, origin: str, destination: str) -> range:
+        """Entry indices for the Pareto paths from origin to destination"""
+        o = self.hub_index.get(origin)
+        d = self.hub_index.get(destination)
+        if o is None or d is None:
+            return range(0)
+        lo, hi = self.origin_offsets[o], self.origin_offsets[o + 1]
+        dests = self.dest[lo:hi]
+        return range(lo + int(np.searchsorted(dests, d, 'left')),
+                     lo + int(np.searchsorted(dests, d, 'right')))
+
+    def path(self, entry: int) -> List[str]:
+        start, end = self.path_offsets[entry], self.path_offsets[entry + 1]
+        return [self.hubs[i] for i in self.path_nodes[start:end]]
+
+    def lookup(self, origin: str, destination: str) -> List[Tuple[np.ndarray, List[str]]]:
+        """Pareto (objective vector, hub path) pairs from origin to destination"""
+        return [(self.objectives[e], self.path(e)) for e in self.entries(origin, destination)]
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.origin_offsets, self.dest, self.objectives,
+                                      self.path_offsets, self.path_nodes))
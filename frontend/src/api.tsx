@@ -68,3 +68,55 @@ export async function getRoutes(
 
   return jsonData as Route[];
 }
+
+type StreamEvent =
+  | { event: "route"; route: Route }
+  | { event: "ranking"; routes: Route[] }
+  | { event: "error"; message: string };
+
+export async function streamRoutes(
+  source: string,
+  destination: string,
+  onRoute: (route: Route) => void,
+  priority: Priority = Priority.BALANCED,
+  goodsType: GoodsType = GoodsType.STANDARD,
+  cargoWeight: number = 0.0,
+) {
+  const searchParams = new URLSearchParams();
+  searchParams.append("priority", priority);
+  searchParams.append("goods_type", goodsType);
+  searchParams.append("cargo_weight", cargoWeight.toString());
+
+  const url = `${BASE_URL}/routes/${source}/${destination}/stream?${searchParams}`;
+
+  const res = await fetch(url);
+  if (!res.body) {
+    throw new Error("Streaming is not supported by this browser");
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let ranked: Route[] = [];
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event = JSON.parse(line) as StreamEvent;
+      if (event.event === "route") {
+        onRoute(event.route);
+      } else if (event.event === "ranking") {
+        ranked = event.routes;
+      } else {
+        throw new Error(event.message);
+      }
+    }
+  }
+
+  return ranked;
+}